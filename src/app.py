@@ -1,60 +1,216 @@
-from flask import Flask, render_template, url_for
+import json
+import os
+from datetime import datetime
+
+import click
+from flask import Flask, render_template, url_for, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from mongoengine import connect
 from config import Config
 from example.services.auction_service_impl import AuctionServiceImpl
+from src.example.services.user_service_impl import UserServiceImpl
 from src.example.routers.user_router import user_router
 from src.example.routers.auction_router import auction_router
+from src.example.routers.image_router import image_router
+from src.example.routers.health_router import health_router
+from src.example.repositories.auction_repository_impl import AuctionRepositoryImpl
+from src.example.repositories.report_rollup_repository_impl import ReportRollupRepositoryImpl
 # AuctionServiceImpl is imported by auction_router, no need to import here if not directly used
 # from src.example.services.auction_service_impl import AuctionServiceImpl
 
+from src.example.utils.analytics_export import export_collection
+from src.example.services.event_subscribers import register_subscribers
+from src.example.utils.catalog_cache import catalog_cache
+from src.example.utils.change_stream import start_change_stream
+from src.example.utils.event_bus import event_bus
+from src.example.utils.fragment_cache import fragment_cache, render_cards
+from src.example.utils.image_store import sweep_orphaned_images
+from src.example.utils.image_variants import variant_urls
+from src.example.utils.mongo import connect_mongo, start_warm_up
+from src.example.utils.order_book import order_book
+from src.example.utils.registration_filter import registration_filter, start_registration_filter_warm_up
+from src.example.utils.token_cache import token_cache
+from src.example.utils.token_revocation import revocation_registry, start_revocation_sync
+from src.example.utils.upload_gc import collect_orphaned_uploads, start_upload_gc
+from src.example.utils.time_util import format_time_left
+from src.example.utils.upload_stream import UploadRequest
 # Import socketio instance from extensions and initialize it with the app
 from .extensions import socketio
 
-app = Flask(__name__)
+app = Flask(__name__, template_folder='../templates', static_folder='../static')
 CORS(app)
 app.config.from_object(Config)
+app.request_class = UploadRequest # Stream auction images to disk with size and type checks
 
 # Initialize extensions
 socketio.init_app(app)
-connect('auction_db')
+catalog_cache.max_entries = app.config['CATALOG_CACHE_MAX_ENTRIES']
+catalog_cache.max_age = app.config['CATALOG_CACHE_MAX_AGE_SECONDS']
+fragment_cache.max_entries = app.config['FRAGMENT_CACHE_MAX_ENTRIES']
+order_book.max_auctions = app.config['ORDER_BOOK_MAX_AUCTIONS']
+order_book.max_age = app.config['ORDER_BOOK_MAX_AGE_SECONDS'] or None
+token_cache.max_entries = app.config['JWT_CACHE_MAX_ENTRIES']
+connect_mongo(app) # Pool size, timeouts, compression, read preference and write concern come from Config
+if app.config['MONGO_WARMUP_ENABLED']:
+    start_warm_up(app)
+registration_filter.capacity = app.config['REGISTRATION_FILTER_CAPACITY']
+registration_filter.error_rate = app.config['REGISTRATION_FILTER_ERROR_RATE']
+if app.config['REGISTRATION_FILTER_ENABLED']:
+    start_registration_filter_warm_up(app)
+revocation_registry.max_staleness = app.config['REVOCATION_MAX_STALENESS_SECONDS']
+if app.config['REVOCATION_REGISTRY_ENABLED']:
+    start_revocation_sync(app)
 JWTManager(app)
+register_subscribers(event_bus, rollups=app.config['EVENT_SOURCE'] == 'local' or app.config['CHANGE_STREAM_ROLLUPS'])
+if app.config['EVENT_SOURCE'] == 'change_stream':
+    start_change_stream(app, event_bus)
+if app.config['UPLOAD_GC_ENABLED']:
+    start_upload_gc(app)
 
 app.register_blueprint(user_router, url_prefix='/api')
 app.register_blueprint(auction_router, url_prefix='/api')
+app.register_blueprint(image_router)
+app.register_blueprint(health_router)
 
 
 # --- Frontend Routes ---
 
+@app.template_filter('date')
+def date_filter(value, fmt):
+    value = datetime.utcnow() if value == "now" else value
+    return value.strftime(fmt)
+
+
+@app.context_processor
+def inject_endpoints():
+    # index.html only links to pages whose endpoints are registered
+    return {'endpoints': app.view_functions}
+
+
+def _auction_card(auction, now):
+    image_url = variant_urls(
+        auction.image_filename, app.config['UPLOAD_FOLDER'],
+        lambda filename: url_for('image.serve_image', filename=filename)
+    )['card'] if auction.image_filename else url_for('static', filename='images/placeholder.png')
+    return {
+        'item_id': auction.item_id,
+        'title': auction.item_title,
+        'description': auction.item_description or '',
+        'image_url': image_url,
+        'starting_bid': auction.starting_bid,
+        'current_bid': auction.high_bid,
+        'end_time': auction.end_time,
+        'time_left': format_time_left(auction.end_time, now),
+        'version': auction.version
+    }
+
+
 @app.route('/')
 def index():
-    try:
-        # Fetch auctions using the service layer
-        # Assuming list_items() returns a list of Auction model objects
-        raw_auctions = AuctionServiceImpl.list_items() 
-        
-        # Process auctions for template rendering
-        processed_auctions = []
-        for auction in raw_auctions:
-            # TODO: Fetch actual highest bid from Bid collection for this auction.id
-            # TODO: Calculate actual time_left based on auction.end_time
-            current_bid_placeholder = auction.starting_bid # Use starting bid as placeholder
-            time_left_placeholder = "Time Left Placeholder" # Placeholder
-
-            processed_auctions.append({
-                'id': str(auction.id), # Important: Pass ID as string
-                'title': auction.item_name, 
-                'image_url': url_for('static', filename='images/placeholder.png'), # Static placeholder image
-                'current_bid': f"${current_bid_placeholder:.2f}", # Format placeholder bid
-                'time_left': time_left_placeholder
-            })
-            
-    except Exception as e:
-        print(f"Error fetching auctions for index route: {e}")
-        processed_auctions = [] # Render empty list or show error message on template
-        
-    return render_template('index.html', auctions=processed_auctions)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(request.args.get('per_page', app.config['INDEX_PAGE_SIZE'], type=int),
+                   app.config['INDEX_MAX_PAGE_SIZE'])
+    per_page = max(per_page, 1)
+    cache_key = ('index', page, per_page)
+    auctions = catalog_cache.get(cache_key)
+    if auctions is None:
+        fill_token = catalog_cache.begin_fill()
+        try:
+            # One projected query over approved, still-open auctions; the highest bid is
+            # denormalized onto the auction by place_bid so no Bid lookup is needed.
+            auctions = tuple(AuctionServiceImpl.list_open_items(page, per_page))
+            catalog_cache.put(cache_key, auctions, [auction.item_id for auction in auctions], fill_token)
+        except Exception as e:
+            print(f"Error fetching auctions for index route: {e}")
+            auctions = () # Render empty list or show error message on template
+
+    # Cards are built per render from the cached AuctionViews, so the countdown is never stale
+    now = datetime.utcnow()
+    processed_auctions = [_auction_card(auction, now) for auction in auctions if auction.is_open(now)]
+    # Cards are rendered once per auction version; the page is stitched from cached fragments
+    auction_cards = render_cards(
+        processed_auctions,
+        lambda auction: render_template('_auction_card.html', auction=auction),
+        fragment_cache
+    )
+    return render_template('index.html', auction_cards=auction_cards)
+
+
+@app.cli.command('sweep-images')
+@click.option('--batch-size', default=100, help='Maximum number of orphaned images to delete.')
+@click.option('--dry-run', is_flag=True, help='Report orphaned images without deleting them.')
+def sweep_images_command(batch_size, dry_run):
+    """Deletes content-addressed images no auction has referenced for the grace period."""
+    deleted, reclaimed = sweep_orphaned_images(batch_size=batch_size, dry_run=dry_run)
+    if dry_run:
+        click.echo(f"{deleted} orphaned images, {reclaimed} bytes reclaimable")
+    else:
+        click.echo(f"Deleted {deleted} orphaned images, reclaimed {reclaimed} bytes")
+
+
+@app.cli.command('gc-uploads')
+@click.option('--dry-run', is_flag=True, help='Report orphaned files without deleting them.')
+@click.option('--batch-size', default=500, help='Files checked against the database per query.')
+def gc_uploads_command(dry_run, batch_size):
+    """Deletes uploaded files that no auction references."""
+    report = collect_orphaned_uploads(batch_size=batch_size, dry_run=dry_run)
+    verb = 'reclaimable' if dry_run else 'reclaimed'
+    click.echo(f"Scanned {report['scanned']} files, {report['orphaned']} orphaned, "
+               f"{report['reclaimed_bytes']} bytes {verb}")
+
+
+@app.cli.command('import-users')
+@click.argument('path', type=click.File('r'))
+@click.option('--batch-size', default=1000, help='Users validated, hashed and inserted per batch.')
+@click.option('--workers', default=None, type=int, help='Password hashing processes (default: one per CPU).')
+def import_users_command(path, batch_size, workers):
+    """Registers users from a JSON array or JSON-lines file and reports rows that were not created."""
+    text = path.read()
+    if text.lstrip().startswith('['):
+        users_data = json.loads(text)
+    else:
+        users_data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    totals = {}
+    for start in range(0, len(users_data), batch_size):
+        report = UserServiceImpl.import_users(users_data[start:start + batch_size], workers)
+        for status, count in report['summary'].items():
+            totals[status] = totals.get(status, 0) + count
+        for result in report['results']:
+            if result['status'] != 'created':
+                detail = result.get('errors') or result.get('fields') or result.get('error')
+                click.echo(f"Row {start + result['row']}: {result['status']} {detail}")
+    click.echo(', '.join(f"{count} {status}" for status, count in totals.items()))
+
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recomputes the report rollups from the auction and bid collections."""
+    count = ReportRollupRepositoryImpl.rebuild()
+    click.echo(f"Rebuilt {count} rollups")
+
+
+@app.cli.command('rebuild-bid-totals')
+def rebuild_bid_totals_command():
+    """Backfills each auction's current bid and bid count from its bids."""
+    count = AuctionRepositoryImpl.rebuild_bid_totals()
+    click.echo(f"Updated {count} auctions")
+
+
+@app.cli.command('export-analytics')
+@click.option('--out', 'out_dir', required=True, type=click.Path(file_okay=False), help='Export directory.')
+@click.option('--format', 'fmt', type=click.Choice(['parquet', 'arrow']), default='parquet')
+@click.option('--chunk-rows', default=50000, help='Documents per output file.')
+@click.option('--full', is_flag=True, help='Re-export every document as it is now, replacing the previous files.')
+def export_analytics_command(out_dir, fmt, chunk_rows, full):
+    """Exports auctions and bids to compressed columnar files, incrementally by _id (new documents only)."""
+    for name in ('auction', 'bid'):
+        try:
+            count = export_collection(name, out_dir, fmt, chunk_rows, full, log=click.echo)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"{name}: {count} new documents exported")
 
 
 if __name__ == '__main__':
@@ -1,10 +1,123 @@
 import os
 
+
+def _optional_int(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def _optional_bool(name):
+    value = os.environ.get(name)
+    return value.lower() == 'true' if value else None
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'fixed-256-bit-secret-key-123456'
     JWT_EXPIRATION_SECONDS = 3600  # 1 hour
+    # Stateless mode: short-lived access tokens carry the user's roles, so requests are authorized from
+    # the signature and claims alone; the user is only read when a refresh token is exchanged.
+    JWT_STATELESS = os.environ.get('JWT_STATELESS', 'false').lower() == 'true'
+    JWT_ACCESS_EXPIRATION_SECONDS = int(os.environ.get('JWT_ACCESS_EXPIRATION_SECONDS', 300))
+    JWT_REFRESH_EXPIRATION_SECONDS = int(os.environ.get('JWT_REFRESH_EXPIRATION_SECONDS', 14 * 24 * 3600))
+    JWT_CACHE_MAX_ENTRIES = int(os.environ.get('JWT_CACHE_MAX_ENTRIES', 4096))  # Verified tokens kept; 0 disables
+    # Logouts, blocks and deletes are synced to every worker's revocation registry this often. A registry
+    # that has not synced for REVOCATION_MAX_STALENESS_SECONDS falls back to checking the user in MongoDB.
+    REVOCATION_REGISTRY_ENABLED = os.environ.get('REVOCATION_REGISTRY_ENABLED', 'true').lower() == 'true'
+    REVOCATION_SYNC_SECONDS = float(os.environ.get('REVOCATION_SYNC_SECONDS', 2))
+    REVOCATION_MAX_STALENESS_SECONDS = float(os.environ.get('REVOCATION_MAX_STALENESS_SECONDS', 10))
     JWT_TOKEN_LOCATION = ['headers']
     JWT_HEADER_NAME = 'Authorization'
     JWT_HEADER_TYPE = 'Bearer'
     UPLOAD_FOLDER = os.path.join(os.path.abspath(os.path.dirname(__file__)), '../static/uploads/auction_images')
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
\ No newline at end of file
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    MAX_IMAGE_UPLOAD_BYTES = int(os.environ.get('MAX_IMAGE_UPLOAD_BYTES', 10 * 1024 * 1024))
+    # Form fields and multipart framing allowed on top of the image; larger upload bodies get a 413 unread
+    UPLOAD_FORM_OVERHEAD_BYTES = int(os.environ.get('UPLOAD_FORM_OVERHEAD_BYTES', 64 * 1024))
+    IMAGE_ORPHAN_GRACE_SECONDS = int(os.environ.get('IMAGE_ORPHAN_GRACE_SECONDS', 3600))
+    # Background upload GC; every worker may enable it, a lock file lets one per host do the work
+    UPLOAD_GC_ENABLED = os.environ.get('UPLOAD_GC_ENABLED', 'false').lower() == 'true'
+    UPLOAD_GC_INTERVAL_SECONDS = int(os.environ.get('UPLOAD_GC_INTERVAL_SECONDS', 3600))
+    UPLOAD_GC_BATCH_SIZE = int(os.environ.get('UPLOAD_GC_BATCH_SIZE', 500))
+    UPLOAD_GC_DRY_RUN = os.environ.get('UPLOAD_GC_DRY_RUN', 'false').lower() == 'true'
+    IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))  # Thumbnail pool size
+    IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 40_000_000))  # Larger uploads get no variants
+    IMAGE_CACHE_MAX_AGE = int(os.environ.get('IMAGE_CACHE_MAX_AGE', 31536000))  # Content-addressed files
+    IMAGE_MUTABLE_CACHE_MAX_AGE = int(os.environ.get('IMAGE_MUTABLE_CACHE_MAX_AGE', 300))  # Legacy uuid names
+    # e.g. '/protected-uploads' to answer with X-Accel-Redirect and let nginx send the file
+    IMAGE_ACCEL_REDIRECT_PREFIX = os.environ.get('IMAGE_ACCEL_REDIRECT_PREFIX')
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'  # Apache/lighttpd
+
+    # Asynchronous report exports: gzip results kept this long, produced by this many worker threads
+    REPORT_FOLDER = os.environ.get('REPORT_FOLDER') or os.path.join(os.path.abspath(os.path.dirname(__file__)), '../reports')
+    REPORT_JOB_TTL_SECONDS = int(os.environ.get('REPORT_JOB_TTL_SECONDS', 24 * 3600))
+    REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS', 2))
+    REPORT_JOB_TIMEOUT_SECONDS = int(os.environ.get('REPORT_JOB_TIMEOUT_SECONDS', 3600))  # Without progress writes
+
+    # Bulk user import: rows accepted per request, and processes the import route uses to hash
+    # passwords (0 or 1 hashes inline, keeping web workers free of child processes by default)
+    USER_IMPORT_MAX_ROWS = int(os.environ.get('USER_IMPORT_MAX_ROWS', 5000))
+    USER_IMPORT_HASH_WORKERS = int(os.environ.get('USER_IMPORT_HASH_WORKERS', 0))
+
+    # Bloom filter of registered usernames and emails, checked before hashing a new password
+    REGISTRATION_FILTER_ENABLED = os.environ.get('REGISTRATION_FILTER_ENABLED', 'true').lower() == 'true'
+    REGISTRATION_FILTER_CAPACITY = int(os.environ.get('REGISTRATION_FILTER_CAPACITY', 1000000))
+    REGISTRATION_FILTER_ERROR_RATE = float(os.environ.get('REGISTRATION_FILTER_ERROR_RATE', 0.01))
+
+    # Bid rate limiting (token buckets). 'memory' keeps buckets per process,
+    # 'shared' keeps them in a shared-memory table visible to all local workers.
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_SHARED_NAME = os.environ.get('RATE_LIMIT_SHARED_NAME', 'auction_rate_limits')
+    RATE_LIMIT_SHARED_SLOTS = int(os.environ.get('RATE_LIMIT_SHARED_SLOTS', 65536))
+    BID_RATE_LIMIT_CAPACITY = float(os.environ.get('BID_RATE_LIMIT_CAPACITY', 5))
+    BID_RATE_LIMIT_PER_SECOND = float(os.environ.get('BID_RATE_LIMIT_PER_SECOND', 1))
+    IP_RATE_LIMIT_CAPACITY = float(os.environ.get('IP_RATE_LIMIT_CAPACITY', 30))
+    IP_RATE_LIMIT_PER_SECOND = float(os.environ.get('IP_RATE_LIMIT_PER_SECOND', 10))
+
+    # Serialized listing pages kept in memory; entries are dropped on create/edit/approve/bid.
+    CATALOG_CACHE_MAX_ENTRIES = int(os.environ.get('CATALOG_CACHE_MAX_ENTRIES', 256))
+    CATALOG_CACHE_MAX_AGE_SECONDS = int(os.environ.get('CATALOG_CACHE_MAX_AGE_SECONDS', 30))  # 0 keeps pages until dropped
+
+    # Auctions whose bid history is held in memory, most recently viewed first
+    ORDER_BOOK_MAX_AUCTIONS = int(os.environ.get('ORDER_BOOK_MAX_AUCTIONS', 1024))
+    # Ladders are reloaded after this long, bounding how stale bids placed on other workers can be.
+    # 0 keeps them until evicted, which is only safe with EVENT_SOURCE=change_stream.
+    ORDER_BOOK_MAX_AGE_SECONDS = int(os.environ.get('ORDER_BOOK_MAX_AGE_SECONDS', 5))
+
+    # Landing page shows approved, open auctions only, newest first, this many per page at most
+    INDEX_PAGE_SIZE = int(os.environ.get('INDEX_PAGE_SIZE', 24))
+    INDEX_MAX_PAGE_SIZE = int(os.environ.get('INDEX_MAX_PAGE_SIZE', 60))
+
+    # Pre-rendered index.html auction cards, one per auction version
+    FRAGMENT_CACHE_MAX_ENTRIES = int(os.environ.get('FRAGMENT_CACHE_MAX_ENTRIES', 5000))
+
+    # MongoDB client. Unset optional values keep the pymongo defaults; everything is tunable from the
+    # environment, e.g. MONGO_MAX_POOL_SIZE=200 MONGO_COMPRESSORS=zstd,zlib MONGO_WRITE_CONCERN=majority
+    MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017')
+    MONGO_DB = os.environ.get('MONGO_DB', 'auction_db')
+    MONGO_APP_NAME = os.environ.get('MONGO_APP_NAME', 'auction-system')
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = _optional_int('MONGO_MAX_IDLE_TIME_MS')
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int('MONGO_WAIT_QUEUE_TIMEOUT_MS')  # Wait for a free connection
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_SOCKET_TIMEOUT_MS = _optional_int('MONGO_SOCKET_TIMEOUT_MS')
+    MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')  # Comma separated: zstd, snappy, zlib
+    MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+    # Catalog listings, bid history and reports read with this preference, tolerating replicas at most
+    # MONGO_MAX_STALENESS_SECONDS behind (MongoDB's minimum is 90; -1 means no bound). Bids, auth and
+    # read-your-own-write responses always read from the primary. 'primary' turns the routing off.
+    MONGO_SECONDARY_READ_PREFERENCE = os.environ.get('MONGO_SECONDARY_READ_PREFERENCE', 'secondaryPreferred')
+    MONGO_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', 120))
+    MONGO_WRITE_CONCERN = os.environ.get('MONGO_WRITE_CONCERN')  # 'majority' or a number of nodes
+    MONGO_WRITE_CONCERN_TIMEOUT_MS = _optional_int('MONGO_WRITE_CONCERN_TIMEOUT_MS')
+    MONGO_JOURNAL = _optional_bool('MONGO_JOURNAL')
+    # Ping and create indexes in the background at startup, so the first requests find a ready pool
+    MONGO_WARMUP_ENABLED = os.environ.get('MONGO_WARMUP_ENABLED', 'true').lower() == 'true'
+
+    # Where cache invalidation, rollups and websocket fan-out learn about writes: 'local' publishes
+    # this process's own writes; 'change_stream' follows MongoDB change streams (replica set required)
+    # so every node also sees writes made elsewhere. Rollups live in MongoDB, so in change_stream mode
+    # exactly one node must set CHANGE_STREAM_ROLLUPS=true.
+    EVENT_SOURCE = os.environ.get('EVENT_SOURCE', 'local')
+    CHANGE_STREAM_ROLLUPS = os.environ.get('CHANGE_STREAM_ROLLUPS', 'false').lower() == 'true'
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from mongoengine import Document, StringField, DateTimeField, FloatField, ListField, ReferenceField, BooleanField
+from mongoengine import Document, StringField, DateTimeField, FloatField, ListField, ReferenceField, BooleanField, IntField
 
 
 class Auction(Document):
@@ -14,6 +14,9 @@ class Auction(Document):
     start_time = DateTimeField(default=datetime.utcnow)
     end_time = DateTimeField()
     is_approved = BooleanField(default=False)
+    current_bid = FloatField()  # Highest bid so far, maintained by place_bid
+    bid_count = IntField(default=0)
+    version = IntField(default=0)  # Bumped on every edit, approval and bid; drives ETags
 
     def to_dict(self):
         return {
@@ -26,7 +29,13 @@ class Auction(Document):
             'image_filename': self.image_filename,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time,
-            'is_approved': self.is_approved
+            'is_approved': self.is_approved,
+            'current_bid': self.current_bid,
+            'bid_count': self.bid_count,
+            'version': self.version
         }
 
-    meta = {'collection': 'auction'}
\ No newline at end of file
+    meta = {
+        'collection': 'auction',
+        'indexes': [('is_approved', 'end_time'), 'image_filename']
+    }
\ No newline at end of file
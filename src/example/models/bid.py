@@ -6,4 +6,7 @@ class Bid(Document):
     bidder_id = ReferenceField('User', required=True)
     bid_amount = FloatField(required=True)
 
-    meta = {'collection': 'bid'}
\ No newline at end of file
+    meta = {
+        'collection': 'bid',
+        'indexes': ['auction_id']
+    }
\ No newline at end of file
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from mongoengine import Document, StringField, IntField, DateTimeField
+
+
+class ImageBlob(Document):
+    filename = StringField(required=True, unique=True)  # <sha256>.<ext> inside UPLOAD_FOLDER
+    size = IntField(default=0)
+    ref_count = IntField(default=0)  # Number of auctions pointing at this file
+    orphaned_at = DateTimeField()  # Set when ref_count drops to zero; drives the incremental sweep
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'image_blob',
+        'indexes': [{'fields': ['orphaned_at'], 'sparse': True}]
+    }
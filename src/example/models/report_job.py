@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from mongoengine import Document, StringField, IntField, DateTimeField
+
+
+class ReportJob(Document):
+    job_id = StringField(required=True, unique=True)
+    requested_by = StringField(required=True)
+    format = StringField(required=True)
+    status = StringField(default='queued', choices=('queued', 'running', 'done', 'failed'))
+    rows_written = IntField(default=0)
+    total_rows = IntField(default=0)  # Estimated at submission, used for the progress ratio
+    filename = StringField()  # Compressed result inside REPORT_FOLDER
+    error = StringField()
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)  # Every status or progress write; a stale one means a dead worker
+    finished_at = DateTimeField()
+    expires_at = DateTimeField(required=True)
+
+    def to_dict(self):
+        progress = min(1.0, self.rows_written / self.total_rows) if self.total_rows else 0.0
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'format': self.format,
+            'rows_written': self.rows_written,
+            'total_rows': self.total_rows,
+            'progress': 1.0 if self.status == 'done' else round(progress, 4),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+    meta = {
+        'collection': 'report_job',
+        # MongoDB drops job records on its own once they expire
+        'indexes': [{'fields': ['expires_at'], 'expireAfterSeconds': 0}]
+    }
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from mongoengine import Document, StringField, IntField, FloatField, DateTimeField
+
+
+class ReportRollup(Document):
+    rollup_id = StringField(primary_key=True)  # "<dimension>:<key>", e.g. "day:2025-06-01"
+    dimension = StringField(required=True, choices=('day', 'seller', 'state'))
+    key = StringField(required=True)
+    auction_count = IntField(default=0)
+    bid_count = IntField(default=0)
+    bid_volume = FloatField(default=0.0)
+    high_bid = FloatField()  # Not kept for state rollups; see compute_rollups
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'dimension': self.dimension,
+            'key': self.key,
+            'auction_count': self.auction_count,
+            'bid_count': self.bid_count,
+            'bid_volume': self.bid_volume,
+            'high_bid': self.high_bid,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    meta = {
+        'collection': 'report_rollup',
+        'indexes': ['dimension']
+    }
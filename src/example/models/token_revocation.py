@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from mongoengine import Document, StringField, IntField, BooleanField, DateTimeField
+
+
+class TokenRevocation(Document):
+    user_id = StringField(primary_key=True)
+    min_version = IntField(default=0)  # Tokens carrying an older token_version are revoked
+    blocked = BooleanField(default=False)  # Every token of the user is revoked
+    updated_at = DateTimeField(default=datetime.utcnow)
+    expires_at = DateTimeField()  # Set once every revoked token has expired anyway; unset for blocks
+
+    meta = {
+        'collection': 'token_revocation',
+        'indexes': [
+            'updated_at',
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import FrozenSet, Optional
+
+
+def _id_str(value):
+    return str(value) if value is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class AuctionView:
+    """Read-only snapshot of an auction for in-process caches; built from a raw document."""
+    item_id: str
+    seller_id: Optional[str]
+    item_title: Optional[str]
+    item_description: Optional[str]
+    starting_bid: float
+    current_bid: Optional[float]
+    bid_count: int
+    is_approved: bool
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+    image_filename: Optional[str]
+    version: int
+
+    @classmethod
+    def from_mongo(cls, row):
+        return cls(
+            item_id=row['item_id'],
+            seller_id=_id_str(row.get('seller_id')),
+            item_title=row.get('item_title'),
+            item_description=row.get('item_description'),
+            starting_bid=row.get('starting_bid') or 0.0,
+            current_bid=row.get('current_bid'),
+            bid_count=row.get('bid_count', 0),
+            is_approved=row.get('is_approved', False),
+            start_time=row.get('start_time'),
+            end_time=row.get('end_time'),
+            image_filename=row.get('image_filename'),
+            version=row.get('version', 0)
+        )
+
+    @property
+    def high_bid(self):
+        return self.current_bid or self.starting_bid
+
+    def is_open(self, now):
+        return self.end_time is None or self.end_time > now
+
+
+@dataclass(frozen=True, slots=True)
+class BidView:
+    bid_id: str
+    auction_id: str
+    bidder_id: str
+    bid_amount: float
+
+    @classmethod
+    def from_mongo(cls, row):
+        return cls(
+            bid_id=str(row['_id']),
+            auction_id=_id_str(row.get('auction_id')),
+            bidder_id=_id_str(row.get('bidder_id')),
+            bid_amount=row.get('bid_amount')
+        )
+
+    def to_dict(self):
+        # Same keys and values as BidSchema().dump of the stored bid
+        return {
+            'auction_id': self.auction_id,
+            'bidder_id': self.bidder_id,
+            'bid_amount': float(self.bid_amount) if self.bid_amount is not None else None
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated user as far as permission checks are concerned."""
+    user_id: str
+    username: Optional[str]
+    roles: FrozenSet[str]  # Names of the roles set to true
+    is_blocked: bool
+    token_version: int
+
+    @classmethod
+    def from_mongo(cls, row):
+        return cls(
+            user_id=row['user_id'],
+            username=row.get('username'),
+            roles=frozenset(name for name, enabled in (row.get('roles') or {}).items() if enabled),
+            is_blocked=row.get('is_blocked', False),
+            token_version=row.get('token_version', 0)
+        )
+
+    def has_role(self, name):
+        return name in self.roles
+
+    @property
+    def is_super_admin(self):
+        return 'is_super_admin' in self.roles
+
+    @property
+    def is_admin(self):
+        return 'is_admin' in self.roles or self.is_super_admin
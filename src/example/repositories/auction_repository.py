@@ -1,5 +1,6 @@
 from ..models.auction import Auction
 from ..exceptions.entity_not_found_exception import EntityNotFoundException
+from src.example.utils.mongo import PRIMARY
 
 class AuctionRepository:
     @staticmethod
@@ -8,4 +9,52 @@ class AuctionRepository:
 
     @staticmethod
     def save_auction(auction):
+        pass
+
+    @staticmethod
+    def find_auction_document(item_id, read=PRIMARY):
+        pass
+
+    @staticmethod
+    def find_auction_fields(item_id, *fields, read=PRIMARY):
+        pass
+
+    @staticmethod
+    def find_auction_fields_by_pk(pk, *fields):
+        pass
+
+    @staticmethod
+    def find_auction_documents(page=None, per_page=None):
+        pass
+
+    @staticmethod
+    def find_auction_version(item_id):
+        pass
+
+    @staticmethod
+    def update_auction(auction, fields):
+        pass
+
+    @staticmethod
+    def record_bid(item_id, bid_amount):
+        pass
+
+    @staticmethod
+    def rebuild_bid_totals(batch_size=1000):
+        pass
+
+    @staticmethod
+    def find_open_approved_auctions(now, page, per_page):
+        pass
+
+    @staticmethod
+    def bump_image_versions(filename):
+        pass
+
+    @staticmethod
+    def find_referenced_images(filenames):
+        pass
+
+    @staticmethod
+    def aggregate_report(batch_size=500):
         pass
\ No newline at end of file
@@ -1,16 +1,174 @@
+from mongoengine import Q
+from pymongo import UpdateOne
+
 from example.exceptions.entity_not_found_exception import EntityNotFoundException
 from example.models.auction import Auction
+from example.models.bid import Bid
 from src.example.repositories.auction_repository import AuctionRepository
+from src.example.utils.mongo import PRIMARY, SECONDARY, read_preference, routed_collection
+
+
+REPORT_COLUMNS = [
+    'item_id', 'item_title', 'seller_id', 'starting_bid', 'high_bid', 'bid_count', 'is_approved',
+    'start_time', 'end_time', 'seller_auction_count', 'seller_total_high_bids'
+]
 
 
 class AuctionRepositoryImpl(AuctionRepository):
     @staticmethod
     def find_auction_by_id(item_id):
-        auction = Auction.objects(item_id=item_id).first()
+        # Write paths only touch scalar fields; references stay ids instead of being fetched on access
+        auction = Auction.objects(item_id=item_id).no_dereference().first()
         if not auction:
             raise EntityNotFoundException("Auction not found")
         return auction
 
     @staticmethod
     def save_auction(auction):
-        auction.save()
\ No newline at end of file
+        auction.save()
+
+    @staticmethod
+    def find_auction_document(item_id, read=PRIMARY):
+        """Raw stored document of one auction; references stay as ObjectIds."""
+        row = routed_collection(Auction, read).find_one({'item_id': item_id})
+        if not row:
+            raise EntityNotFoundException("Auction not found")
+        return row
+
+    @staticmethod
+    def find_auction_fields(item_id, *fields, read=PRIMARY):
+        """Raw document of one auction holding only ``fields``."""
+        row = routed_collection(Auction, read).find_one({'item_id': item_id}, {field: 1 for field in fields})
+        if not row:
+            raise EntityNotFoundException("Auction not found")
+        return row
+
+    @staticmethod
+    def find_auction_fields_by_pk(pk, *fields):
+        """Like find_auction_fields, for an auction referenced by its ``_id``; None if it is gone."""
+        return routed_collection(Auction, PRIMARY).find_one({'_id': pk}, {field: 1 for field in fields})
+
+    @staticmethod
+    def find_auction_documents(page=None, per_page=None):
+        rows = routed_collection(Auction, SECONDARY).find({}).sort('_id', 1)
+        if page and per_page:
+            rows = rows.skip((page - 1) * per_page).limit(per_page)
+        return list(rows)
+
+    @staticmethod
+    def find_auction_version(item_id):
+        # Same source as the catalog reads the version describes
+        row = Auction.objects(item_id=item_id).read_preference(read_preference(SECONDARY)).only('version').as_pymongo().first()
+        if not row:
+            raise EntityNotFoundException("Auction not found")
+        return row.get('version', 0)
+
+    @staticmethod
+    def update_auction(auction, fields):
+        """
+        Writes ``fields`` of a loaded auction and bumps its version in one update, so no reader
+        sees the new fields under the old version (and ETag).
+        """
+        auction.validate()
+        updates = {f'set__{field}': getattr(auction, field) for field in fields}
+        Auction.objects(pk=auction.pk).update_one(inc__version=1, **updates)
+        auction.version = (auction.version or 0) + 1
+
+    @staticmethod
+    def record_bid(item_id, bid_amount):
+        Auction.objects(item_id=item_id).update_one(
+            inc__version=1, inc__bid_count=1, max__current_bid=bid_amount
+        )
+
+    @staticmethod
+    def rebuild_bid_totals(batch_size=1000):
+        """
+        Backfills ``current_bid`` and ``bid_count`` from the bid collection, for auctions whose bids
+        predate the denormalized fields. Both only move up ($max) and only auctions that change get
+        a new version, so running it next to live bids or twice is harmless. Returns the count updated.
+        """
+        totals = routed_collection(Bid, PRIMARY).aggregate([
+            {'$group': {'_id': '$auction_id', 'high_bid': {'$max': '$bid_amount'}, 'bid_count': {'$sum': 1}}}
+        ], allowDiskUse=True)
+        auctions = routed_collection(Auction, PRIMARY)
+        updated, operations = 0, []
+        for total in totals:
+            operations.append(UpdateOne(
+                {'_id': total['_id'], '$or': [{'bid_count': {'$not': {'$gte': total['bid_count']}}},
+                                              {'current_bid': {'$not': {'$gte': total['high_bid']}}}]},
+                {'$max': {'bid_count': total['bid_count'], 'current_bid': total['high_bid']},
+                 '$inc': {'version': 1}}
+            ))
+            if len(operations) >= batch_size:
+                updated += auctions.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            updated += auctions.bulk_write(operations, ordered=False).modified_count
+        return updated
+
+    @staticmethod
+    def find_open_approved_auctions(now, page, per_page):
+        return list(
+            Auction.objects(Q(is_approved=True) & (Q(end_time=None) | Q(end_time__gt=now)))
+            .read_preference(read_preference(SECONDARY))
+            .order_by('-id')
+            .skip((page - 1) * per_page)
+            .limit(per_page)
+            .only('item_id', 'item_title', 'item_description', 'starting_bid', 'current_bid',
+                  'end_time', 'image_filename', 'version')
+            .as_pymongo()
+        )
+
+    @staticmethod
+    def bump_image_versions(filename):
+        """Bumps the version of every auction showing ``filename``; returns their ``_id`` and ``item_id``."""
+        collection = routed_collection(Auction, PRIMARY)
+        rows = list(collection.find({'image_filename': filename}, {'item_id': 1}))
+        if rows:
+            collection.update_many({'_id': {'$in': [row['_id'] for row in rows]}}, {'$inc': {'version': 1}})
+        return rows
+
+    @staticmethod
+    def find_referenced_images(filenames):
+        return set(Auction.objects(image_filename__in=list(filenames)).distinct('image_filename'))
+
+    @staticmethod
+    def aggregate_report(batch_size=500):
+        """
+        Cursor over one row per auction with its high bid, bid count and the seller's totals,
+        all computed by MongoDB. Bids are folded per auction through the bid.auction_id index.
+        """
+        pipeline = [
+            {'$lookup': {
+                'from': 'bid',
+                'let': {'auction': '$_id'},
+                'pipeline': [
+                    {'$match': {'$expr': {'$eq': ['$auction_id', '$$auction']}}},
+                    {'$group': {'_id': None, 'high_bid': {'$max': '$bid_amount'}, 'bid_count': {'$sum': 1}}}
+                ],
+                'as': 'bid_stats'
+            }},
+            {'$unwind': {'path': '$bid_stats', 'preserveNullAndEmptyArrays': True}},
+            {'$setWindowFields': {
+                'partitionBy': '$seller_id',
+                'output': {
+                    'seller_auction_count': {'$count': {}},
+                    'seller_total_high_bids': {'$sum': {'$ifNull': ['$bid_stats.high_bid', 0]}}
+                }
+            }},
+            {'$project': {
+                '_id': 0,
+                'item_id': 1,
+                'item_title': 1,
+                'seller_id': {'$toString': '$seller_id'},
+                'starting_bid': 1,
+                'high_bid': '$bid_stats.high_bid',
+                'bid_count': {'$ifNull': ['$bid_stats.bid_count', 0]},
+                'is_approved': 1,
+                'start_time': 1,
+                'end_time': 1,
+                'seller_auction_count': 1,
+                'seller_total_high_bids': 1
+            }}
+        ]
+        return routed_collection(Auction, SECONDARY).aggregate(pipeline, allowDiskUse=True, batchSize=batch_size)
\ No newline at end of file
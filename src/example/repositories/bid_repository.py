@@ -1,5 +1,6 @@
 from ..exceptions.entity_not_found_exception import EntityNotFoundException
 from ..models.bid import Bid
+from src.example.utils.mongo import PRIMARY
 
 class BidRepository:
 
@@ -8,5 +9,9 @@ class BidRepository:
         pass
 
     @staticmethod
-    def find_bids_by_auction_id(auction_id):
-        pass
\ No newline at end of file
+    def find_bids_by_auction_id(auction_id, read=PRIMARY):
+        pass
+
+    @staticmethod
+    def find_bid_documents(bid_ids, read=PRIMARY):
+        pass
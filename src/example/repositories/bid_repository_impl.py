@@ -1,6 +1,7 @@
 from src.example.exceptions.entity_not_found_exception import EntityNotFoundException
 from src.example.models.bid import Bid
 from src.example.repositories.bid_repository import BidRepository
+from src.example.utils.mongo import PRIMARY, routed_collection
 
 
 class BidRepositoryImpl(BidRepository):
@@ -10,8 +11,17 @@ class BidRepositoryImpl(BidRepository):
         bid.save()
 
     @staticmethod
-    def find_bids_by_auction_id(auction_id):
-        bids = Bid.objects(auction_id=auction_id).first()
-        if not bids:
-            raise EntityNotFoundException("Auction not found")
-        return bids
\ No newline at end of file
+    def find_bids_by_auction_id(auction_id, read=PRIMARY):
+        """Raw bids on the auction whose ``_id`` is ``auction_id``, highest first."""
+        rows = routed_collection(Bid, read).find(
+            {'auction_id': auction_id}, {'auction_id': 1, 'bidder_id': 1, 'bid_amount': 1}
+        )
+        return list(rows.sort([('bid_amount', -1), ('_id', 1)]))
+
+    @staticmethod
+    def find_bid_documents(bid_ids, read=PRIMARY):
+        """Raw bids keyed by _id, fetched in one query for every reference in ``bid_ids``."""
+        bid_ids = list(set(bid_ids))
+        if not bid_ids:
+            return {}
+        return {row['_id']: row for row in routed_collection(Bid, read).find({'_id': {'$in': bid_ids}})}
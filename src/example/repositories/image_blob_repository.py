@@ -0,0 +1,24 @@
+class ImageBlobRepository:
+    @staticmethod
+    def acquire(filename, size):
+        pass
+
+    @staticmethod
+    def release(filename):
+        pass
+
+    @staticmethod
+    def find_orphans(orphaned_before, limit):
+        pass
+
+    @staticmethod
+    def delete_if_orphaned(filename):
+        pass
+
+    @staticmethod
+    def exists(filename):
+        pass
+
+    @staticmethod
+    def find_tracked(filenames):
+        pass
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from src.example.models.image_blob import ImageBlob
+from src.example.repositories.image_blob_repository import ImageBlobRepository
+
+
+class ImageBlobRepositoryImpl(ImageBlobRepository):
+    @staticmethod
+    def acquire(filename, size):
+        ImageBlob.objects(filename=filename).update_one(
+            upsert=True, inc__ref_count=1, unset__orphaned_at=True, set_on_insert__size=size
+        )
+
+    @staticmethod
+    def release(filename):
+        ImageBlob.objects(filename=filename).update_one(dec__ref_count=1)
+        ImageBlob.objects(filename=filename, ref_count__lte=0, orphaned_at=None).update_one(
+            set__orphaned_at=datetime.utcnow()
+        )
+
+    @staticmethod
+    def find_orphans(orphaned_before, limit):
+        return list(
+            ImageBlob.objects(orphaned_at__lte=orphaned_before, ref_count__lte=0)
+            .order_by('orphaned_at')
+            .limit(limit)
+            .only('filename', 'size')
+            .as_pymongo()
+        )
+
+    @staticmethod
+    def delete_if_orphaned(filename):
+        return ImageBlob.objects(filename=filename, ref_count__lte=0).delete() > 0
+
+    @staticmethod
+    def exists(filename):
+        return ImageBlob.objects(filename=filename).only('id').first() is not None
+
+    @staticmethod
+    def find_tracked(filenames):
+        return set(ImageBlob.objects(filename__in=list(filenames)).distinct('filename'))
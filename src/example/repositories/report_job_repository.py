@@ -0,0 +1,16 @@
+class ReportJobRepository:
+    @staticmethod
+    def save_job(job):
+        pass
+
+    @staticmethod
+    def find_job_by_id(job_id):
+        pass
+
+    @staticmethod
+    def update_job(job_id, **updates):
+        pass
+
+    @staticmethod
+    def fail_stale_jobs(updated_before, error):
+        pass
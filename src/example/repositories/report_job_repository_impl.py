@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from src.example.exceptions.entity_not_found_exception import EntityNotFoundException
+from src.example.models.report_job import ReportJob
+from src.example.repositories.report_job_repository import ReportJobRepository
+
+
+class ReportJobRepositoryImpl(ReportJobRepository):
+    @staticmethod
+    def save_job(job):
+        job.save()
+
+    @staticmethod
+    def find_job_by_id(job_id):
+        job = ReportJob.objects(job_id=job_id).first()
+        if not job:
+            raise EntityNotFoundException("Report job not found")
+        return job
+
+    @staticmethod
+    def update_job(job_id, **updates):
+        updates.setdefault('updated_at', datetime.utcnow())
+        ReportJob.objects(job_id=job_id).update_one(**{f"set__{key}": value for key, value in updates.items()})
+
+    @staticmethod
+    def fail_stale_jobs(updated_before, error):
+        """Fails queued or running jobs with no write since ``updated_before``; returns how many."""
+        return ReportJob.objects(status__in=('queued', 'running'), updated_at__lt=updated_before).update(
+            set__status='failed', set__error=error, set__finished_at=datetime.utcnow(),
+            set__updated_at=datetime.utcnow()
+        )
@@ -0,0 +1,20 @@
+class ReportRollupRepository:
+    @staticmethod
+    def record_auction_created(seller_id, state, created_at):
+        pass
+
+    @staticmethod
+    def record_state_change(auction_id, old_state, new_state):
+        pass
+
+    @staticmethod
+    def record_bid(seller_id, state, bid_amount, placed_at):
+        pass
+
+    @staticmethod
+    def find_all():
+        pass
+
+    @staticmethod
+    def rebuild():
+        pass
@@ -0,0 +1,125 @@
+from collections import defaultdict
+from datetime import datetime
+
+from bson import ObjectId
+
+from src.example.models.auction import Auction
+from src.example.models.bid import Bid
+from src.example.models.report_rollup import ReportRollup
+from src.example.repositories.report_rollup_repository import ReportRollupRepository
+from src.example.utils.mongo import PRIMARY, SECONDARY, read_preference, routed_collection
+
+REBUILD_COLLECTION = 'report_rollup_rebuild'
+
+
+def auction_state(is_approved):
+    return 'approved' if is_approved else 'pending'
+
+
+def compute_rollups(auctions, bids):
+    """
+    Rollup totals from raw auction rows (``seller_id``, ``is_approved``, ``start_time``) and
+    bid rows (``auction_id``, ``bid_amount``). Bids count towards their auction's current
+    state; state rollups carry no ``high_bid``, since a maximum cannot follow an auction
+    when it changes state.
+    """
+    totals = defaultdict(lambda: {'auction_count': 0, 'bid_count': 0, 'bid_volume': 0.0, 'high_bid': None})
+    owners = {}
+    for row in auctions:
+        seller, state = str(row.get('seller_id')), auction_state(row.get('is_approved'))
+        owners[row['_id']] = (seller, state)
+        day = (row.get('start_time') or row['_id'].generation_time).strftime('%Y-%m-%d')
+        for rollup_key in (('day', day), ('seller', seller), ('state', state)):
+            totals[rollup_key]['auction_count'] += 1
+    for row in bids:
+        if row.get('auction_id') not in owners:
+            continue
+        seller, state = owners[row['auction_id']]
+        day = row['_id'].generation_time.strftime('%Y-%m-%d')
+        amount = row.get('bid_amount') or 0.0
+        for rollup_key in (('day', day), ('seller', seller), ('state', state)):
+            total = totals[rollup_key]
+            total['bid_count'] += 1
+            total['bid_volume'] += amount
+            if rollup_key[0] != 'state':
+                total['high_bid'] = amount if total['high_bid'] is None else max(total['high_bid'], amount)
+    return totals
+
+
+class ReportRollupRepositoryImpl(ReportRollupRepository):
+    """
+    Rollups are maintained with upserted $inc/$max updates, so concurrent writers never conflict.
+    Incremental updates and ``rebuild`` share one meaning: a state rollup counts the auctions
+    currently in that state and every bid placed on them.
+    """
+
+    @staticmethod
+    def _bump(dimension, key, now, **updates):
+        ReportRollup.objects(rollup_id=f"{dimension}:{key}").update_one(
+            upsert=True, set__updated_at=now, set_on_insert__dimension=dimension,
+            set_on_insert__key=key, **updates
+        )
+
+    @staticmethod
+    def record_auction_created(seller_id, state, created_at):
+        now = datetime.utcnow()
+        day = (created_at or now).strftime('%Y-%m-%d')
+        ReportRollupRepositoryImpl._bump('day', day, now, inc__auction_count=1)
+        ReportRollupRepositoryImpl._bump('seller', str(seller_id), now, inc__auction_count=1)
+        ReportRollupRepositoryImpl._bump('state', state, now, inc__auction_count=1)
+
+    @staticmethod
+    def record_state_change(auction_id, old_state, new_state):
+        """Moves the auction, with its bid count and volume, from one state rollup to the other."""
+        if old_state == new_state:
+            return
+        rows = list(routed_collection(Bid, PRIMARY).aggregate([
+            {'$match': {'auction_id': ObjectId(auction_id)}},
+            {'$group': {'_id': None, 'count': {'$sum': 1}, 'volume': {'$sum': '$bid_amount'}}}
+        ]))
+        bid_count, bid_volume = (rows[0]['count'], rows[0]['volume']) if rows else (0, 0.0)
+        now = datetime.utcnow()
+        ReportRollupRepositoryImpl._bump('state', old_state, now, dec__auction_count=1,
+                                         dec__bid_count=bid_count, dec__bid_volume=bid_volume)
+        ReportRollupRepositoryImpl._bump('state', new_state, now, inc__auction_count=1,
+                                         inc__bid_count=bid_count, inc__bid_volume=bid_volume)
+
+    @staticmethod
+    def record_bid(seller_id, state, bid_amount, placed_at):
+        now = datetime.utcnow()
+        updates = {'inc__bid_count': 1, 'inc__bid_volume': bid_amount, 'max__high_bid': bid_amount}
+        ReportRollupRepositoryImpl._bump('day', placed_at.strftime('%Y-%m-%d'), now, **updates)
+        ReportRollupRepositoryImpl._bump('seller', str(seller_id), now, **updates)
+        ReportRollupRepositoryImpl._bump('state', state, now, inc__bid_count=1, inc__bid_volume=bid_amount)
+
+    @staticmethod
+    def find_all():
+        return ReportRollup.objects.read_preference(read_preference(SECONDARY)).order_by('dimension', 'key')
+
+    @staticmethod
+    def rebuild():
+        """
+        Recomputes every rollup from the auction and bid collections (backfill or repair). The
+        result is written to a scratch collection and renamed over the live one, so readers see
+        either the old rollups or the new ones, never a half-filled collection. Incremental
+        updates that land while the rebuild runs are lost; run it while rollups are quiet.
+        """
+        totals = compute_rollups(
+            Auction.objects.only('seller_id', 'is_approved', 'start_time').as_pymongo(),
+            Bid.objects.only('auction_id', 'bid_amount').as_pymongo()
+        )
+        now = datetime.utcnow()
+        live = ReportRollup._get_collection()
+        scratch = live.database[REBUILD_COLLECTION]
+        scratch.drop()  # Left over from an interrupted rebuild
+        if totals:
+            scratch.insert_many([
+                ReportRollup(rollup_id=f"{dimension}:{key}", dimension=dimension, key=key, updated_at=now,
+                             **values).to_mongo().to_dict()
+                for (dimension, key), values in totals.items()
+            ])
+            scratch.create_index('dimension')
+            scratch.rename(live.name, dropTarget=True)
+        else:
+            live.delete_many({})
+        return len(totals)
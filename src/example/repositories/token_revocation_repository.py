@@ -0,0 +1,8 @@
+class TokenRevocationRepository:
+    @staticmethod
+    def save_revocation(user_id, min_version=None, blocked=False, expires_at=None):
+        pass
+
+    @staticmethod
+    def find_revocations_since(updated_after=None):
+        pass
@@ -0,0 +1,31 @@
+from src.example.models.token_revocation import TokenRevocation
+from src.example.repositories.token_revocation_repository import TokenRevocationRepository
+
+
+class TokenRevocationRepositoryImpl(TokenRevocationRepository):
+    @staticmethod
+    def save_revocation(user_id, min_version=None, blocked=False, expires_at=None):
+        """
+        Upserts the user's revocation; versions only move forward and a block is never lifted here.
+        ``updated_at`` is stamped by the server, so every worker's sync watermark uses one clock.
+        """
+        update = {'$currentDate': {'updated_at': True}, '$set': {}, '$max': {}}
+        if min_version is not None:
+            update['$max']['min_version'] = min_version
+        if blocked:
+            update['$set']['blocked'] = True
+            if expires_at is None:
+                update['$unset'] = {'expires_at': ''}
+            else:
+                update['$set']['expires_at'] = expires_at
+        elif expires_at is not None:
+            update['$max']['expires_at'] = expires_at
+        for operator in ('$set', '$max'):
+            if not update[operator]:
+                del update[operator]
+        TokenRevocation._get_collection().update_one({'_id': user_id}, update, upsert=True)
+
+    @staticmethod
+    def find_revocations_since(updated_after=None):
+        query = {} if updated_after is None else {'updated_at': {'$gte': updated_after}}
+        return TokenRevocation._get_collection().find(query)
@@ -7,10 +7,34 @@ class UserRepository(ABC):
     def find_user_by_id(user_id):
         pass
 
+    @staticmethod
+    def find_user_document(user_id):
+        pass
+
+    @staticmethod
+    def find_user_fields(user_id, *fields):
+        pass
+
+    @staticmethod
+    def find_user_id_by_pk(pk):
+        pass
+
     @staticmethod
     def save_user(user):
         pass
 
+    @staticmethod
+    def insert_users(documents):
+        pass
+
+    @staticmethod
+    def find_taken_fields(username, email):
+        pass
+
+    @staticmethod
+    def iter_identities(batch_size=5000):
+        pass
+
     @staticmethod
     def find_user_by_username(username):
         pass
@@ -1,4 +1,5 @@
 from mongoengine import DoesNotExist
+from pymongo.errors import BulkWriteError
 
 from ..models.user import User
 from ..exceptions.entity_not_found_exception import EntityNotFoundException
@@ -12,10 +13,64 @@ class UserRepositoryImpl(UserRepository):
             raise EntityNotFoundException("User not found")
         return user
 
+    @staticmethod
+    def find_user_document(user_id):
+        user = User._get_collection().find_one({'user_id': user_id})
+        if not user:
+            raise EntityNotFoundException("User not found")
+        return user
+
+    @staticmethod
+    def find_user_fields(user_id, *fields):
+        user = User._get_collection().find_one({'user_id': user_id}, {field: 1 for field in fields})
+        if not user:
+            raise EntityNotFoundException("User not found")
+        return user
+
+    @staticmethod
+    def find_user_id_by_pk(pk):
+        """``user_id`` of the user stored under ``_id`` pk, e.g. an auction's seller reference."""
+        user = User._get_collection().find_one({'_id': pk}, {'user_id': 1})
+        if not user:
+            raise EntityNotFoundException("User not found")
+        return user['user_id']
+
     @staticmethod
     def save_user(user):
         user.save()
 
+    @staticmethod
+    def insert_users(documents):
+        """
+        Inserts raw user documents in one unordered bulk write, so a duplicate row does not stop
+        the rest. Returns the inserted count and the write errors, indexed into ``documents``.
+        """
+        if not documents:
+            return 0, []
+        try:
+            result = User._get_collection().insert_many(documents, ordered=False)
+            return len(result.inserted_ids), []
+        except BulkWriteError as e:
+            return e.details['nInserted'], e.details['writeErrors']
+
+    @staticmethod
+    def find_taken_fields(username, email):
+        """Which of ``username`` and ``email`` belong to an existing user, from the unique indexes."""
+        taken = set()
+        cursor = User._get_collection().find(
+            {'$or': [{'username': username}, {'email': email}]}, {'username': 1, 'email': 1}
+        )
+        for user in cursor:
+            taken.update(field for field, value in (('username', username), ('email', email)) if user.get(field) == value)
+        return sorted(taken)
+
+    @staticmethod
+    def iter_identities(batch_size=5000):
+        """``(username, email)`` of every user, streamed with a projection."""
+        cursor = User._get_collection().find({}, {'_id': 0, 'username': 1, 'email': 1}, batch_size=batch_size)
+        for user in cursor:
+            yield user.get('username'), user.get('email')
+
     @staticmethod
     def find_user_by_username(username):
         user = User.objects(username=username).first()
@@ -34,11 +89,14 @@ class UserRepositoryImpl(UserRepository):
         user = User.objects.get(user_id=user_id)
         user.token_version += 1
         user.save()
+        return user.token_version
 
     @staticmethod
     def delete_user(user_id):
+        """Deletes by pk and returns the deleted user's ``user_id``, or None if there was no such user."""
         try:
-            User.objects.get(id=user_id).delete()
-            return True
+            user = User.objects.get(id=user_id)
+            user.delete()
+            return user.user_id
         except DoesNotExist:
-            return False
\ No newline at end of file
+            return None
\ No newline at end of file
@@ -1,22 +1,26 @@
 from flask import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 import os
 
 # Assuming your custom decorator is in a 'utils' directory at the same level as 'routers'
 # If 'utils' is inside 'example', the path would be from ..utils.decorators import manual_jwt_required
-from ..utils.decorators import manual_jwt_required 
+from ..utils.decorators import manual_jwt_required, ip_rate_limited, bid_rate_limited
 from ..services.auction_service_impl import AuctionServiceImpl
 from ..schemas.auction_schema import AuctionSchema
+from src.example.schemas.fast_serializers import serialize_auction, serialize_auctions, dump_json, json_response
 from src.config import Config
 from ..models.user import User # For fetching user if needed, though id is often enough
 from ..repositories.user_repository_impl import UserRepositoryImpl # To fetch user object
 from ..exceptions.entity_not_found_exception import EntityNotFoundException
 from ..exceptions.auction_error import AuctionError
+from ..exceptions.validation_error import ValidationError
+from src.example.utils.catalog_cache import catalog_cache
+from src.example.utils.etag import auction_etag, listing_etag, not_modified
 
 auction_router = Blueprint('auction', __name__)
 auction_service = AuctionServiceImpl()
 auction_schema = AuctionSchema() # For single item serialization
-auctions_schema = AuctionSchema(many=True) # For list serialization
 
 
 @auction_router.route('/auction', methods=['POST'])
@@ -36,8 +40,10 @@ def create_auction(current_user_id):
         
         created_auction = auction_service.create_auction(auction_data_form, image_file)
         return jsonify(auction_schema.dump(created_auction)), 201
-    except AuctionError as e: # Custom auction related errors from service layer
+    except (AuctionError, ValidationError) as e: # Custom auction related errors from service layer
         return jsonify({"error": str(e)}), 400
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Image exceeds the maximum upload size"}), 413
     except Exception as e:
         current_app.logger.error(f"Error creating auction: {str(e)}")
         return jsonify({"error": "Failed to create auction due to an internal error."}), 500
@@ -46,16 +52,24 @@ def create_auction(current_user_id):
 @auction_router.route('/auction/<item_id>', methods=['GET'])
 def get_auction(item_id):
     try:
-        auction = auction_service.get_auction(item_id)
-        if not auction:
-            return jsonify({"error": "Auction not found"}), 404
-        return jsonify(auction_schema.dump(auction)), 200
+        if request.if_none_match:
+            # A revalidation is answered from the version counter, before loading or dumping the auction
+            cached = not_modified(auction_etag(item_id, auction_service.get_auction_version(item_id)))
+            if cached:
+                return cached
+        auction, bids_by_id = auction_service.get_auction_document(item_id)
+        # The ETag comes from the document being served, never from a separate read
+        response = json_response(dump_json(serialize_auction(auction, bids_by_id)))
+        response.set_etag(auction_etag(item_id, auction.get('version', 0)))
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 404
 
 
 @auction_router.route('/auction/<item_id>/bid', methods=['POST'])
+@ip_rate_limited
 @manual_jwt_required
+@bid_rate_limited
 def place_bid(current_user_id, item_id):
     data = request.get_json()
     if not data or 'bid_amount' not in data:
@@ -64,13 +78,14 @@ def place_bid(current_user_id, item_id):
     try:
         bid_amount = data['bid_amount'] # Get bid_amount from the parsed data
         # Pass current_user_id (from decorator) as bidder_id
-        updated_auction = auction_service.place_bid(item_id, current_user_id, float(bid_amount))
+        auction_service.place_bid(item_id, current_user_id, float(bid_amount))
         # auction_service.place_bid should raise EntityNotFoundException or AuctionError on failure
-        return jsonify(auction_schema.dump(updated_auction)), 200
+        auction, bids_by_id = auction_service.get_auction_document(item_id, fresh=True)
+        return json_response(dump_json(serialize_auction(auction, bids_by_id)))
     except EntityNotFoundException as e:
         current_app.logger.warning(f"Place bid failed for item {item_id}: {str(e)}")
         return jsonify({"error": str(e)}), 404
-    except AuctionError as e: # For errors like "bid too low", "auction closed" etc.
+    except (AuctionError, ValidationError) as e: # For errors like "bid too low", "auction closed" etc.
         current_app.logger.warning(f"Place bid business logic error for item {item_id}: {str(e)}")
         return jsonify({"error": str(e)}), 400 
     except ValueError: # If float(bid_amount) fails
@@ -80,11 +95,39 @@ def place_bid(current_user_id, item_id):
         return jsonify({"error": "Failed to place bid due to an internal error."}), 500
 
 
+@auction_router.route('/auction/<item_id>/bids', methods=['GET'])
+def view_bid_history(item_id):
+    try:
+        bids = auction_service.view_bid_history(item_id)
+        return json_response(dump_json([bid.to_dict() for bid in bids]))
+    except EntityNotFoundException as e:
+        return jsonify({"error": str(e)}), 404
+
+
 @auction_router.route('/auctions', methods=['GET']) # Changed to /auctions for plurality
 def list_items():
     try:
-        items = auction_service.list_items()
-        return jsonify(auctions_schema.dump(items)), 200 # Use schema for proper serialization
+        page = request.args.get('page', type=int)
+        per_page = request.args.get('per_page', type=int)
+        # Image URLs in the body are absolute, so each host and scheme gets its own page
+        cache_key = ('api_auctions', request.host_url, page, per_page)
+        entry = catalog_cache.get(cache_key)
+        if entry is None:
+            fill_token = catalog_cache.begin_fill()
+            auctions, bids_by_id = auction_service.list_item_documents(page, per_page)
+            # Cached already encoded, with the ETag of exactly those documents, so a hit skips serialization
+            body = dump_json(serialize_auctions(auctions, bids_by_id))
+            etag = listing_etag(((auction['item_id'], auction.get('version', 0)) for auction in auctions),
+                                request.host_url)
+            catalog_cache.put(cache_key, (body, etag), [auction['item_id'] for auction in auctions], fill_token)
+        else:
+            body, etag = entry
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        response = json_response(body)
+        response.set_etag(etag)
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
@@ -99,28 +142,24 @@ def edit_item(current_user_id, item_id):
         # The auction_service.edit_item should ideally handle this logic internally for atomicity,
         # or this check should be extremely robust.
         # Fetching item first to check ownership before attempting edit:
-        auction_to_edit = auction_service.get_auction_by_item_id(item_id) # Assuming this method exists
-        if not auction_to_edit:
-            return jsonify({"error": "Auction item not found"}), 404
-        
-        # Ensure seller_id from auction_to_edit is compared correctly with current_user_id
-        # seller_id could be an object or a string ID. Adapt as necessary.
-        # If auction_to_edit.seller_id is a User object: str(auction_to_edit.seller_id.id)
-        # If auction_to_edit.seller_id is an ID string: str(auction_to_edit.seller_id)
-        actual_seller_id = str(auction_to_edit.seller_id.id) if hasattr(auction_to_edit.seller_id, 'id') else str(auction_to_edit.seller_id)
+        # Only the seller reference is read; raises EntityNotFoundException for unknown items
+        actual_seller_id = auction_service.get_auction_owner(item_id)
         if actual_seller_id != current_user_id:
             current_app.logger.warning(f"User {current_user_id} attempt to edit auction {item_id} owned by {actual_seller_id}")
             return jsonify({"error": "Permission denied: You are not the seller of this item."}), 403
 
         # Now call the service to edit the item
-        updated_auction = auction_service.edit_item(item_id, auction_data_form, image_file, current_user_id)
-        return jsonify(auction_schema.dump(updated_auction)), 200
+        auction_service.edit_item(item_id, auction_data_form, image_file)
+        auction, bids_by_id = auction_service.get_auction_document(item_id, fresh=True)
+        return json_response(dump_json(serialize_auction(auction, bids_by_id)))
     except EntityNotFoundException as e: # If auction_service.edit_item itself raises this
         current_app.logger.warning(f"Edit auction failed, item {item_id} not found: {str(e)}")
         return jsonify({"error": str(e)}), 404
-    except AuctionError as e: # For other business logic errors from service
+    except (AuctionError, ValidationError) as e: # For other business logic errors from service
         current_app.logger.warning(f"Edit auction business logic error for item {item_id}: {str(e)}")
         return jsonify({"error": str(e)}), 400
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Image exceeds the maximum upload size"}), 413
     except Exception as e:
         current_app.logger.error(f"Error editing auction item {item_id}: {str(e)}")
         return jsonify({"error": "Failed to edit auction item due to an internal error."}), 500
@@ -0,0 +1,26 @@
+from flask import Blueprint, current_app, g, jsonify
+
+from src.example.services.user_service_impl import UserServiceImpl
+from src.example.utils.decorators import manual_jwt_required
+from src.example.utils.mongo import health
+
+health_router = Blueprint('health', __name__)
+
+
+@health_router.route('/health', methods=['GET'])
+def get_health():
+    # Public probe: up or down only; pool counters and server addresses stay behind /health/details
+    ok = health(current_app)['ok']
+    return jsonify({"status": "ok" if ok else "degraded"}), 200 if ok else 503
+
+
+@health_router.route('/health/details', methods=['GET'])
+@manual_jwt_required
+def get_health_details(current_user_id):
+    principal = g.get('principal')
+    if principal is None or principal.user_id != current_user_id:
+        principal = UserServiceImpl.get_principal(current_user_id)
+    if not principal.is_admin:
+        return jsonify({"error": "Permission denied: Only admins can view health details."}), 403
+    mongo = health(current_app)
+    return jsonify({"status": "ok" if mongo['ok'] else "degraded", "mongo": mongo}), 200 if mongo['ok'] else 503
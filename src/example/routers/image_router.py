@@ -0,0 +1,46 @@
+import mimetypes
+import os
+import re
+
+from flask import Blueprint, current_app, send_from_directory, abort
+from werkzeug.security import safe_join
+
+image_router = Blueprint('image', __name__)
+
+# <sha256>.<ext> originals and their variants never change once written
+CONTENT_ADDRESSED = re.compile(r'^(?:variants/)?([0-9a-f]{64})(?:__[a-z]+)?\.(?:png|jpe?g|gif|webp)$')
+# "<uuid hex>_<secure_filename>" names written before uploads were content-addressed
+LEGACY_UPLOAD = re.compile(r'^[0-9a-f]{32}_[A-Za-z0-9_.-]+\.(?:png|jpe?g|gif)$', re.IGNORECASE)
+
+
+@image_router.route('/images/<path:filename>', methods=['GET'])
+def serve_image(filename):
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    match = CONTENT_ADDRESSED.match(filename)
+    if not match and not LEGACY_UPLOAD.match(filename):
+        abort(404)  # Temp uploads, tombstones, manifests and anything else in the folder are not served
+    accel_prefix = current_app.config.get('IMAGE_ACCEL_REDIRECT_PREFIX')
+
+    if accel_prefix:
+        # Let the front proxy (nginx internal location) serve the bytes
+        path = safe_join(upload_folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        response = current_app.response_class()
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{filename}"
+        response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    else:
+        # send_file hands the open file to the server's wsgi.file_wrapper (sendfile where supported)
+        # and answers Range and conditional requests itself
+        response = send_from_directory(
+            upload_folder, filename,
+            conditional=True,
+            etag=filename.replace('/', '-') if match else True
+        )
+        response.accept_ranges = 'bytes'
+
+    if match:
+        response.headers['Cache-Control'] = f"public, max-age={current_app.config['IMAGE_CACHE_MAX_AGE']}, immutable"
+    else:
+        response.headers['Cache-Control'] = f"public, max-age={current_app.config['IMAGE_MUTABLE_CACHE_MAX_AGE']}"
+    return response
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, render_template, current_app
+from flask import Blueprint, request, jsonify, render_template, current_app, Response, stream_with_context, url_for, send_file, g
 from werkzeug.exceptions import HTTPException
 
 from ..exceptions.auth_error import AuthError
@@ -7,12 +7,14 @@ from ..exceptions.is_not_admin_exception import IsNotAdmin
 from ..exceptions.validation_error import ValidationError
 from ..repositories.user_repository_impl import UserRepositoryImpl
 from ..services.user_service_impl import UserServiceImpl
+from ..services.report_job_service_impl import ReportJobServiceImpl
 from ..utils.decorators import manual_jwt_required # Updated import
 from ..models.user import User # For type hinting or direct use if needed
-from ..utils.token_util import decode_token
+from ..utils.report_writer import REPORT_FORMATS
 
 user_router = Blueprint('user', __name__, url_prefix='/api')
 user_service = UserServiceImpl()
+report_job_service = ReportJobServiceImpl()
 
 @user_router.route('/')
 def home():
@@ -27,9 +29,15 @@ def login():
     if not data:
         return jsonify({"error": "Invalid JSON data"}), 400
     try:
+        if current_app.config['JWT_STATELESS']:
+            tokens = user_service.login_with_refresh(data.get('username'), data.get('password'))
+            if tokens:
+                return jsonify(tokens), 200
+            return jsonify({"error": "Invalid credentials"}), 401
         token = user_service.login(data.get('username'), data.get('password'))
         if token:
             return jsonify({"token": token}), 200
+        return jsonify({"error": "Invalid credentials"}), 401
     except ValidationError as e:
         return jsonify({"error": str(e)}), 422
     except EntityNotFoundException as e:
@@ -38,6 +46,25 @@ def login():
         return jsonify({"error": str(e)}), 400
 
 
+@user_router.route('/token/refresh', methods=['POST'])
+def refresh_token():
+    data = request.get_json(silent=True) or {}
+    if not data.get('refresh_token'):
+        return jsonify({"error": "refresh_token is required"}), 400
+    try:
+        return jsonify(user_service.refresh_access_token(data['refresh_token'])), 200
+    except AuthError as e:
+        return jsonify({"error": str(e)}), 401
+
+
+def _principal(current_user_id):
+    """The acting user's Principal: from the token claims in stateless mode, otherwise from MongoDB."""
+    principal = g.get('principal')
+    if principal is not None and principal.user_id == current_user_id:
+        return principal
+    return user_service.get_principal(current_user_id)
+
+
 @user_router.route('/register', methods=['POST'])
 def register():
     if not request.is_json:
@@ -50,10 +77,36 @@ def register():
         user_service.register_user(user_data)
         return jsonify({"message": "User registered successfully"}), 201
     except ValidationError as e:
-        return jsonify({"error": e}), 422
+        return jsonify({"error": str(e)}), 422
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+@user_router.route('/users/import', methods=['POST'])
+@manual_jwt_required
+def import_users(current_user_id):
+    if not request.is_json:
+        return jsonify({"error": "Content-Type must be application/json"}), 415
+    try:
+        if not _principal(current_user_id).is_admin:
+            return jsonify({"error": "Admin privileges required"}), 403
+        users_data = request.get_json()
+        if isinstance(users_data, dict):
+            users_data = users_data.get('users')
+        if not isinstance(users_data, list):
+            return jsonify({"error": "Expected a list of users"}), 400
+        max_rows = current_app.config['USER_IMPORT_MAX_ROWS']
+        if len(users_data) > max_rows:
+            return jsonify({"error": f"At most {max_rows} users per import"}), 413
+        report = user_service.import_users(users_data, current_app.config['USER_IMPORT_HASH_WORKERS'])
+        return jsonify(report), 200
+    except EntityNotFoundException as e:
+        return jsonify({"error": str(e)}), 404
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.exception("User import failed")
+        return jsonify({"error": str(e)}), 500
+
 @user_router.route('/user/<user_id>', methods=['GET'])
 def get_user(user_id):
     try:
@@ -66,15 +119,13 @@ def get_user(user_id):
 @manual_jwt_required
 def block_user(current_user_id, target_user_id):
     try:
-        admin_user = UserRepositoryImpl.find_user_by_id(current_user_id)
-        if not admin_user:
+        try:
+            admin_user = _principal(current_user_id)
+        except EntityNotFoundException:
             return jsonify({"error": "Admin user performing action not found"}), 404
 
-        # Check if the admin_user has roles and then if they are an admin or super_admin
-        is_admin = admin_user.roles.get('is_admin', False) if hasattr(admin_user, 'roles') and admin_user.roles else False
-        is_super_admin = admin_user.roles.get('is_super_admin', False) if hasattr(admin_user, 'roles') and admin_user.roles else False
-
-        if not (is_admin or is_super_admin):
+        # is_admin also covers super admins
+        if not admin_user.is_admin:
             return jsonify({"error": "Permission denied: Only admin or super admin can block users."}), 403
         
         user_service.block_user(target_user_id) # user_service handles if target_user_id exists
@@ -92,15 +143,15 @@ def block_user(current_user_id, target_user_id):
 def create_admin(current_user_id):
     try:
         # Fetch the user object for the authenticated user (who is trying to create an admin)
-        acting_user = UserRepositoryImpl.find_user_by_id(current_user_id)
-        if not acting_user:
+        try:
+            acting_user = _principal(current_user_id)
+        except EntityNotFoundException:
             # This case should ideally be caught by decode_token if user_id is stale,
             # but as a safeguard if user is deleted after token generation / before this call.
             return jsonify({"error": "Authenticated user not found in database."}), 404
 
         # Check if the acting_user is a super_admin
-        is_super_admin = acting_user.roles.get('is_super_admin', False) if hasattr(acting_user, 'roles') and acting_user.roles else False
-        if not is_super_admin:
+        if not acting_user.is_super_admin:
             return jsonify({"error": "Permission denied: Only super_admin can create other admins."}), 403
 
         # Process request
@@ -123,98 +174,105 @@ def create_admin(current_user_id):
  
 @user_router.route('/auction_report', methods=['GET'])
 @manual_jwt_required
-def generate_auction_report():
+def generate_auction_report(current_user_id):
     try:
-        # Get token from header manually (compatible with your system)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Missing or invalid header"}), 401
-
-        token = auth_header.split()[1]
-        current_user_id = decode_token(token)  # Using your existing decode
-
-        # DEBUG: Print user ID and fetch full user
-        current_app.logger.debug(f"Attempting admin creation as user: {current_user_id}")
-        user = UserRepositoryImpl.find_user_by_id(current_user_id)
-
-        # DEBUG: Print user object and super admin status
-        current_app.logger.debug(f"User object: {user.to_dict() if user else None}")
-        current_app.logger.debug(f"Super admin status: {getattr(user, 'is_super_admin', None)}")
-        current_app.logger.debug(f"User data: {user.to_dict()}")
-        if not user:
+        current_app.logger.debug(f"Report requested by user: {current_user_id}")
+        try:
+            user = _principal(current_user_id)
+        except EntityNotFoundException:
             return jsonify({"error": "User not found"}), 404
 
         # Check permissions - EITHER superadmin OR admin
-        roles = getattr(user, 'roles', {})
-        is_authorized = roles.get('is_super_admin', False) or roles.get('is_admin', False)
-
-        if not is_authorized:
+        if not user.is_admin:
             current_app.logger.warning(f"Report access denied for user {user.user_id}")
             return jsonify({"error": "Admin privileges required"}), 403
 
-        # Generate report
-        report = user_service.generate_report()
-        return jsonify(report), 200
+        # Without an explicit export format, answer from the incrementally maintained rollups
+        fmt = request.args.get('format')
+        if fmt is None:
+            return jsonify(user_service.get_report_rollups()), 200
+        if fmt not in REPORT_FORMATS:
+            return jsonify({"error": f"Unsupported format, expected one of {sorted(REPORT_FORMATS)}"}), 400
+
+        if request.args.get('async', '').lower() in ('1', 'true'):
+            # Heavy export: run it on the report worker pool and let the client poll
+            job = report_job_service.submit_report(current_user_id, fmt)
+            return jsonify({
+                "job_id": job.job_id,
+                "status": job.status,
+                "status_url": url_for('user.get_report_job', job_id=job.job_id)
+            }), 202
+
+        # Stream the report; rows are encoded as they come off the aggregation cursor
+        report = user_service.generate_report(fmt)
+        response = Response(stream_with_context(report), mimetype=REPORT_FORMATS[fmt])
+        if fmt == 'csv':
+            response.headers['Content-Disposition'] = 'attachment; filename=auction_report.csv'
+        return response
     except AuthError as e:
         return jsonify({"error": str(e)}), 401
     except Exception as e:
         current_app.logger.exception("Report generation failed")
         return jsonify({"error": str(e)}), 500
 
+def _is_report_admin(user_id):
+    return _principal(user_id).is_admin
+
+
+@user_router.route('/reports/<job_id>', methods=['GET'])
+@manual_jwt_required
+def get_report_job(current_user_id, job_id):
+    try:
+        if not _is_report_admin(current_user_id):
+            return jsonify({"error": "Admin privileges required"}), 403
+        job = report_job_service.get_job(job_id)
+        body = job.to_dict()
+        if job.status == 'done':
+            body['download_url'] = url_for('user.download_report', job_id=job.job_id)
+        return jsonify(body), 200
+    except EntityNotFoundException as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        current_app.logger.error(f"Report job lookup failed: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@user_router.route('/reports/<job_id>/download', methods=['GET'])
+@manual_jwt_required
+def download_report(current_user_id, job_id):
+    try:
+        if not _is_report_admin(current_user_id):
+            return jsonify({"error": "Admin privileges required"}), 403
+        job, path = report_job_service.get_result_path(job_id)
+        return send_file(path, mimetype='application/gzip', as_attachment=True,
+                         download_name=f"auction_report.{job.format}.gz")
+    except EntityNotFoundException as e:
+        return jsonify({"error": str(e)}), 404
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 409
+    except FileNotFoundError:
+        return jsonify({"error": "Report file has expired"}), 410
+
+
 @user_router.route('/logout', methods=['POST'])
 @manual_jwt_required
-def logout():
+def logout(current_user_id):
     try:
-        # Get token from header manually (compatible with your system)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Missing or invalid header"}), 401
-
-        token = auth_header.split()[1]
-        current_user_id = decode_token(token)  # Using your existing decode
-
-        # DEBUG: Print user ID and fetch full user
-        current_app.logger.debug(f"Attempting admin creation as user: {current_user_id}")
-        user = UserRepositoryImpl.find_user_by_id(current_user_id)
-
-        # DEBUG: Print user object and super admin status
-        current_app.logger.debug(f"User object: {user.to_dict() if user else None}")
-        current_app.logger.debug(f"Super admin status: {getattr(user, 'is_super_admin', None)}")
-        current_app.logger.debug(f"User data: {user.to_dict()}")
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-        return jsonify(UserServiceImpl.logout(user.user_id)), 200
+        return jsonify(UserServiceImpl.logout(current_user_id)), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 @user_router.route('/users/<user_id>', methods=['DELETE'])
 @manual_jwt_required
-def delete_user(user_id):
+def delete_user(current_user_id, user_id):
     try:
-        # Get token from header manually (compatible with your system)
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({"error": "Missing or invalid header"}), 401
-
-        token = auth_header.split()[1]
-        current_user_id = decode_token(token)  # Using your existing decode
-
-        # DEBUG: Print user ID and fetch full user
-        current_app.logger.debug(f"Attempting admin creation as user: {current_user_id}")
-        user = UserRepositoryImpl.find_user_by_id(current_user_id)
-
-        # DEBUG: Print user object and super admin status
-        current_app.logger.debug(f"User object: {user.to_dict() if user else None}")
-        current_app.logger.debug(f"Super admin status: {getattr(user, 'is_super_admin', None)}")
-        current_app.logger.debug(f"User data: {user.to_dict()}")
-        if not user:
+        try:
+            user = _principal(current_user_id)
+        except EntityNotFoundException:
             return jsonify({"error": "User not found"}), 404
 
-        # PROPER Super admin check - looks in roles sub-document
-        is_super_admin = user.roles.get('is_super_admin', False) if hasattr(user, 'roles') else False
-
-        if not is_super_admin:
-            current_app.logger.warning(f"Admin creation denied for user {user.user_id}")
+        if not user.is_super_admin:
+            current_app.logger.warning(f"User deletion denied for user {user.user_id}")
             return jsonify({"error": "Super admin privileges required"}), 403
 
         UserServiceImpl.delete_user(user_id)
@@ -1,12 +1,13 @@
 from marshmallow import Schema, fields
-from flask import url_for
+from flask import url_for, current_app
 
-from example.schemas.bid_schema import BidSchema
+from example.schemas.bid_schema import BidSchema, ReferenceId
+from src.example.utils.image_variants import variant_urls
 
 
 class AuctionSchema(Schema):
     item_id = fields.Str(required=True)
-    seller_id = fields.Str(required=True)
+    seller_id = ReferenceId(required=True)
     starting_bid = fields.Float(required=True)
     bids = fields.List(fields.Nested(BidSchema()), default=list)
     item_description = fields.Str(required=True)
@@ -19,6 +20,10 @@ class AuctionSchema(Schema):
 
     def get_image_url(self, obj):
         if obj.image_filename:
-            # Assuming you will have a static endpoint for uploaded images
-            return url_for('static', filename=f'uploads/auction_images/{obj.image_filename}', _external=True)
+            # Map of thumbnail/card/detail (and WebP) URLs, all pointing at the original until generated
+            return variant_urls(
+                obj.image_filename,
+                current_app.config['UPLOAD_FOLDER'],
+                lambda filename: url_for('image.serve_image', filename=filename, _external=True)
+            )
         return None
\ No newline at end of file
@@ -1,7 +1,19 @@
+from bson import DBRef
 from marshmallow import Schema, fields, post_load
 
 
+class ReferenceId(fields.Str):
+    """Serializes a reference as the referenced document's id rather than its ``str()``."""
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        if isinstance(value, DBRef):
+            return str(value.id)
+        return str(getattr(value, 'pk', value))
+
+
 class BidSchema(Schema):
-    auction_id = fields.Str(required=True)
-    bidder_id = fields.Str(required=True)
-    bid_amount = fields.Float(required=True)
\ No newline at end of file
+    auction_id = ReferenceId(required=True)
+    bidder_id = ReferenceId(required=True)
+    bid_amount = fields.Float(required=True)
@@ -0,0 +1,119 @@
+"""
+Hand-written equivalents of AuctionSchema, BidSchema and UserSchema ``dump`` for raw
+pymongo documents. They skip mongoengine hydration and marshmallow's per-field dispatch
+and must produce exactly the same dicts; test_fast_serializers checks the parity.
+"""
+import json
+from urllib.parse import quote
+
+from flask import Response, current_app, has_request_context, request, url_for
+
+from src.example.utils.image_variants import variant_urls
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library encoder
+    orjson = None
+
+# Same characters werkzeug's path converter leaves unescaped when building image URLs
+_URL_SAFE = "!$&'()*+,/:;=@"
+_FILENAME_PLACEHOLDER = '__filename__'
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+def _bool(value):
+    return bool(value) if value is not None else None
+
+
+def _datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def _image_url_prefix():
+    url = url_for('image.serve_image', filename=_FILENAME_PLACEHOLDER, _external=True)
+    return url[:-len(_FILENAME_PLACEHOLDER)]
+
+
+def image_url_for(filename):
+    """
+    Absolute URL of an upload served by the image route. The prefix is resolved with
+    ``url_for`` once per request and kept on the request, so a listing does not build every
+    URL from scratch. It depends on the request's Host, so it is never shared between requests.
+    """
+    if not has_request_context():
+        return _image_url_prefix() + quote(filename, safe=_URL_SAFE)
+    prefix = getattr(request, 'image_url_prefix', None)
+    if prefix is None:
+        prefix = request.image_url_prefix = _image_url_prefix()
+    return prefix + quote(filename, safe=_URL_SAFE)
+
+
+def serialize_bid(bid):
+    return {
+        'auction_id': _str(bid.get('auction_id')),
+        'bidder_id': _str(bid.get('bidder_id')),
+        'bid_amount': _float(bid.get('bid_amount'))
+    }
+
+
+def serialize_auction(auction, bids_by_id, url_for_file=image_url_for):
+    """
+    ``auction`` is a raw auction document and ``bids_by_id`` maps bid ids to raw bid documents.
+    Bids that no longer exist serialize as ``{}``, as they do through the marshmallow schema.
+    """
+    image_filename = auction.get('image_filename')
+    bids = []
+    for bid_id in auction.get('bids') or []:
+        bid = bids_by_id.get(bid_id)
+        bids.append(serialize_bid(bid) if bid is not None else {})
+    return {
+        'item_id': _str(auction.get('item_id')),
+        'seller_id': _str(auction.get('seller_id')),
+        'starting_bid': _float(auction.get('starting_bid')),
+        'bids': bids,
+        'item_description': _str(auction.get('item_description')),
+        'item_title': _str(auction.get('item_title')),
+        'start_time': _datetime(auction.get('start_time')),
+        'end_time': _datetime(auction.get('end_time')),
+        'is_approved': _bool(auction.get('is_approved', False)),
+        'image_filename': _str(image_filename),
+        'image_url': variant_urls(
+            image_filename, current_app.config['UPLOAD_FOLDER'], url_for_file
+        ) if image_filename else None
+    }
+
+
+def serialize_auctions(auctions, bids_by_id, url_for_file=image_url_for):
+    return [serialize_auction(auction, bids_by_id, url_for_file) for auction in auctions]
+
+
+def serialize_user(user):
+    roles = user.get('roles')
+    return {
+        'user_id': _str(user.get('user_id')),
+        'email': _str(user.get('email')),
+        'password': _str(user.get('password')),
+        'username': _str(user.get('username')),
+        'roles': {str(key): _bool(value) for key, value in roles.items()} if roles is not None else None,
+        'created_at': _datetime(user.get('created_at')),
+        'is_blocked': _bool(user.get('is_blocked', False))
+    }
+
+
+def dump_json(payload):
+    """Compact, key-sorted JSON bytes, matching the output of ``jsonify``."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def json_response(body, status=200):
+    """Response for a payload already encoded with ``dump_json``."""
+    return Response(body, status=status, mimetype='application/json')
@@ -9,7 +9,27 @@ class AuctionService:
         pass
 
     @staticmethod
-    def list_items():
+    def get_auction_document(item_id, fresh=False):
+        pass
+
+    @staticmethod
+    def list_item_documents(page=None, per_page=None):
+        pass
+
+    @staticmethod
+    def get_auction_owner(item_id):
+        pass
+
+    @staticmethod
+    def get_auction_version(item_id):
+        pass
+
+    @staticmethod
+    def list_items(page=None, per_page=None):
+        pass
+
+    @staticmethod
+    def list_open_items(page, per_page):
         pass
 
     @staticmethod
@@ -1,21 +1,27 @@
 import os
-import uuid
-from werkzeug.utils import secure_filename
+from datetime import datetime
 from flask import current_app
 
 from werkzeug.exceptions import HTTPException
 
-from example.exceptions.auth_error import AuthError
-from example.exceptions.entity_not_found_exception import EntityNotFoundException
-from example.exceptions.validation_error import ValidationError
+from src.example.exceptions.auth_error import AuthError
+from src.example.exceptions.entity_not_found_exception import EntityNotFoundException
+from src.example.exceptions.validation_error import ValidationError
 from example.models.bid import Bid
-from example.repositories.bid_repository import BidRepository
 from src.example.models.auction import Auction
 from src.example.models.user import User
-from src.example.repositories.auction_repository import AuctionRepository
+from src.example.models.views import AuctionView, BidView
+from src.example.repositories.auction_repository_impl import AuctionRepositoryImpl
+from src.example.repositories.bid_repository_impl import BidRepositoryImpl
+from src.example.repositories.user_repository_impl import UserRepositoryImpl
 from src.example.schemas.auction_schema import AuctionSchema
 from src.example.services.auction_service import AuctionService
-from src.extensions import broadcast_new_bid # Import the broadcast function
+from src.example.utils.event_bus import AUCTION_CREATED, AUCTION_UPDATED, BID_PLACED, publish_write
+from src.example.utils.image_store import store_upload, release_image
+from src.example.utils.image_variants import schedule_variants
+from src.example.utils.mongo import PRIMARY, SECONDARY
+from src.example.utils.order_book import order_book
+from src.example.utils.upload_stream import CappedUploadStream
 
 
 class AuctionServiceImpl(AuctionService):
@@ -24,17 +30,34 @@ class AuctionServiceImpl(AuctionService):
         return '.' in filename and \
                filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
+    @staticmethod
+    def _on_variants_ready(filename):
+        # image_url now lists the variants: new versions move ETags and cached cards off the old URLs
+        for row in AuctionRepositoryImpl.bump_image_versions(filename):
+            publish_write(AUCTION_UPDATED, auction_id=str(row['_id']), item_id=row['item_id'],
+                          fields={'version', 'image_url'}, approval=None)
+
+    @staticmethod
+    def _seller_key(auction):
+        # Stored reference value, read without dereferencing the seller document
+        return auction.to_mongo().get('seller_id')
+
     @staticmethod
     def _save_auction_image(image_file):
-        if image_file and AuctionServiceImpl._allowed_file(image_file.filename):
-            filename = secure_filename(f"{uuid.uuid4().hex}_{image_file.filename}")
-            upload_folder = current_app.config['UPLOAD_FOLDER']
-            if not os.path.exists(upload_folder):
-                os.makedirs(upload_folder)
-            image_path = os.path.join(upload_folder, filename)
-            image_file.save(image_path)
-            return filename
-        return None
+        if not (image_file and AuctionServiceImpl._allowed_file(image_file.filename)):
+            return None
+        upload = image_file.stream
+        if not isinstance(upload, CappedUploadStream):
+            # Not parsed by UploadRequest (e.g. built by hand); stream it through the same checks
+            upload = CappedUploadStream.copy_from(
+                image_file.stream,
+                current_app.config['UPLOAD_FOLDER'],
+                current_app.config['MAX_IMAGE_UPLOAD_BYTES'],
+                current_app.config['ALLOWED_EXTENSIONS']
+            )
+        if not upload.finish():
+            raise ValidationError(upload.error)
+        return store_upload(upload) # Stored once per distinct content, reference counted
 
     @staticmethod
     def create_auction(auction_data, image_file=None):
@@ -60,66 +83,145 @@ class AuctionServiceImpl(AuctionService):
         # If it's an ID, it needs to be fetched: auction.seller_id = User.objects.get(id=validated_data['seller_id'])
         # This depends on how seller_id is passed and if User model is fully integrated here.
 
-        AuctionRepository.save_auction(auction)
+        try:
+            AuctionRepositoryImpl.save_auction(auction)
+        except Exception:
+            release_image(auction.image_filename) # Nothing will reference the stored image
+            raise
+        # Thumbnails are built off the request thread
+        schedule_variants(auction.image_filename, AuctionServiceImpl._on_variants_ready)
+        # Caches, rollups and websocket rooms follow the write through the event bus
+        publish_write(
+            AUCTION_CREATED, auction_id=str(auction.id), item_id=auction.item_id,
+            seller_id=AuctionServiceImpl._seller_key(auction), is_approved=auction.is_approved,
+            start_time=auction.start_time
+        )
         return auction # Return the created auction object
 
     @staticmethod
     def get_auction(item_id):
-        return AuctionRepository.find_auction_by_id(item_id)
+        return AuctionRepositoryImpl.find_auction_by_id(item_id)
+
+    @staticmethod
+    def get_auction_document(item_id, fresh=False):
+        """
+        Raw auction document plus its bids keyed by id, for the fast serializers. Catalog reads may
+        come from a secondary; ``fresh`` reads the primary, for responses to the caller's own writes.
+        """
+        read = PRIMARY if fresh else SECONDARY
+        auction = AuctionRepositoryImpl.find_auction_document(item_id, read=read)
+        return auction, BidRepositoryImpl.find_bid_documents(auction.get('bids') or [], read=read)
+
+    @staticmethod
+    def list_item_documents(page=None, per_page=None):
+        auctions = AuctionRepositoryImpl.find_auction_documents(page, per_page)
+        bid_ids = [bid_id for auction in auctions for bid_id in auction.get('bids') or []]
+        return auctions, BidRepositoryImpl.find_bid_documents(bid_ids, read=SECONDARY)
+
+    @staticmethod
+    def get_auction_owner(item_id):
+        """``user_id`` of the seller, read through two projected lookups instead of dereferencing."""
+        auction = AuctionRepositoryImpl.find_auction_fields(item_id, 'seller_id')
+        return UserRepositoryImpl.find_user_id_by_pk(auction.get('seller_id'))
 
     @staticmethod
-    def list_items():
-        return Auction.objects.all()
+    def get_auction_version(item_id):
+        return AuctionRepositoryImpl.find_auction_version(item_id)
+
+    @staticmethod
+    def list_items(page=None, per_page=None):
+        return AuctionRepositoryImpl.find_auction_documents(page, per_page)
+
+    @staticmethod
+    def list_open_items(page, per_page):
+        rows = AuctionRepositoryImpl.find_open_approved_auctions(datetime.utcnow(), page, per_page)
+        return [AuctionView.from_mongo(row) for row in rows]
 
     @staticmethod
     def edit_item(item_id: str, data: dict, image_file=None) -> None:
         auction_schema = AuctionSchema(partial=True) # Allow partial updates
         auction_data = auction_schema.load(data)
-        auction = AuctionRepository.find_auction_by_id(item_id)
+        auction = AuctionRepositoryImpl.find_auction_by_id(item_id)
         if not auction:
             raise EntityNotFoundException("Auction not found.")
 
-        for key, value in auction_data.items():
-            setattr(auction, key, value)
+        was_approved = auction.is_approved
+        # Only fields whose value changes are written; the change stream reads approval flips from them
+        changed = {key for key, value in auction_data.items() if getattr(auction, key) != value}
+        for key in changed:
+            setattr(auction, key, auction_data[key])
 
+        replaced_image, stored_image = None, None
         if image_file:
-            # Optionally, delete the old image if replacing
-            # if auction.image_filename:
-            #     old_image_path = os.path.join(current_app.config['UPLOAD_FOLDER'], auction.image_filename)
-            #     if os.path.exists(old_image_path):
-            #         os.remove(old_image_path)
-            
-            image_filename = AuctionServiceImpl._save_auction_image(image_file)
-            if image_filename:
-                auction.image_filename = image_filename
+            stored_image = AuctionServiceImpl._save_auction_image(image_file)
+            if stored_image:
+                replaced_image = auction.image_filename
+                auction.image_filename = stored_image
             else:
                 # Optional: Handle image saving failure
                 pass
 
-        auction.save()
+        if stored_image:
+            changed.add('image_filename')
+        try:
+            AuctionRepositoryImpl.update_auction(auction, changed)
+        except Exception:
+            release_image(stored_image) # The new image was referenced for this save only
+            raise
+        if image_file:
+            # The old file is only dropped from storage once no other auction references it
+            release_image(replaced_image)
+            schedule_variants(auction.image_filename, AuctionServiceImpl._on_variants_ready)
+        fields = changed | {'version'}
+        approval = (was_approved, auction.is_approved) if was_approved != auction.is_approved else None
+        publish_write(AUCTION_UPDATED, auction_id=str(auction.id), item_id=item_id, fields=fields, approval=approval)
 
     @staticmethod
     def approve_item(item_id):
-        auction = AuctionRepository.find_auction_by_id(item_id)
+        auction = AuctionRepositoryImpl.find_auction_by_id(item_id)
+        if auction.is_approved:
+            return  # Already approved: nothing to write, and no approval flip for the change stream to see
         auction.is_approved = True
-        auction.save()
+        AuctionRepositoryImpl.update_auction(auction, {'is_approved'})
+        publish_write(
+            AUCTION_UPDATED, auction_id=str(auction.id), item_id=item_id, fields={'is_approved', 'version'},
+            approval=(False, True)
+        )
 
     @staticmethod
     def place_bid(auction_id, user, bid_amount):
-        auction = AuctionRepository.find_auction_by_id(auction_id)
-        if bid_amount <= auction.starting_bid:
+        auction = AuctionRepositoryImpl.find_auction_fields(auction_id, 'starting_bid', 'is_approved', 'seller_id')
+        if bid_amount <= auction['starting_bid']:
             raise ValidationError("Bid must be higher than the starting bid.")
-        bid = Bid(auction_id=auction, bidder_id=user, bid_amount=bid_amount)
-        BidRepository.save_bid(bid)
-
-        # Broadcast the new bid via WebSocket
-        bid_data = {
-            'auction_id': str(auction.id), # Ensure ID is a string for JSON/JS
-            'new_price': float(bid.bid_amount), # Ensure price is a float
-            # Add other relevant data if needed (e.g., bidder name, time left)
-        }
-        broadcast_new_bid(auction_id=str(auction.id), bid_data=bid_data)
+        bid = Bid(auction_id=auction['_id'], bidder_id=user, bid_amount=bid_amount)
+        BidRepositoryImpl.save_bid(bid)
+        AuctionRepositoryImpl.record_bid(auction_id, bid.bid_amount)
+
+        # The order book, rollups and the WebSocket broadcast subscribe to BID_PLACED;
+        # the counters record_bid just bumped arrive as an auction update, as from the change stream
+        stored = BidView.from_mongo(bid.to_mongo())
+        publish_write(
+            BID_PLACED, bid_id=stored.bid_id, auction_id=stored.auction_id, item_id=auction_id,
+            bidder_id=stored.bidder_id, bid_amount=stored.bid_amount, seller_id=auction.get('seller_id'),
+            is_approved=auction.get('is_approved'), placed_at=datetime.utcnow()
+        )
+        publish_write(
+            AUCTION_UPDATED, auction_id=stored.auction_id, item_id=auction_id,
+            fields={'version', 'bid_count', 'current_bid'}, approval=None
+        )
 
     @staticmethod
     def view_bid_history(auction_id):
-        return BidRepository.find_bids_by_auction_id(auction_id)
\ No newline at end of file
+        """BidViews of the auction, highest first, served from the in-memory order book once loaded."""
+        bids = order_book.get(auction_id)
+        if bids is None:
+            # Loaded ladders are only appended to afterwards, so they must start complete: primary reads
+            token = order_book.begin_load(auction_id)  # A bid added during the read discards this load
+            try:
+                auction = AuctionRepositoryImpl.find_auction_fields(auction_id, '_id')
+                rows = BidRepositoryImpl.find_bids_by_auction_id(auction['_id'])
+            except Exception:
+                order_book.abort_load(auction_id)
+                raise
+            bids = order_book.load(auction_id, [BidView.from_mongo(row) for row in rows], token)
+        return bids
\ No newline at end of file
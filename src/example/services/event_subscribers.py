@@ -0,0 +1,77 @@
+from src.example.models.views import BidView
+from src.example.repositories.report_rollup_repository_impl import ReportRollupRepositoryImpl, auction_state
+from src.example.utils.catalog_cache import catalog_cache
+from src.example.utils.event_bus import AUCTION_CREATED, AUCTION_UPDATED, AUCTION_DELETED, BID_PLACED
+from src.example.utils.order_book import order_book
+from src.extensions import broadcast_new_bid
+
+
+def on_auction_created_cache(event):
+    catalog_cache.invalidate_all()  # A new auction shifts every listing page
+
+
+def on_auction_updated_cache(event):
+    if event.get('approval') or 'is_approved' in event['fields']:
+        catalog_cache.invalidate_all()  # Approval moves the auction in or out of the public listings
+    else:
+        catalog_cache.invalidate_auction(event['item_id'])
+
+
+def on_auction_deleted_cache(event):
+    catalog_cache.invalidate_all()
+    order_book.clear()  # Deletes only carry the _id, not the item_id ladders are keyed by
+
+
+def on_bid_placed_order_book(event):
+    order_book.add(event['item_id'], BidView(
+        bid_id=event['bid_id'], auction_id=event['auction_id'],
+        bidder_id=event['bidder_id'], bid_amount=event['bid_amount']
+    ))
+
+
+def on_bid_placed_broadcast(event):
+    # Rooms are joined by the auction's ObjectId string
+    broadcast_new_bid(auction_id=event['auction_id'], bid_data={
+        'auction_id': event['auction_id'],
+        'new_price': float(event['bid_amount'])
+    })
+
+
+def on_auction_created_rollup(event):
+    ReportRollupRepositoryImpl.record_auction_created(
+        event['seller_id'], auction_state(event['is_approved']), event['start_time']
+    )
+
+
+def on_auction_updated_rollup(event):
+    if event.get('approval'):
+        old, new = event['approval']
+        ReportRollupRepositoryImpl.record_state_change(event['auction_id'], auction_state(old), auction_state(new))
+
+
+def on_bid_placed_rollup(event):
+    ReportRollupRepositoryImpl.record_bid(
+        event['seller_id'], auction_state(event['is_approved']), event['bid_amount'], event['placed_at']
+    )
+
+
+def reset_caches():
+    """Drops every cached page and ladder, for when change events may have been missed."""
+    catalog_cache.invalidate_all()
+    order_book.clear()
+
+
+def register_subscribers(bus, rollups=True):
+    """
+    Subscribes the in-process caches, websocket fan-out and, when ``rollups`` is set, the
+    report rollups. Rollups live in MongoDB, so exactly one consumer may maintain them.
+    """
+    bus.subscribe(AUCTION_CREATED, on_auction_created_cache)
+    bus.subscribe(AUCTION_UPDATED, on_auction_updated_cache)
+    bus.subscribe(AUCTION_DELETED, on_auction_deleted_cache)
+    bus.subscribe(BID_PLACED, on_bid_placed_order_book)
+    bus.subscribe(BID_PLACED, on_bid_placed_broadcast)
+    if rollups:
+        bus.subscribe(AUCTION_CREATED, on_auction_created_rollup)
+        bus.subscribe(AUCTION_UPDATED, on_auction_updated_rollup)
+        bus.subscribe(BID_PLACED, on_bid_placed_rollup)
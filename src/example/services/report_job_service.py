@@ -0,0 +1,21 @@
+
+class ReportJobService:
+    @staticmethod
+    def submit_report(requested_by, fmt):
+        pass
+
+    @staticmethod
+    def get_job(job_id):
+        pass
+
+    @staticmethod
+    def get_result_path(job_id):
+        pass
+
+    @staticmethod
+    def cleanup_expired():
+        pass
+
+    @staticmethod
+    def fail_stale_jobs():
+        pass
@@ -0,0 +1,130 @@
+import gzip
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from src.example.exceptions.validation_error import ValidationError
+from src.example.models.auction import Auction
+from src.example.models.report_job import ReportJob
+from src.example.repositories.auction_repository_impl import AuctionRepositoryImpl, REPORT_COLUMNS
+from src.example.repositories.report_job_repository_impl import ReportJobRepositoryImpl
+from src.example.services.report_job_service import ReportJobService
+from src.example.utils.report_writer import stream_rows, REPORT_FORMATS
+
+PROGRESS_EVERY_ROWS = 1000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-jobs')
+        return _executor
+
+
+class ReportJobServiceImpl(ReportJobService):
+    """
+    Runs heavy report exports on a small local thread pool instead of a web worker.
+    Job state lives in MongoDB so any worker can answer status polls; results are
+    gzip files in REPORT_FOLDER that expire after REPORT_JOB_TTL_SECONDS.
+    """
+
+    @staticmethod
+    def submit_report(requested_by, fmt):
+        if fmt not in REPORT_FORMATS:
+            raise ValidationError(f"Unsupported format, expected one of {sorted(REPORT_FORMATS)}")
+        ReportJobServiceImpl.cleanup_expired()
+        ReportJobServiceImpl.fail_stale_jobs()
+        app = current_app._get_current_object()
+        job = ReportJob(
+            job_id=uuid.uuid4().hex,
+            requested_by=str(requested_by),
+            format=fmt,
+            total_rows=Auction._get_collection().estimated_document_count(),
+            expires_at=datetime.utcnow() + timedelta(seconds=app.config['REPORT_JOB_TTL_SECONDS'])
+        )
+        ReportJobRepositoryImpl.save_job(job)
+        _get_executor(app.config['REPORT_JOB_WORKERS']).submit(ReportJobServiceImpl._run, app, job.job_id, fmt)
+        return job
+
+    @staticmethod
+    def _run(app, job_id, fmt):
+        with app.app_context():
+            report_folder = app.config['REPORT_FOLDER']
+            os.makedirs(report_folder, exist_ok=True)
+            filename = f"{job_id}.{fmt}.gz"
+            temp_path = os.path.join(report_folder, f".{filename}.part")
+            ReportJobRepositoryImpl.update_job(job_id, status='running')
+            try:
+                counter = {'rows': 0}
+
+                def counted(rows):
+                    for row in rows:
+                        yield row
+                        counter['rows'] += 1
+                        if counter['rows'] % PROGRESS_EVERY_ROWS == 0:
+                            ReportJobRepositoryImpl.update_job(job_id, rows_written=counter['rows'])
+
+                rows = counted(AuctionRepositoryImpl.aggregate_report())
+                with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=6) as out:
+                    for chunk in stream_rows(rows, fmt, REPORT_COLUMNS):
+                        out.write(chunk)
+                os.replace(temp_path, os.path.join(report_folder, filename))
+                ReportJobRepositoryImpl.update_job(
+                    job_id, status='done', rows_written=counter['rows'], filename=filename,
+                    finished_at=datetime.utcnow()
+                )
+            except Exception as e:
+                app.logger.exception(f"Report job {job_id} failed")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                ReportJobRepositoryImpl.update_job(job_id, status='failed', error=str(e), finished_at=datetime.utcnow())
+
+    @staticmethod
+    def get_job(job_id):
+        ReportJobServiceImpl.fail_stale_jobs()
+        return ReportJobRepositoryImpl.find_job_by_id(job_id)
+
+    @staticmethod
+    def get_result_path(job_id):
+        job = ReportJobRepositoryImpl.find_job_by_id(job_id)
+        if job.status != 'done' or not job.filename:
+            raise ValidationError("Report is not ready yet")
+        return job, os.path.join(current_app.config['REPORT_FOLDER'], job.filename)
+
+    @staticmethod
+    def cleanup_expired():
+        """Deletes result files older than the TTL; expired job records are removed by the TTL index."""
+        report_folder = current_app.config['REPORT_FOLDER']
+        if not os.path.isdir(report_folder):
+            return 0
+        cutoff = time.time() - current_app.config['REPORT_JOB_TTL_SECONDS']
+        removed = 0
+        with os.scandir(report_folder) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        continue  # A concurrent cleanup got there first
+                    removed += 1
+        return removed
+
+    @staticmethod
+    def fail_stale_jobs():
+        """
+        Fails jobs whose worker stopped writing progress for REPORT_JOB_TIMEOUT_SECONDS, such as
+        jobs left queued or running by a process that died, so polls do not wait on them forever.
+        """
+        timeout = current_app.config['REPORT_JOB_TIMEOUT_SECONDS']
+        return ReportJobRepositoryImpl.fail_stale_jobs(
+            datetime.utcnow() - timedelta(seconds=timeout), f"No progress for {timeout} seconds; the report worker stopped"
+        )
@@ -4,14 +4,29 @@ class UserService:
     def register_user(user_data):
         pass
 
+    @staticmethod
+    def import_users(users_data, hash_workers=0):
+        pass
+
     @staticmethod
     def get_user(user_id):
         pass
 
+    @staticmethod
+    def get_principal(user_id):
+        pass
+
     @staticmethod
     def login(username, password):
        pass
 
+    @staticmethod
+    def login_with_refresh(username, password):
+        pass
+
+    @staticmethod
+    def refresh_access_token(refresh_token):
+        pass
 
     @staticmethod
     def block_user(user_id):
@@ -22,9 +37,13 @@ class UserService:
         pass
 
     @staticmethod
-    def generate_report():
+    def generate_report(fmt='json'):
        pass
 
+    @staticmethod
+    def get_report_rollups():
+        pass
+
     @staticmethod
     def logout(user_id):
         pass
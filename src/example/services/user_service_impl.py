@@ -1,11 +1,34 @@
+from datetime import datetime, timedelta
+
+from mongoengine import NotUniqueError
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from example.models.user import User
-from src.example.models.auction import Auction
+from src.example.exceptions.auth_error import AuthError
+from src.example.exceptions.entity_not_found_exception import EntityNotFoundException
+from src.example.exceptions.validation_error import ValidationError
+from src.example.models.views import Principal
+from src.example.repositories.auction_repository_impl import AuctionRepositoryImpl, REPORT_COLUMNS
+from src.example.repositories.report_rollup_repository_impl import ReportRollupRepositoryImpl
 from src.example.repositories.user_repository_impl import UserRepositoryImpl
+from src.example.schemas.fast_serializers import serialize_user
 from src.example.schemas.user_schema import UserSchema
 from src.example.services.user_service import UserService
-from src.example.utils.token_util import generate_token
+from src.example.utils.password_hashing import hash_passwords
+from src.example.utils.registration_filter import registration_filter
+from src.example.utils.report_writer import stream_rows
+from src.example.utils.token_revocation import revocation_registry
+from src.example.utils.token_util import (
+    REFRESH, access_token_lifetime, generate_refresh_token, generate_token, verify_token
+)
+
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _token_lifetime_end():
+    """When every token issued until now has expired, so a revocation no longer needs to be kept."""
+    return datetime.utcnow() + timedelta(seconds=access_token_lifetime())
 
 
 class UserServiceImpl(UserService):
@@ -13,32 +36,134 @@ class UserServiceImpl(UserService):
     def register_user(user_data):
         user_schema = UserSchema()
         validated_data = user_schema.load(user_data)
+        username, email = validated_data['username'], validated_data['email']
+        # A filter hit is confirmed with one indexed lookup, before paying for the password hash
+        if registration_filter.maybe_taken(username, email):
+            taken = UserRepositoryImpl.find_taken_fields(username, email)
+            if taken:
+                raise ValidationError(f"User with this {' and '.join(taken)} already exists")
         user = User(**validated_data)
         user.password = generate_password_hash(user.password)
-        UserRepositoryImpl.save_user(user)
+        try:
+            UserRepositoryImpl.save_user(user)
+        except NotUniqueError as e:
+            fields = UserServiceImpl._duplicate_fields(e, username, email)
+            # Only values that are really registered go into the filter; a user_id clash frees both
+            registration_filter.add(username if 'username' in fields else None, email if 'email' in fields else None)
+            raise ValidationError(f"User with this {' and '.join(fields)} already exists")
+        registration_filter.add(username, email)
+
+    @staticmethod
+    def _duplicate_fields(error, username, email):
+        """Fields of the unique index behind ``error``, looked up when the driver error does not name them."""
+        details = getattr(error.__cause__, 'details', None) or {}
+        if details.get('keyValue'):
+            return sorted(details['keyValue'])
+        return UserRepositoryImpl.find_taken_fields(username, email) or ['user_id']
+
+    @staticmethod
+    def import_users(users_data, hash_workers=0):
+        """
+        Registers a batch of users. Rows are validated together, valid passwords are hashed
+        across ``hash_workers`` processes and the users are inserted in one unordered bulk write.
+        Returns a summary and a per-row status: created, invalid (with the schema errors) or
+        duplicate (with the conflicting fields), in the order of ``users_data``.
+        """
+        if not isinstance(users_data, list):
+            raise ValidationError("Expected a list of users")
+        user_schema = UserSchema(many=True)
+        errors = user_schema.validate(users_data)
+        valid_rows = [index for index in range(len(users_data)) if index not in errors]
+        validated = user_schema.load([users_data[index] for index in valid_rows])
+        hashes = hash_passwords((data['password'] for data in validated), hash_workers)
+        documents = []
+        for data, password_hash in zip(validated, hashes):
+            user = User(**data)
+            user.password = password_hash
+            documents.append(user.to_mongo().to_dict())
+        inserted, write_errors = UserRepositoryImpl.insert_users(documents)
+        failed = {write_error['index']: write_error for write_error in write_errors}
+        for position, document in enumerate(documents):
+            write_error = failed.get(position)
+            if write_error is None:
+                registration_filter.add(document['username'], document['email'])
+            elif write_error['code'] == DUPLICATE_KEY_ERROR:
+                # Only the clashing values are registered; a user_id clash leaves both free
+                taken = write_error.get('keyValue') or {}
+                registration_filter.add(taken.get('username'), taken.get('email'))
+
+        results = [{'row': index, 'status': 'created'} for index in range(len(users_data))]
+        for index, messages in errors.items():
+            results[index] = {'row': index, 'status': 'invalid', 'errors': messages}
+        for write_error in write_errors:
+            index = valid_rows[write_error['index']]
+            if write_error['code'] == DUPLICATE_KEY_ERROR:
+                results[index] = {'row': index, 'status': 'duplicate',
+                                  'fields': sorted(write_error.get('keyValue') or {})}
+            else:
+                results[index] = {'row': index, 'status': 'failed', 'error': write_error.get('errmsg')}
+        summary = {'created': inserted, 'invalid': 0, 'duplicate': 0, 'failed': 0}
+        for result in results:
+            if result['status'] != 'created':
+                summary[result['status']] += 1
+        return {'summary': summary, 'results': results}
 
     @staticmethod
     def get_user(user_id):
-        user = UserRepositoryImpl.find_user_by_id(user_id)
+        user = UserRepositoryImpl.find_user_document(user_id)
         if user:
-            return UserSchema().dump(user)  # Proper serialization
+            return serialize_user(user)  # Same output as UserSchema().dump, without hydrating a User
         return None
 
+    @staticmethod
+    def get_principal(user_id):
+        """Principal for permission checks, read with a projection instead of loading the User."""
+        return Principal.from_mongo(UserRepositoryImpl.find_user_fields(
+            user_id, 'user_id', 'username', 'roles', 'is_blocked', 'token_version'
+        ))
+
     @staticmethod
     def login(username, password):
         user = UserRepositoryImpl.find_user_by_username(username)
-        if user and check_password_hash(user.password, password):
+        if user and not user.is_blocked and check_password_hash(user.password, password):
             try:
                 return generate_token(user)
             except Exception as e:
                 return f"Token generation failed: {str(e)}"
         return None
 
+    @staticmethod
+    def login_with_refresh(username, password):
+        """Short-lived access token with role claims plus a refresh token, for stateless mode."""
+        user = UserRepositoryImpl.find_user_by_username(username)
+        if user and not user.is_blocked and check_password_hash(user.password, password):
+            return {
+                'token': generate_token(user),
+                'refresh_token': generate_refresh_token(user),
+                'expires_in': access_token_lifetime()
+            }
+        return None
+
+    @staticmethod
+    def refresh_access_token(refresh_token):
+        """New access token for a refresh token; the only stateless-mode step that reads the user."""
+        payload = verify_token(refresh_token, REFRESH)
+        try:
+            user = UserRepositoryImpl.find_user_by_id(payload.get('user_id'))
+        except EntityNotFoundException:
+            raise AuthError("User not found")
+        if user.is_blocked:
+            raise AuthError("User is blocked")
+        if payload.get('version') != user.token_version:
+            raise AuthError("Token invalidated")
+        return {'token': generate_token(user), 'expires_in': access_token_lifetime()}
+
     @staticmethod
     def block_user(user_id):
         user = UserRepositoryImpl.find_user_by_id(user_id)
         user.is_blocked = True
         user.save()
+        revocation_registry.revoke(user.user_id, blocked=True)  # Blocked users cannot log in again
 
     @staticmethod
     def create_admin_account(user_data):
@@ -48,19 +173,34 @@ class UserServiceImpl(UserService):
         UserRepositoryImpl.save_user(user)
 
     @staticmethod
-    def generate_report():
-        auctions = Auction.objects.all()
-        return [auctions.to_dict() for auction in auctions]
+    def generate_report(fmt='json'):
+        """Generator of encoded report chunks; rows stream from the aggregation cursor."""
+        rows = AuctionRepositoryImpl.aggregate_report()
+        return stream_rows(rows, fmt, REPORT_COLUMNS)
+
+    @staticmethod
+    def get_report_rollups():
+        """Pre-aggregated report; ``generated_at`` is the time of the most recent rollup update."""
+        rollups = {'day': [], 'seller': [], 'state': []}
+        generated_at = None
+        for rollup in ReportRollupRepositoryImpl.find_all():
+            rollups[rollup.dimension].append(rollup.to_dict())
+            if rollup.updated_at and (generated_at is None or rollup.updated_at > generated_at):
+                generated_at = rollup.updated_at
+        return {'generated_at': generated_at.isoformat() if generated_at else None, 'rollups': rollups}
 
     @staticmethod
     def logout(user_id):
-        UserRepositoryImpl.invalidate_token(user_id)
+        token_version = UserRepositoryImpl.invalidate_token(user_id)
+        revocation_registry.revoke(user_id, min_version=token_version, expires_at=_token_lifetime_end())
         return {"message": "Logged out successfully"}
 
     @staticmethod
     def delete_user(target_user_id):
         try:
-            UserRepositoryImpl.delete_user(target_user_id)
+            user_id = UserRepositoryImpl.delete_user(target_user_id)
+            if user_id:
+                revocation_registry.revoke(user_id, blocked=True, expires_at=_token_lifetime_end())
             return {"message": "User deleted successfully"}
         except ValueError as e:
             return f"Value error: {str(e)}"
@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+from bson import ObjectId
+
+from src.example.models.auction import Auction
+from src.example.models.bid import Bid
+from src.example.utils.mongo import SECONDARY, routed_collection
+
+STATE_FILENAME = '_export_state.json'
+FORMAT_EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow'}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401  (registers pyarrow.parquet)
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("Columnar export needs pyarrow: pip install pyarrow")
+
+
+def _export_specs(pa):
+    """Projection and Arrow schema per collection; fixed schemas keep every chunk compatible."""
+    timestamp = pa.timestamp('ms')
+    return {
+        'auction': (Auction, pa.schema([
+            ('_id', pa.string()), ('item_id', pa.string()), ('seller_id', pa.string()),
+            ('item_title', pa.string()), ('starting_bid', pa.float64()), ('current_bid', pa.float64()),
+            ('bid_count', pa.int64()), ('is_approved', pa.bool_()), ('start_time', timestamp),
+            ('end_time', timestamp), ('image_filename', pa.string()), ('version', pa.int64())
+        ])),
+        'bid': (Bid, pa.schema([
+            ('_id', pa.string()), ('auction_id', pa.string()), ('bidder_id', pa.string()),
+            ('bid_amount', pa.float64()), ('created_at', timestamp)
+        ]))
+    }
+
+
+def _load_state(out_dir):
+    path = os.path.join(out_dir, STATE_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILENAME)
+    with open(f"{path}.part", 'w') as f:
+        json.dump(state, f)
+    os.replace(f"{path}.part", path)
+
+
+def _to_column_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _write_chunk(pa, table, path, fmt):
+    temp_path = f"{path}.part"
+    if fmt == 'parquet':
+        pa.parquet.write_table(table, temp_path, compression='zstd')
+    else:
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        with pa.OSFile(temp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+
+def export_collection(name, out_dir, fmt='parquet', chunk_rows=50000, full=False, log=print):
+    """
+    Exports documents of ``name`` with ``_id`` above the stored watermark into numbered chunk
+    files under ``out_dir/name``. The watermark advances after each chunk is renamed into place,
+    so an interrupted export resumes where it stopped and nightly runs only read new documents.
+    Reads follow the secondary routing of the catalog, through a batched, projected cursor.
+
+    The watermark is the ``_id``, so only inserts are picked up: a chunk keeps each document as
+    it was when exported, and later edits, bids on an exported auction or deletes never reach
+    it. ``full`` re-exports the current state of the whole collection into a fresh directory
+    that replaces ``out_dir/name`` (and its watermark) only once it is complete.
+    """
+    pa = _require_pyarrow()
+    model, schema = _export_specs(pa)[name]
+    collection_dir = os.path.join(out_dir, name)
+    state = _load_state(out_dir)
+    if full:
+        state.pop(name, None)
+        target_dir = f"{collection_dir}.full"
+        shutil.rmtree(target_dir, ignore_errors=True)  # Left over from an interrupted full export
+    else:
+        target_dir = collection_dir
+    os.makedirs(target_dir, exist_ok=True)
+    watermark = state.get(name)
+
+    query = {'_id': {'$gt': ObjectId(watermark)}} if watermark else {}
+    projection = {field: 1 for field in schema.names if field not in ('_id', 'created_at')}
+    cursor = routed_collection(model, SECONDARY).find(query, projection, batch_size=min(chunk_rows, 10000)).sort('_id', 1)
+
+    # A full export keeps its watermark in memory until the new directory is in place
+    save_state = None if full else _save_state
+    exported = 0
+    columns = {field: [] for field in schema.names}
+    for document in cursor:
+        for field in schema.names:
+            if field == 'created_at':
+                columns[field].append(document['_id'].generation_time.replace(tzinfo=None))
+            else:
+                columns[field].append(_to_column_value(document.get(field)))
+        if len(columns['_id']) >= chunk_rows:
+            exported += _flush_chunk(pa, schema, columns, target_dir, name, fmt, out_dir, state, save_state)
+            log(f"{name}: exported {exported} documents")
+    if columns['_id']:
+        exported += _flush_chunk(pa, schema, columns, target_dir, name, fmt, out_dir, state, save_state)
+    if full:
+        _replace_dir(target_dir, collection_dir)
+        _save_state(out_dir, state)
+    return exported
+
+
+def _replace_dir(new_dir, old_dir):
+    retired = f"{old_dir}.old"
+    shutil.rmtree(retired, ignore_errors=True)
+    if os.path.exists(old_dir):
+        os.rename(old_dir, retired)
+    os.rename(new_dir, old_dir)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+def _flush_chunk(pa, schema, columns, collection_dir, name, fmt, out_dir, state, save_state=_save_state):
+    last_id = columns['_id'][-1]
+    table = pa.Table.from_pydict(columns, schema=schema)
+    # Chunks only appear under their final name once complete, so readers never see partial files
+    path = os.path.join(collection_dir, f"part-{columns['_id'][0]}-{last_id}.{FORMAT_EXTENSIONS[fmt]}")
+    _write_chunk(pa, table, path, fmt)
+    state[name] = last_id
+    state[f"{name}_exported_at"] = datetime.utcnow().isoformat()
+    if save_state:
+        save_state(out_dir, state)
+    rows = len(columns['_id'])
+    for values in columns.values():
+        values.clear()
+    return rows
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CatalogCache:
+    """
+    LRU cache for serialized auction listing pages.
+
+    Every entry remembers which auctions it contains, so a change to one auction
+    (an edit or a bid) only drops the pages that show it. Changes that can move
+    auctions in or out of a listing (creation, approval) drop everything.
+
+    Pages are read from secondaries, which may not have a write yet when the write drops
+    the page; ``max_age`` seconds bounds how long such a refill can be served.
+
+    A fill takes a token from ``begin_fill`` before reading the page and hands it to ``put``.
+    The put is dropped if any auction on the page, or the whole cache, was invalidated in
+    between, so a read that raced a write cannot store the page the write just dropped.
+    """
+    max_tracked_invalidations = 4096
+
+    def __init__(self, max_entries=256, max_age=None):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()  # key -> (value, item_ids, stored_at)
+        self._pages_by_item = {}  # item_id -> set of keys
+        self._generation = 0  # Bumped by every invalidation
+        self._invalidated = OrderedDict()  # item_id -> generation of its latest invalidation, oldest first
+        self._floor = 0  # Tokens below this are refused: an invalidate_all or a forgotten invalidation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_fills = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.max_age and time.monotonic() - entry[2] > self.max_age:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def begin_fill(self):
+        """Token for a fill about to read a page from the database; pass it to ``put``."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key, value, item_ids, token=None):
+        """Stores a page; returns False if ``token`` shows it was invalidated while it was read."""
+        item_ids = frozenset(item_ids)
+        with self._lock:
+            if token is not None and (token < self._floor or
+                                      any(self._invalidated.get(item_id, -1) > token for item_id in item_ids)):
+                self.stale_fills += 1
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, item_ids, time.monotonic())
+            for item_id in item_ids:
+                self._pages_by_item.setdefault(item_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate_auction(self, item_id):
+        with self._lock:
+            for key in list(self._pages_by_item.get(item_id, ())):
+                self._remove(key)
+            self._generation += 1
+            self._invalidated[item_id] = self._generation
+            self._invalidated.move_to_end(item_id)
+            while len(self._invalidated) > self.max_tracked_invalidations:
+                _, generation = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, generation)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._entries.clear()
+            self._pages_by_item.clear()
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'max_age': self.max_age,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'stale_fills': self.stale_fills
+            }
+
+    def _remove(self, key):
+        _, item_ids, _ = self._entries.pop(key)
+        for item_id in item_ids:
+            keys = self._pages_by_item.get(item_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._pages_by_item[item_id]
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,151 @@
+import threading
+
+from mongoengine.connection import get_db
+from pymongo.errors import OperationFailure, PyMongoError
+
+from src.example.repositories.auction_repository_impl import AuctionRepositoryImpl
+from src.example.services.event_subscribers import reset_caches
+from src.example.utils.event_bus import AUCTION_CREATED, AUCTION_UPDATED, AUCTION_DELETED, BID_PLACED
+
+WATCHED_COLLECTIONS = ('auction', 'bid')
+# Server errors meaning the resume token is no longer in the oplog: CappedPositionLost,
+# ChangeStreamFatalError, ChangeStreamHistoryLost. Resuming from it can never succeed.
+HISTORY_LOST_CODES = frozenset({136, 280, 286})
+
+
+def _id_str(value):
+    return str(value) if value is not None else None
+
+
+class MongoChangeSource:
+    """Change stream over the watched collections of a database; needs a replica set or sharded cluster."""
+
+    def __init__(self, database):
+        self.database = database
+
+    def watch(self, resume_after=None):
+        pipeline = [{'$match': {
+            'ns.coll': {'$in': list(WATCHED_COLLECTIONS)},
+            'operationType': {'$in': ['insert', 'update', 'replace', 'delete']}
+        }}]
+        return self.database.watch(pipeline, full_document='updateLookup', resume_after=resume_after)
+
+
+class ChangeStreamConsumer:
+    """
+    Turns change events on ``auction`` and ``bid`` into event bus topics, so writes made by any
+    worker, script or admin tool reach this process's caches and websocket rooms. The resume
+    token of the last handled event is kept, and a dropped stream is reopened from it. If that
+    token has fallen out of the oplog, the stream restarts from now and ``on_history_lost`` is
+    called to drop whatever the missed events should have invalidated. An event that fails to
+    be handled is logged and skipped.
+    """
+
+    def __init__(self, bus, source, find_auction=None, retry_seconds=2.0, logger=None, on_history_lost=None):
+        self.bus = bus
+        self.source = source
+        self.on_history_lost = on_history_lost
+        self.find_auction = find_auction or (
+            lambda pk: AuctionRepositoryImpl.find_auction_fields_by_pk(pk, 'item_id', 'seller_id', 'is_approved')
+        )
+        self.retry_seconds = retry_seconds
+        self.logger = logger
+        self.resume_token = None
+
+    def handle(self, change):
+        collection = change['ns']['coll']
+        operation = change['operationType']
+        if collection == 'auction':
+            self._handle_auction(operation, change)
+        elif collection == 'bid' and operation == 'insert':
+            self._handle_bid(change['fullDocument'])
+        self.resume_token = change['_id']
+
+    def _handle_auction(self, operation, change):
+        auction_id = str(change['documentKey']['_id'])
+        if operation == 'delete':
+            self.bus.publish(AUCTION_DELETED, auction_id=auction_id)
+            return
+        document = change.get('fullDocument')
+        if document is None:
+            return  # Deleted before the lookup; its delete event follows
+        if operation == 'insert':
+            self.bus.publish(
+                AUCTION_CREATED, auction_id=auction_id, item_id=document['item_id'],
+                seller_id=document.get('seller_id'), is_approved=document.get('is_approved', False),
+                start_time=document.get('start_time')
+            )
+            return
+        if operation == 'replace':
+            fields, approval = set(document), None
+        else:
+            description = change.get('updateDescription') or {}
+            updated = description.get('updatedFields') or {}
+            fields = {name.split('.')[0] for name in list(updated) + list(description.get('removedFields') or [])}
+            # The app only $sets fields whose value changes (AuctionServiceImpl.edit_item / approve_item), so a
+            # new is_approved implies the opposite old one. Writes made outside the app must do the same.
+            approval = (not updated['is_approved'], updated['is_approved']) if 'is_approved' in updated else None
+        self.bus.publish(AUCTION_UPDATED, auction_id=auction_id, item_id=document['item_id'],
+                         fields=fields, approval=approval)
+
+    def _handle_bid(self, bid):
+        auction = self.find_auction(bid.get('auction_id'))
+        if auction is None:
+            return
+        self.bus.publish(
+            BID_PLACED, bid_id=str(bid['_id']), auction_id=str(auction['_id']), item_id=auction['item_id'],
+            bidder_id=_id_str(bid.get('bidder_id')), bid_amount=bid.get('bid_amount'),
+            seller_id=auction.get('seller_id'), is_approved=auction.get('is_approved', False),
+            placed_at=bid['_id'].generation_time.replace(tzinfo=None)
+        )
+
+    def consume(self, stream, stop_event=None):
+        for change in stream:
+            try:
+                self.handle(change)
+            except Exception:
+                if self.logger:
+                    self.logger.exception(f"Change event {change.get('_id')} could not be handled, skipping it")
+                self.resume_token = change['_id']
+            if stop_event is not None and stop_event.is_set():
+                return
+
+    def run(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                with self.source.watch(self.resume_token) as stream:
+                    self.consume(stream, stop_event)
+            except OperationFailure as e:
+                if e.code not in HISTORY_LOST_CODES:
+                    self._interrupted(e, stop_event)
+                    continue
+                if self.logger:
+                    self.logger.error(
+                        f"Change stream history lost, restarting from now and resetting caches "
+                        f"(run 'flask rebuild-rollups' if this node maintains rollups): {str(e)}"
+                    )
+                self.resume_token = None
+                if self.on_history_lost:
+                    self.on_history_lost()
+            except PyMongoError as e:
+                self._interrupted(e, stop_event)
+
+    def _interrupted(self, error, stop_event):
+        if self.logger:
+            self.logger.warning(f"Change stream interrupted, resuming in {self.retry_seconds}s: {str(error)}")
+        stop_event.wait(self.retry_seconds)
+
+
+def start_change_stream(app, bus):
+    """Runs a ChangeStreamConsumer for the default database in a daemon thread."""
+    stop_event = threading.Event()
+
+    def run():
+        with app.app_context():
+            consumer = ChangeStreamConsumer(bus, MongoChangeSource(get_db()), logger=app.logger,
+                                            on_history_lost=reset_caches)
+            consumer.run(stop_event)
+
+    thread = threading.Thread(target=run, name='change-stream', daemon=True)
+    thread.start()
+    return thread, stop_event
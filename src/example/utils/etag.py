@@ -0,0 +1,28 @@
+import hashlib
+
+from flask import request, current_app
+
+
+def auction_etag(item_id, version):
+    return f"{item_id}-{version}"
+
+
+def listing_etag(versions, scope=''):
+    """
+    Strong ETag for a listing, derived from the ``(item_id, version)`` pairs it contains and
+    ``scope``, anything else the body depends on (such as the host its URLs are built for).
+    """
+    digest = hashlib.sha1()
+    digest.update(f"{scope}\n".encode())
+    for item_id, version in versions:
+        digest.update(f"{item_id}:{version}\n".encode())
+    return digest.hexdigest()
+
+
+def not_modified(etag):
+    """Returns a bodiless 304 response if the client already holds ``etag``, otherwise None."""
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    return None
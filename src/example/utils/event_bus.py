@@ -0,0 +1,52 @@
+import logging
+import threading
+from collections import defaultdict
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Topics and their payload keys. Local writes and the change-stream consumer publish the same shapes.
+AUCTION_CREATED = 'auction.created'  # auction_id, item_id, seller_id, is_approved, start_time
+AUCTION_UPDATED = 'auction.updated'  # auction_id, item_id, fields, approval (old, new) or None
+AUCTION_DELETED = 'auction.deleted'  # auction_id
+BID_PLACED = 'bid.placed'  # bid_id, auction_id, item_id, bidder_id, bid_amount, seller_id, is_approved, placed_at
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for data changes. Handlers run synchronously in the
+    publishing thread, in subscription order; a failing handler is logged and skipped
+    so it cannot stop the others or the write that published the event.
+    """
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, handler):
+        with self._lock:
+            self._handlers[topic].append(handler)
+
+    def clear(self):
+        with self._lock:
+            self._handlers.clear()
+
+    def publish(self, topic, **payload):
+        with self._lock:
+            handlers = list(self._handlers.get(topic, ()))
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception(f"Event handler {getattr(handler, '__name__', handler)} failed for {topic}")
+        return len(handlers)
+
+
+event_bus = EventBus()
+
+
+def publish_write(topic, **payload):
+    """Publishes a write made by this process, unless the change stream will deliver it to every node."""
+    if current_app.config['EVENT_SOURCE'] == 'local':
+        event_bus.publish(topic, **payload)
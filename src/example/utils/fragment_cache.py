@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+from markupsafe import Markup, escape
+
+# Rendered into cached cards in place of the countdown, which changes on every request
+TIME_LEFT_SLOT = '\x00time-left\x00'
+
+
+class FragmentCache:
+    """
+    LRU of pre-rendered HTML fragments keyed by ``(item_id, version)``.
+
+    Only the newest version of each auction is kept: storing a fragment for a new
+    version drops the old one, so edits and bids never leave dead entries behind.
+    """
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._fragments = OrderedDict()  # (item_id, version) -> html
+        self._versions = {}  # item_id -> version currently cached
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, item_id, version):
+        with self._lock:
+            html = self._fragments.get((item_id, version))
+            if html is None:
+                self.misses += 1
+                return None
+            self._fragments.move_to_end((item_id, version))
+            self.hits += 1
+            return html
+
+    def put(self, item_id, version, html):
+        with self._lock:
+            old_version = self._versions.get(item_id)
+            if old_version is not None:
+                self._fragments.pop((item_id, old_version), None)
+            self._fragments[(item_id, version)] = html
+            self._versions[item_id] = version
+            while len(self._fragments) > self.max_entries:
+                (evicted_id, _), _ = self._fragments.popitem(last=False)
+                del self._versions[evicted_id]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._fragments),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def render_cards(cards, render_card, cache):
+    """
+    Returns one Markup fragment per card. Cards whose ``(item_id, version)`` is cached are
+    reused as is; only changed auctions go through ``render_card``. The countdown slot is
+    filled in afterwards from each card's ``time_left``.
+    """
+    fragments = []
+    for card in cards:
+        html = cache.get(card['item_id'], card['version'])
+        if html is None:
+            html = str(render_card(dict(card, time_left=TIME_LEFT_SLOT)))
+            cache.put(card['item_id'], card['version'], html)
+        fragments.append(Markup(html.replace(TIME_LEFT_SLOT, str(escape(card['time_left'])))))
+    return fragments
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,67 @@
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from src.example.repositories.image_blob_repository_impl import ImageBlobRepositoryImpl
+from src.example.utils.image_variants import remove_variants
+
+
+def store_upload(upload):
+    """
+    Stores an accepted CappedUploadStream under its content digest and takes a reference
+    on it. Uploading a file that is already stored costs one rename over identical bytes.
+    The reference is taken before the file is placed so a concurrent sweep never removes
+    a file that is about to be referenced.
+    """
+    filename = upload.content_filename
+    ImageBlobRepositoryImpl.acquire(filename, upload.size)
+    return upload.commit(filename)
+
+
+def release_image(filename):
+    """Drops one reference; the file is removed by the next sweep once nothing points at it."""
+    if filename:
+        ImageBlobRepositoryImpl.release(filename)
+
+
+def sweep_orphaned_images(upload_folder=None, grace_seconds=None, batch_size=100, dry_run=False):
+    """
+    Deletes up to ``batch_size`` images whose reference count has been zero for longer
+    than the grace period. Only the orphan index is read, never the upload directory.
+    With ``dry_run`` nothing is deleted and the orphans that would be are counted.
+    Returns ``(files_deleted, bytes_reclaimed)``.
+    """
+    upload_folder = upload_folder or current_app.config['UPLOAD_FOLDER']
+    if grace_seconds is None:
+        grace_seconds = current_app.config['IMAGE_ORPHAN_GRACE_SECONDS']
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    deleted, reclaimed = 0, 0
+    for blob in ImageBlobRepositoryImpl.find_orphans(cutoff, batch_size):
+        filename = blob['filename']
+        if dry_run:
+            try:
+                reclaimed += os.path.getsize(os.path.join(upload_folder, filename))
+            except FileNotFoundError:
+                continue
+            deleted += 1
+            continue
+        if not ImageBlobRepositoryImpl.delete_if_orphaned(filename):
+            continue  # Re-referenced since it was listed
+        path = os.path.join(upload_folder, filename)
+        tombstone = os.path.join(upload_folder, f".{filename}.deleting")
+        try:
+            os.replace(path, tombstone)
+        except FileNotFoundError:
+            continue
+        if ImageBlobRepositoryImpl.exists(filename):
+            # An upload of the same content took a reference while we were deleting; put it back
+            os.replace(tombstone, path)
+            continue
+        reclaimed += os.path.getsize(tombstone)
+        os.remove(tombstone)
+        deleted += 1
+        if ImageBlobRepositoryImpl.exists(filename):
+            continue  # Re-uploaded after the check above; its upload reuses these variants
+        remove_variants(upload_folder, filename)
+    return deleted, reclaimed
@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+try:
+    from PIL import Image
+except ImportError:  # Without Pillow every variant falls back to the original upload
+    Image = None
+
+# Longest edge, in pixels, of each generated variant
+VARIANTS = {'thumbnail': 160, 'card': 480, 'detail': 1200}
+VARIANT_FOLDER = 'variants'
+_SAVE_FORMATS = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG', 'gif': 'PNG'}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _stem_and_extension(filename):
+    stem, _, extension = filename.rpartition('.')
+    return stem, extension.lower()
+
+
+def variant_filename(filename, variant, webp=False):
+    stem, extension = _stem_and_extension(filename)
+    if webp:
+        extension = 'webp'
+    elif extension == 'gif':
+        extension = 'png'  # Resized GIFs are stored as single-frame PNGs
+    return f"{VARIANT_FOLDER}/{stem}__{variant}.{extension}"
+
+
+def _manifest_path(upload_folder, filename):
+    stem, _ = _stem_and_extension(filename)
+    return os.path.join(upload_folder, VARIANT_FOLDER, f"{stem}.json")
+
+
+def variants_ready(upload_folder, filename):
+    # Checked on disk every time: a sweep in any process may remove the variants
+    return os.path.exists(_manifest_path(upload_folder, filename))
+
+
+def variant_urls(filename, upload_folder, url_for_file):
+    """
+    Map of variant name to URL for an uploaded image. Until the background job has
+    written the variants, every entry points at the original upload.
+    """
+    original = url_for_file(filename)
+    if not variants_ready(upload_folder, filename):
+        return {'original': original, **{name: original for name in VARIANTS},
+                'webp': {name: original for name in VARIANTS}}
+    return {
+        'original': original,
+        **{name: url_for_file(variant_filename(filename, name)) for name in VARIANTS},
+        'webp': {name: url_for_file(variant_filename(filename, name, webp=True)) for name in VARIANTS}
+    }
+
+
+def remove_variants(upload_folder, filename):
+    """Deletes the manifest first, so readers fall back to the original before files disappear."""
+    paths = [_manifest_path(upload_folder, filename)]
+    paths += [os.path.join(upload_folder, variant_filename(filename, name, webp=webp))
+              for name in VARIANTS for webp in (False, True)]
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def generate_variants(upload_folder, filename, max_pixels=None):
+    """
+    Writes every variant of ``filename`` (plus WebP copies), then the manifest that marks them ready.
+    Images above ``max_pixels`` are refused from their header, before any pixel is decoded, with
+    Pillow's DecompressionBombError; they keep being served as the original only.
+    """
+    source = os.path.join(upload_folder, filename)
+    os.makedirs(os.path.join(upload_folder, VARIANT_FOLDER), exist_ok=True)
+    _, extension = _stem_and_extension(filename)
+    written = {}
+    with Image.open(source) as image:
+        if max_pixels and image.width * image.height > max_pixels:
+            raise Image.DecompressionBombError(
+                f"{image.width}x{image.height} pixels exceeds the {max_pixels} pixel limit"
+            )
+        image.draft('RGB', (max(VARIANTS.values()),) * 2)  # JPEGs decode at reduced scale when they can
+        image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        for name, size in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size))
+            for webp in (False, True):
+                target = variant_filename(filename, name, webp=webp)
+                image_format = 'WEBP' if webp else _SAVE_FORMATS.get(extension, 'PNG')
+                if image_format == 'JPEG' and resized.mode != 'RGB':
+                    resized = resized.convert('RGB')
+                _atomic_save(resized, os.path.join(upload_folder, target), image_format)
+                written[f"{name}.webp" if webp else name] = target
+    manifest = _manifest_path(upload_folder, filename)
+    with open(f"{manifest}.part", 'w') as f:
+        json.dump(written, f)
+    os.replace(f"{manifest}.part", manifest)
+    return written
+
+
+def _atomic_save(image, path, image_format):
+    temp_path = f"{path}.part"
+    image.save(temp_path, format=image_format, optimize=True)
+    os.replace(temp_path, path)
+
+
+def _get_executor(max_workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-variants')
+        return _executor
+
+
+def schedule_variants(filename, on_ready=None):
+    """
+    Queues variant generation for a freshly stored upload; returns immediately. Once the
+    manifest is written, ``on_ready(filename)`` runs in an app context on the worker thread.
+    """
+    if Image is None or not filename:
+        return None
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    if os.path.exists(_manifest_path(upload_folder, filename)):
+        return None  # Content-addressed: a re-upload of the same image already has its variants
+    app = current_app._get_current_object()
+    logger = current_app.logger
+    max_pixels = current_app.config['IMAGE_MAX_PIXELS']
+    executor = _get_executor(current_app.config['IMAGE_VARIANT_WORKERS'])
+
+    def run():
+        try:
+            written = generate_variants(upload_folder, filename, max_pixels)
+        except Image.DecompressionBombError as e:
+            logger.warning(f"Not generating variants for {filename}: {str(e)}")
+            return None
+        except Exception as e:
+            logger.warning(f"Variant generation failed for {filename}: {str(e)}")
+            return None
+        if on_ready is not None:
+            try:
+                with app.app_context():
+                    on_ready(filename)
+            except Exception as e:
+                logger.warning(f"Variant ready hook failed for {filename}: {str(e)}")
+        return written
+
+    return executor.submit(run)
@@ -0,0 +1,195 @@
+import threading
+import time
+
+from flask import current_app
+from mongoengine import connect, get_connection
+from pymongo import monitoring, read_preferences
+
+from src.example.models.auction import Auction
+from src.example.models.bid import Bid
+from src.example.models.image_blob import ImageBlob
+from src.example.models.report_job import ReportJob
+from src.example.models.report_rollup import ReportRollup
+from src.example.models.token_revocation import TokenRevocation
+from src.example.models.user import User
+
+# Where a repository read may be served from
+PRIMARY = 'primary'
+SECONDARY = 'secondary'  # MONGO_SECONDARY_READ_PREFERENCE, bounded by MONGO_MAX_STALENESS_SECONDS
+
+_READ_PREFERENCE_MODES = {
+    'primaryPreferred': read_preferences.PrimaryPreferred,
+    'secondary': read_preferences.Secondary,
+    'secondaryPreferred': read_preferences.SecondaryPreferred,
+    'nearest': read_preferences.Nearest
+}
+_read_preferences = {}  # (mode, max staleness) -> read preference
+
+# Collections touched at warm-up so mongoengine creates their indexes before the first request
+WARMUP_MODELS = (User, Auction, Bid, ImageBlob, ReportRollup, ReportJob, TokenRevocation)
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Counts connections per server from pymongo's pool events: open connections, connections
+    checked out by a request, and requests waiting for one. Read by the health endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = {}  # 'host:port' -> counters
+
+    def _counters(self, address):
+        key = f"{address[0]}:{address[1]}"
+        counters = self._servers.get(key)
+        if counters is None:
+            counters = self._servers[key] = {'open': 0, 'in_use': 0, 'waiting': 0, 'wait_timeouts': 0}
+        return counters
+
+    def _update(self, address, **deltas):
+        with self._lock:
+            counters = self._counters(address)
+            for name, delta in deltas.items():
+                counters[name] += delta
+
+    def pool_created(self, event):
+        self._update(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        self._update(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._update(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        timed_out = 1 if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT else 0
+        self._update(event.address, waiting=-1, wait_timeouts=timed_out)
+
+    def connection_checked_out(self, event):
+        self._update(event.address, waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, in_use=-1)
+
+    def snapshot(self, max_pool_size):
+        with self._lock:
+            return {
+                server: dict(counters, max_pool_size=max_pool_size,
+                             utilization=round(counters['in_use'] / max_pool_size, 3) if max_pool_size else None)
+                for server, counters in self._servers.items()
+            }
+
+
+pool_monitor = PoolMonitor()
+
+
+def client_options(config):
+    """MongoClient keyword arguments from the MONGO_* settings; unset values keep pymongo's defaults."""
+    options = {
+        'appname': config['MONGO_APP_NAME'],
+        'maxPoolSize': config['MONGO_MAX_POOL_SIZE'],
+        'minPoolSize': config['MONGO_MIN_POOL_SIZE'],
+        'maxIdleTimeMS': config['MONGO_MAX_IDLE_TIME_MS'],
+        'waitQueueTimeoutMS': config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        'connectTimeoutMS': config['MONGO_CONNECT_TIMEOUT_MS'],
+        'serverSelectionTimeoutMS': config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        'socketTimeoutMS': config['MONGO_SOCKET_TIMEOUT_MS'],
+        'readPreference': config['MONGO_READ_PREFERENCE'],
+        'wTimeoutMS': config['MONGO_WRITE_CONCERN_TIMEOUT_MS'],
+        'journal': config['MONGO_JOURNAL']
+    }
+    compressors = [name.strip() for name in config['MONGO_COMPRESSORS'].split(',') if name.strip()]
+    if compressors:
+        options['compressors'] = compressors
+    write_concern = config['MONGO_WRITE_CONCERN']
+    if write_concern:
+        options['w'] = int(write_concern) if write_concern.isdigit() else write_concern
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def read_preference(read=PRIMARY):
+    """pymongo read preference for a ``PRIMARY`` or ``SECONDARY`` routed read."""
+    if read == PRIMARY:
+        return read_preferences.ReadPreference.PRIMARY
+    mode = current_app.config['MONGO_SECONDARY_READ_PREFERENCE']
+    staleness = current_app.config['MONGO_MAX_STALENESS_SECONDS']
+    preference = _read_preferences.get((mode, staleness))
+    if preference is None:
+        if mode == 'primary':
+            preference = read_preferences.ReadPreference.PRIMARY
+        else:
+            preference = _READ_PREFERENCE_MODES[mode](max_staleness=staleness)
+        _read_preferences[(mode, staleness)] = preference
+    return preference
+
+
+def routed_collection(model, read=PRIMARY):
+    """The model's pymongo collection with reads sent where ``read`` says."""
+    return model._get_collection().with_options(read_preference=read_preference(read))
+
+
+def connect_mongo(app):
+    """Opens the default mongoengine connection with the configured client settings."""
+    return connect(
+        db=app.config['MONGO_DB'],
+        host=app.config['MONGO_URI'],
+        event_listeners=[pool_monitor],
+        **client_options(app.config)
+    )
+
+
+def warm_up(app):
+    """Selects a server, opens the first connections and creates model indexes."""
+    started = time.monotonic()
+    get_connection().admin.command('ping')
+    for model in WARMUP_MODELS:
+        model._get_collection()  # mongoengine ensures the declared indexes on first access
+    app.extensions['mongo_warmup'] = {'ok': True, 'seconds': round(time.monotonic() - started, 3)}
+
+
+def start_warm_up(app):
+    """Warms the pool in a daemon thread so a slow or missing database does not block startup."""
+    app.extensions['mongo_warmup'] = {'ok': False, 'seconds': None}
+
+    def run():
+        try:
+            warm_up(app)
+            app.logger.info(f"MongoDB warm-up finished in {app.extensions['mongo_warmup']['seconds']}s")
+        except Exception as e:
+            app.extensions['mongo_warmup'] = {'ok': False, 'seconds': None, 'error': str(e)}
+            app.logger.warning(f"MongoDB warm-up failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name='mongo-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def health(app):
+    """Ping latency, pool counters per server and warm-up state; ``ok`` is False if the ping fails."""
+    report = {'warmup': app.extensions.get('mongo_warmup')}
+    started = time.monotonic()
+    try:
+        get_connection().admin.command('ping')
+        report['ok'] = True
+        report['ping_ms'] = round((time.monotonic() - started) * 1000, 2)
+    except Exception as e:
+        report['ok'] = False
+        report['error'] = str(e)
+    report['pool'] = pool_monitor.snapshot(app.config['MONGO_MAX_POOL_SIZE'])
+    return report
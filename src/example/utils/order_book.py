@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class OrderBook:
+    """
+    In-memory bid ladders for recently viewed auctions: BidView tuples, highest bid first.
+
+    A ladder is loaded from MongoDB on the first read and then kept current by ``add``
+    as bids are placed, so history reads of busy auctions rarely go back to the database.
+    Only the ``max_auctions`` most recently used ladders are kept.
+
+    Each process only sees the bids its event bus delivers; with local events, bids placed
+    on other workers are missed, so a ladder is reloaded once it is ``max_age`` seconds old.
+    A load must start with ``begin_load``: if a bid is added or the ladder invalidated while
+    the rows are being read, the finished load is not stored, as it may lack that bid.
+    """
+
+    def __init__(self, max_auctions=1024, max_age=None):
+        self.max_auctions = max_auctions
+        self.max_age = max_age
+        self._ladders = OrderedDict()  # item_id -> (tuple of BidView, loaded_at)
+        self._loads = {}  # item_id -> [generation, loads in flight]
+        self._epoch = 0  # Bumped by clear, which invalidates every load in flight
+        self._lock = threading.Lock()
+
+    def get(self, item_id):
+        with self._lock:
+            entry = self._ladders.get(item_id)
+            if entry is None:
+                return None
+            if self.max_age is not None and time.monotonic() - entry[1] > self.max_age:
+                del self._ladders[item_id]
+                return None
+            self._ladders.move_to_end(item_id)
+            return entry[0]
+
+    def begin_load(self, item_id):
+        """Token to pass to ``load``; take it before reading the bids."""
+        with self._lock:
+            load = self._loads.setdefault(item_id, [0, 0])
+            load[1] += 1
+            return self._epoch, load[0]
+
+    def load(self, item_id, bids, token):
+        """Stores the ladder unless it changed since ``begin_load``; returns the ladder either way."""
+        ladder = tuple(sorted(bids, key=lambda bid: -bid.bid_amount))
+        epoch, generation = token
+        with self._lock:
+            load = self._loads.get(item_id)
+            current = load is not None and load[0] == generation and epoch == self._epoch
+            self._end_load(item_id)
+            if current:
+                self._ladders[item_id] = (ladder, time.monotonic())
+                self._ladders.move_to_end(item_id)
+                while len(self._ladders) > self.max_auctions:
+                    self._ladders.popitem(last=False)
+        return ladder
+
+    def abort_load(self, item_id):
+        """Ends a load started with ``begin_load`` whose read failed."""
+        with self._lock:
+            self._end_load(item_id)
+
+    def _end_load(self, item_id):
+        load = self._loads.get(item_id)
+        if load is not None:
+            load[1] -= 1
+            if load[1] <= 0:
+                del self._loads[item_id]
+
+    def _changed(self, item_id):
+        load = self._loads.get(item_id)
+        if load is not None:
+            load[0] += 1
+
+    def add(self, item_id, bid):
+        """Inserts a new bid into a loaded ladder; auctions not loaded are read fresh later."""
+        with self._lock:
+            self._changed(item_id)
+            entry = self._ladders.get(item_id)
+            if entry is None:
+                return
+            ladder, loaded_at = entry
+            position = 0
+            while position < len(ladder) and ladder[position].bid_amount >= bid.bid_amount:
+                position += 1
+            self._ladders[item_id] = (ladder[:position] + (bid,) + ladder[position:], loaded_at)
+
+    def invalidate(self, item_id):
+        with self._lock:
+            self._changed(item_id)
+            self._ladders.pop(item_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._ladders.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'auctions': len(self._ladders),
+                'max_auctions': self.max_auctions,
+                'max_age': self.max_age,
+                'bids': sum(len(ladder) for ladder, _ in self._ladders.values())
+            }
+
+
+order_book = OrderBook()
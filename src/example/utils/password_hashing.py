@@ -0,0 +1,39 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def _pool_context():
+    # Forking a threaded server copies its locks and sockets mid-use; start workers from a clean process
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+            _pool_workers = workers
+        return _pool
+
+
+def hash_passwords(passwords, workers=0):
+    """
+    Hashes ``passwords`` in order. Password hashing is CPU bound and holds the GIL, so with
+    ``workers`` above 1 the hashes are computed in a process pool that is kept for reuse;
+    otherwise they are computed inline.
+    """
+    passwords = list(passwords)
+    if workers is None or workers <= 1 or len(passwords) < 2:
+        return [generate_password_hash(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(_get_pool(workers).map(generate_password_hash, passwords, chunksize=chunksize))
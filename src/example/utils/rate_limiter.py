@@ -0,0 +1,150 @@
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows: shared buckets fall back to a process-local lock
+    fcntl = None
+
+
+class RateLimiter:
+    """Token-bucket limiter: each key holds up to ``capacity`` tokens, refilled at ``rate`` per second."""
+
+    def allow(self, key, capacity, rate, now=None):
+        """Consume one token for ``key``. Returns ``(allowed, retry_after_seconds)``."""
+        pass
+
+    @staticmethod
+    def _take(tokens, last, capacity, rate, now):
+        tokens = min(capacity, tokens + max(0.0, now - last) * rate)
+        if tokens >= 1.0:
+            return True, tokens - 1.0, 0.0
+        retry_after = (1.0 - tokens) / rate if rate > 0 else float('inf')
+        return False, tokens, retry_after
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """
+    Buckets kept in an LRU dict guarded by a lock; limits hold per process only. Past
+    ``max_keys`` the least recently used bucket is dropped, in O(1) under the lock.
+    """
+
+    def __init__(self, max_keys=100000):
+        self._buckets = OrderedDict()  # key -> (tokens, last)
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+
+    def allow(self, key, capacity, rate, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            allowed, tokens, retry_after = self._take(tokens, last, capacity, rate, now)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, retry_after
+
+
+class SharedMemoryRateLimiter(RateLimiter):
+    """
+    Buckets kept in a fixed-size open-addressed table in POSIX shared memory, so every
+    worker process on the host draws from the same buckets. Slots are ``(key_hash, tokens, last)``;
+    when a probe window is full the least recently touched slot is recycled. The segment
+    outlives every worker, including the one that created it; ``unlink`` removes it.
+    """
+    _SLOT = struct.Struct('<Qdd')
+    _PROBES = 8
+
+    def __init__(self, name, slots=65536):
+        self._slots = slots
+        size = self._SLOT.size * slots
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._detach_from_resource_tracker()
+        self._buf = self._shm.buf
+        self._thread_lock = threading.Lock()
+        self._lock_fd = None
+        if fcntl is not None:
+            lock_path = os.path.join(tempfile.gettempdir(), f'{name}.lock')
+            self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def _detach_from_resource_tracker(self):
+        # No worker may unlink the segment when it exits, the creator included: the others still use it.
+        try:
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+        except Exception:
+            pass
+
+    @staticmethod
+    def _hash(key):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') or 1
+
+    def allow(self, key, capacity, rate, now=None):
+        # Wall clock, not monotonic: timestamps are compared across processes.
+        now = time.time() if now is None else now
+        key_hash = self._hash(key)
+        with self._thread_lock:
+            if self._lock_fd is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                offset = self._find_slot(key_hash)
+                stored_hash, tokens, last = self._SLOT.unpack_from(self._buf, offset)
+                if stored_hash != key_hash:
+                    tokens, last = capacity, now
+                allowed, tokens, retry_after = self._take(tokens, last, capacity, rate, now)
+                self._SLOT.pack_into(self._buf, offset, key_hash, tokens, now)
+                return allowed, retry_after
+            finally:
+                if self._lock_fd is not None:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _find_slot(self, key_hash):
+        start = key_hash % self._slots
+        oldest_offset, oldest_last = None, None
+        for i in range(self._PROBES):
+            offset = ((start + i) % self._slots) * self._SLOT.size
+            stored_hash, _, last = self._SLOT.unpack_from(self._buf, offset)
+            if stored_hash == key_hash or stored_hash == 0:
+                return offset
+            if oldest_last is None or last < oldest_last:
+                oldest_offset, oldest_last = offset, last
+        return oldest_offset
+
+    def unlink(self):
+        """Removes the segment for good; later limiters under the same name start empty."""
+        resource_tracker.register(self._shm._name, 'shared_memory')  # unlink() unregisters it again
+        self._shm.unlink()
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+def get_rate_limiter():
+    """Returns the limiter configured for the current app, creating it on first use."""
+    limiter = current_app.extensions.get('rate_limiter')
+    if limiter is None:
+        if current_app.config.get('RATE_LIMIT_BACKEND') == 'shared':
+            limiter = SharedMemoryRateLimiter(
+                current_app.config['RATE_LIMIT_SHARED_NAME'],
+                current_app.config['RATE_LIMIT_SHARED_SLOTS']
+            )
+        else:
+            limiter = InMemoryRateLimiter()
+        current_app.extensions['rate_limiter'] = limiter
+    return limiter
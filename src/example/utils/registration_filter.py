@@ -0,0 +1,119 @@
+import hashlib
+import math
+import threading
+
+from src.example.repositories.user_repository_impl import UserRepositoryImpl
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings: no false negatives, about ``error_rate`` false positives."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(1, int(capacity))
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RegistrationFilter:
+    """
+    Bloom filter of the usernames and emails already registered, so registration can reject
+    a taken name with one indexed lookup instead of a password hash and a failed insert.
+
+    A miss is definite for everything the filter has seen; a hit is only a hint and must be
+    confirmed against the collection. The unique indexes stay authoritative: users created
+    by other processes are only picked up by the next ``warm``, so a miss can still end in a
+    duplicate key error on save.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ready = False
+        self.count = 0
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._pending = None  # Identities added while a warm is building its replacement
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(username, email):
+        """Filter keys of the given values; ``None`` stands for a value that is not known to be taken."""
+        keys = (('username', 'u', username), ('email', 'e', email))
+        return tuple((field, f"{prefix}:{value}") for field, prefix, value in keys if value is not None)
+
+    def add(self, username=None, email=None):
+        keys = self._keys(username, email)
+        if not keys:
+            return
+        with self._lock:
+            for _, key in keys:
+                self._bloom.add(key)
+            self.count += 1
+            if self._pending is not None:
+                self._pending.append((username, email))
+
+    def maybe_taken(self, username, email):
+        """Fields whose value may already be registered; empty when both are certainly free."""
+        if not self.ready:
+            return []
+        bloom = self._bloom
+        return [field for field, key in self._keys(username, email) if key in bloom]
+
+    def warm(self, identities, expected=0):
+        """Rebuilds the filter from ``(username, email)`` pairs, sized for twice ``expected`` users."""
+        with self._lock:
+            self._pending = []
+        capacity = max(self.capacity, expected * 2)
+        bloom, count = BloomFilter(capacity, self.error_rate), 0
+        for username, email in identities:
+            for _, key in self._keys(username, email):
+                bloom.add(key)
+            count += 1
+        with self._lock:
+            for username, email in self._pending:
+                for _, key in self._keys(username, email):
+                    bloom.add(key)
+            count += len(self._pending)
+            self._pending = None
+            self._bloom, self.count, self.ready = bloom, count, True
+        return count
+
+    def stats(self):
+        return {'ready': self.ready, 'users': self.count, 'capacity': self._bloom.capacity,
+                'bits': self._bloom.size, 'hashes': self._bloom.hash_count}
+
+
+registration_filter = RegistrationFilter()
+
+
+def warm_registration_filter(batch_size=5000):
+    return registration_filter.warm(UserRepositoryImpl.iter_identities(batch_size), UserRepositoryImpl.count())
+
+
+def start_registration_filter_warm_up(app):
+    """Loads the filter in a daemon thread; until it is ready registration relies on the unique indexes."""
+
+    def run():
+        with app.app_context():
+            try:
+                count = warm_registration_filter()
+                app.logger.info(f"Registration filter loaded with {count} users")
+            except Exception as e:
+                app.logger.warning(f"Registration filter warm-up failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name='registration-filter', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+REPORT_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_rows(rows, fmt, columns):
+    """
+    Encodes an iterable of dict rows as ``fmt`` one row at a time, so callers can pass a
+    database cursor straight through without holding the report in memory.
+    """
+    if fmt == 'ndjson':
+        for row in rows:
+            yield json.dumps(row, default=_json_default) + '\n'
+    elif fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: value.isoformat() if isinstance(value, datetime) else value
+                             for key, value in row.items()})
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        yield '['
+        separator = ''
+        for row in rows:
+            yield separator + json.dumps(row, default=_json_default)
+            separator = ','
+        yield ']'
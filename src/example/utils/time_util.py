@@ -0,0 +1,19 @@
+from datetime import datetime
+
+
+def format_time_left(end_time, now=None):
+    """Human readable countdown to ``end_time`` (naive UTC, as stored by mongoengine)."""
+    if end_time is None:
+        return "No end date"
+    now = now or datetime.utcnow()
+    seconds = int((end_time - now).total_seconds())
+    if seconds <= 0:
+        return "Ended"
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m {seconds}s"
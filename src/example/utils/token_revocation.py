@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.example.repositories.token_revocation_repository_impl import TokenRevocationRepositoryImpl
+
+# updated_at is stamped by the server when a write starts, so a write can become visible after a later
+# one the last sync already saw; re-reading this far behind the newest stamp seen picks such writes up
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class RevocationRegistry:
+    """
+    In-memory copy of the ``token_revocation`` collection: user_id -> (min_version, blocked, expires_at).
+
+    Revocations made by this process apply at once; those made by other workers arrive with the
+    next ``sync``, which every worker runs every few seconds. Until the registry has synced within
+    ``max_staleness`` seconds it is not ``current`` and callers must check the user in MongoDB.
+    ``version`` counts the changes applied, so callers can tell whether anything moved.
+    """
+
+    def __init__(self, max_staleness=10.0):
+        self.max_staleness = max_staleness
+        self.version = 0
+        self._entries = {}
+        self._watermark = None  # Newest server-stamped updated_at seen
+        self._synced_at = None  # time.monotonic() of the last successful sync
+        self._lock = threading.Lock()
+
+    def is_current(self):
+        synced_at = self._synced_at
+        return synced_at is not None and time.monotonic() - synced_at <= self.max_staleness
+
+    def is_revoked(self, user_id, token_version):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return False
+        min_version, blocked, _ = entry
+        return blocked or (token_version or 0) < min_version
+
+    def apply(self, user_id, min_version=0, blocked=False, expires_at=None, updated_at=None):
+        with self._lock:
+            current = self._entries.get(user_id)
+            if current is not None:
+                min_version = max(min_version, current[0])
+                blocked = blocked or current[1]
+            entry = (min_version, blocked, expires_at)
+            if entry != current:
+                self._entries[user_id] = entry
+                self.version += 1
+            if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+
+    def revoke(self, user_id, min_version=None, blocked=False, expires_at=None):
+        """Records a revocation for every worker and applies it to this one immediately."""
+        TokenRevocationRepositoryImpl.save_revocation(user_id, min_version, blocked, expires_at)
+        self.apply(user_id, min_version or 0, blocked, expires_at)
+
+    def sync(self):
+        """Pulls revocations written since the last sync and drops the ones that have expired."""
+        since = self._watermark - SYNC_OVERLAP if self._watermark is not None else None
+        for revocation in TokenRevocationRepositoryImpl.find_revocations_since(since):
+            self.apply(
+                revocation['_id'], revocation.get('min_version', 0), revocation.get('blocked', False),
+                revocation.get('expires_at'), revocation.get('updated_at')
+            )
+        now = datetime.utcnow()
+        with self._lock:
+            for user_id in [user_id for user_id, (_, _, expires_at) in self._entries.items()
+                            if expires_at is not None and expires_at <= now]:
+                del self._entries[user_id]
+            self._synced_at = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._watermark = None
+            self._synced_at = None
+            self.version += 1
+
+    def stats(self):
+        return {'current': self.is_current(), 'version': self.version, 'revoked_users': len(self._entries)}
+
+
+revocation_registry = RevocationRegistry()
+
+
+def start_revocation_sync(app, registry=None):
+    """Syncs the registry every REVOCATION_SYNC_SECONDS in a daemon thread, starting with a full load."""
+    registry = registry or revocation_registry
+    stop_event = threading.Event()
+
+    def run():
+        with app.app_context():
+            while not stop_event.is_set():
+                try:
+                    registry.sync()
+                except Exception as e:
+                    app.logger.warning(f"Token revocation sync failed: {str(e)}")
+                stop_event.wait(app.config['REVOCATION_SYNC_SECONDS'])
+
+    thread = threading.Thread(target=run, name='revocation-sync', daemon=True)
+    thread.start()
+    return thread, stop_event
@@ -3,8 +3,47 @@ import jwt
 from datetime import datetime, timezone, timedelta
 from flask import current_app
 
-from example.models.user import User
 from src.example.exceptions.auth_error import AuthError
+from src.example.exceptions.entity_not_found_exception import EntityNotFoundException
+from src.example.models.views import Principal
+from src.example.repositories.user_repository_impl import UserRepositoryImpl
+from src.example.utils.token_cache import token_cache
+
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+# Role claim of stateless access tokens: one bit per role set to true
+ROLE_BITS = (('is_super_admin', 1), ('is_admin', 2), ('is_buyer', 4), ('is_seller', 8))
+
+
+def role_bits(roles):
+    return sum(bit for name, bit in ROLE_BITS if (roles or {}).get(name))
+
+
+def principal_from_claims(payload):
+    """Principal carried by a stateless access token, or None for tokens without role claims."""
+    if 'roles' not in payload:
+        return None
+    return Principal(
+        user_id=str(payload['user_id']),
+        username=payload.get('username'),
+        roles=frozenset(name for name, bit in ROLE_BITS if payload['roles'] & bit),
+        is_blocked=False,
+        token_version=payload.get('version', 0)
+    )
+
+
+def access_token_lifetime():
+    """Seconds an access token issued now stays valid."""
+    if current_app.config['JWT_STATELESS']:
+        return current_app.config['JWT_ACCESS_EXPIRATION_SECONDS']
+    return current_app.config['JWT_EXPIRATION_SECONDS']
+
+
+def _encode(payload, seconds):
+    payload['exp'] = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+    return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
 
 
 def generate_token(user):
@@ -12,39 +51,56 @@ def generate_token(user):
         payload = {
             'sub': str(user.user_id),
             'user_id': str(user.user_id),
-            'version': user.token_version,
-            'exp': datetime.now(timezone.utc) + timedelta(seconds=current_app.config['JWT_EXPIRATION_SECONDS'])
+            'version': user.token_version
         }
-        return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+        if current_app.config['JWT_STATELESS']:
+            # Short-lived and self-contained: permission checks read the roles from the claims
+            payload.update(typ=ACCESS, username=user.username, roles=role_bits(user.roles))
+        return _encode(payload, access_token_lifetime())
     except Exception as e:
         return f"Token generation failed: {str(e)}"
 
 
-def decode_token(token):
+def generate_refresh_token(user):
+    payload = {'sub': str(user.user_id), 'user_id': str(user.user_id), 'version': user.token_version, 'typ': REFRESH}
+    return _encode(payload, current_app.config['JWT_REFRESH_EXPIRATION_SECONDS'])
+
+
+def verify_token(token, token_type=ACCESS):
+    """Checks the signature, expiry and token type and returns the payload; does not touch the database."""
+    token = token.replace('Bearer ', '').strip()
+    key = token_cache.key(token)
+    payload = token_cache.get(key)  # Repeated tokens skip the HMAC check and parsing until they expire
+    if payload is None:
+        try:
+            padded = token + '=' * (4 - len(token) % 4)
+            payload = jwt.decode(
+                padded,
+                current_app.config['SECRET_KEY'],
+                algorithms=['HS256'],
+                options={'verify_exp': True}
+            )
+        except PyJWTError as e:
+            current_app.logger.error(f"JWT Error: {str(e)}")
+            raise AuthError("Invalid or expired token")
+        token_cache.put(key, payload)
+    if payload.get('typ', ACCESS) != token_type:  # Tokens from before stateless mode are access tokens
+        raise AuthError("Invalid token type")
+    return payload
+
+
+def resolve_user(payload):
+    """Checks a verified payload against the user's stored token version and block flag."""
     try:
-        token = token.replace('Bearer ', '').strip()
-
-        token += '=' * (4 - len(token) % 4)
-        payload = jwt.decode(
-            token,
-            current_app.config['SECRET_KEY'],
-            algorithms=['HS256'],
-            options={'verify_exp': True}
-        )
-
-        user = User.objects.get(
-            __raw__={'$or': [
-                {'_id': payload.get('sub')},
-                {'user_id': payload.get('user_id')}
-            ]}
-        )
-
-        if payload['version'] != user.token_version:
-            raise AuthError("Token invalidated")
-
-        return str(user.user_id)
-    except PyJWTError as e:
-        current_app.logger.error(f"JWT Error: {str(e)}")
-        raise AuthError("Invalid or expired token")
-    except DoesNotExist:
-        raise AuthError("User not found")
\ No newline at end of file
+        user = UserRepositoryImpl.find_user_fields(payload.get('user_id'), 'user_id', 'token_version', 'is_blocked')
+    except EntityNotFoundException:
+        raise AuthError("User not found")
+    if user.get('is_blocked'):
+        raise AuthError("User is blocked")
+    if payload.get('version') != user.get('token_version', 0):
+        raise AuthError("Token invalidated")
+    return str(user['user_id'])
+
+
+def decode_token(token):
+    return resolve_user(verify_token(token))
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so every worker that enables the GC runs it
+    fcntl = None
+
+from src.example.repositories.auction_repository_impl import AuctionRepositoryImpl
+from src.example.repositories.image_blob_repository_impl import ImageBlobRepositoryImpl
+from src.example.utils.image_store import sweep_orphaned_images
+from src.example.utils.image_variants import remove_variants
+
+TEMP_UPLOAD_PREFIX = '.upload-'
+GC_LOCK_FILENAME = '.gc.lock'  # Hidden but outside TEMP_UPLOAD_PREFIX, so the scan never collects it
+
+
+def _batches(upload_folder, batch_size, cutoff):
+    """Yields lists of DirEntry for files old enough to judge, without loading the whole directory."""
+    batch = []
+    with os.scandir(upload_folder) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue  # variants/ is cleaned together with its original
+            if entry.stat().st_mtime > cutoff:
+                continue  # Possibly an upload still being written or saved
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def collect_orphaned_uploads(upload_folder=None, batch_size=500, grace_seconds=None, dry_run=False,
+                             max_batches=None, pause_seconds=0.0):
+    """
+    Deletes files in the upload folder that no auction references.
+
+    Files are checked in batches of ``batch_size`` against the image_filename index, so memory
+    and query size stay bounded. Abandoned temp files from failed uploads are always orphans;
+    content-addressed files still tracked by ImageBlob are left to sweep_orphaned_images.
+    Returns a report with the number of files scanned and removed and the bytes reclaimed.
+    """
+    upload_folder = upload_folder or current_app.config['UPLOAD_FOLDER']
+    if grace_seconds is None:
+        grace_seconds = current_app.config['IMAGE_ORPHAN_GRACE_SECONDS']
+    report = {'scanned': 0, 'orphaned': 0, 'reclaimed_bytes': 0, 'dry_run': dry_run}
+    if not os.path.isdir(upload_folder):
+        return report
+    cutoff = time.time() - grace_seconds
+
+    for batch_number, batch in enumerate(_batches(upload_folder, batch_size, cutoff)):
+        if max_batches is not None and batch_number >= max_batches:
+            break
+        report['scanned'] += len(batch)
+        names = [entry.name for entry in batch if not entry.name.startswith('.')]
+        keep = AuctionRepositoryImpl.find_referenced_images(names) if names else set()
+        keep |= ImageBlobRepositoryImpl.find_tracked(names) if names else set()
+        for entry in batch:
+            if entry.name in keep:
+                continue
+            if entry.name.startswith('.') and not entry.name.startswith(TEMP_UPLOAD_PREFIX):
+                continue  # Tombstones and other hidden files belong to someone else
+            report['orphaned'] += 1
+            report['reclaimed_bytes'] += entry.stat().st_size
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                remove_variants(upload_folder, entry.name)
+        if pause_seconds:
+            time.sleep(pause_seconds)  # Spread the index lookups out when running in the background
+    return report
+
+
+def _try_gc_lock(upload_folder):
+    """Non-blocking exclusive lock on a file in the upload folder; the open file holds it, or None."""
+    os.makedirs(upload_folder, exist_ok=True)
+    lock_file = open(os.path.join(upload_folder, GC_LOCK_FILENAME), 'a')
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def run_upload_gc(dry_run=False, batch_size=500, pause_seconds=0.0):
+    """One GC pass: the blob orphan sweep, then the directory scan. Nothing is deleted with ``dry_run``."""
+    deleted, reclaimed = sweep_orphaned_images(dry_run=dry_run)
+    report = collect_orphaned_uploads(batch_size=batch_size, dry_run=dry_run, pause_seconds=pause_seconds)
+    report['swept_blobs'] = deleted
+    report['swept_bytes'] = reclaimed
+    return report
+
+
+def start_upload_gc(app):
+    """
+    Runs the GC every UPLOAD_GC_INTERVAL_SECONDS in a daemon thread. Every worker starts the
+    thread, but only the one holding the lock file in the upload folder runs passes.
+    """
+    interval = app.config['UPLOAD_GC_INTERVAL_SECONDS']
+
+    def run():
+        lock_file = None
+        while True:
+            time.sleep(interval)
+            if lock_file is None:
+                lock_file = _try_gc_lock(app.config['UPLOAD_FOLDER'])  # Kept for the life of the process
+                if lock_file is None:
+                    continue  # Another worker on this host is the collector
+            with app.app_context():
+                try:
+                    report = run_upload_gc(
+                        dry_run=app.config['UPLOAD_GC_DRY_RUN'],
+                        batch_size=app.config['UPLOAD_GC_BATCH_SIZE'],
+                        pause_seconds=0.1
+                    )
+                    verb = 'reclaimable' if report['dry_run'] else 'reclaimed'
+                    app.logger.info(
+                        f"Upload GC: {report['swept_blobs']} unreferenced blobs ({report['swept_bytes']} bytes {verb}); "
+                        f"scanned {report['scanned']} files, {report['orphaned']} orphaned, "
+                        f"{report['reclaimed_bytes']} bytes {verb}"
+                    )
+                except Exception as e:
+                    app.logger.error(f"Upload GC failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name='upload-gc', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import tempfile
+
+from flask import Request, current_app
+
+# Leading bytes of every image type we accept, mapped to the extension they imply
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+_SIGNATURE_LENGTH = max(len(signature) for signature, _ in IMAGE_SIGNATURES)
+CHUNK_SIZE = 64 * 1024
+
+
+def sniff_image_type(head, allowed_extensions):
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            if extension in allowed_extensions or (extension == 'jpg' and 'jpeg' in allowed_extensions):
+                return extension
+            return None
+    return None
+
+
+class CappedUploadStream:
+    """
+    Write target for an uploaded image.
+
+    Werkzeug's multipart parser writes the file into this object chunk by chunk. The first
+    bytes are checked against IMAGE_SIGNATURES before anything touches the disk; accepted
+    data goes straight into a hidden temp file inside the upload folder, and the upload is
+    cut off as soon as it passes ``max_bytes``. Rejected uploads are drained and discarded,
+    leaving the reason in ``error``. Accepted bytes are hashed as they arrive so the upload
+    can be stored under its content digest. ``commit`` renames the temp file into place
+    atomically; anything not committed is deleted on ``close``.
+    """
+
+    def __init__(self, upload_folder, max_bytes, allowed_extensions):
+        self.upload_folder = upload_folder
+        self.max_bytes = max_bytes
+        self.allowed_extensions = allowed_extensions
+        self.extension = None
+        self.error = None
+        self.size = 0
+        self._head = b''
+        self._file = None
+        self._temp_path = None
+        self._sha256 = hashlib.sha256()
+
+    @property
+    def content_filename(self):
+        """``<sha256>.<ext>`` name of the accepted upload; identical images share it."""
+        return f"{self._sha256.hexdigest()}.{self.extension}"
+
+    def write(self, data):
+        length = len(data)
+        if self.error:
+            return length
+        self.size += length
+        if self.size > self.max_bytes:
+            self._reject("Image exceeds the maximum upload size")
+            return length
+        if self._file is None:
+            self._head += bytes(data)
+            if len(self._head) < _SIGNATURE_LENGTH:
+                return length
+            self.extension = sniff_image_type(self._head, self.allowed_extensions)
+            if self.extension is None:
+                self._reject("File content is not an allowed image type")
+                return length
+            data = self._open_temp()
+        self._sha256.update(data)
+        self._file.write(data)
+        return length
+
+    def _open_temp(self):
+        os.makedirs(self.upload_folder, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(dir=self.upload_folder, prefix='.upload-', suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+        head, self._head = self._head, b''
+        return head
+
+    def finish(self):
+        """Called once the whole upload has been written; validates uploads shorter than a signature."""
+        if self.error is None and self._file is None:
+            self.extension = sniff_image_type(self._head, self.allowed_extensions)
+            if self.extension is None:
+                self._reject("File content is not an allowed image type")
+            else:
+                head = self._open_temp()
+                self._sha256.update(head)
+                self._file.write(head)
+        return self.error is None
+
+    def commit(self, filename):
+        """Moves the upload to ``filename`` inside the upload folder and returns the name."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        os.replace(self._temp_path, os.path.join(self.upload_folder, filename))
+        self._temp_path = None
+        return filename
+
+    def _reject(self, reason):
+        self.error = reason
+        self._head = b''
+        self._discard()
+
+    def _discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._temp_path is not None:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
+
+    # File-like surface Werkzeug expects from a stream factory result
+    def seek(self, offset, whence=0):
+        if self._file is not None:
+            return self._file.seek(offset, whence)
+        return 0
+
+    def tell(self):
+        return self._file.tell() if self._file is not None else 0
+
+    def read(self, size=-1):
+        if self._file is not None:
+            return self._file.read(size)
+        return self._head[:size] if size >= 0 else self._head
+
+    def close(self):
+        self._discard()
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    @classmethod
+    def copy_from(cls, stream, upload_folder, max_bytes, allowed_extensions):
+        """Streams an arbitrary file object through the same checks, e.g. a spooled upload."""
+        target = cls(upload_folder, max_bytes, allowed_extensions)
+        while not target.error:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            target.write(chunk)
+        target.finish()
+        return target
+
+
+class UploadRequest(Request):
+    """
+    Request class that streams the files of image upload endpoints through CappedUploadStream
+    instead of spooling them, and refuses their bodies outright when the declared length cannot
+    fit the image cap. Uploads to any other endpoint are parsed by Werkzeug as usual.
+    """
+
+    image_upload_endpoints = frozenset({'auction.create_auction', 'auction.edit_item'})
+
+    @property
+    def max_content_length(self):
+        """Image upload bodies past the image cap plus the form around it are refused before being read."""
+        if self.endpoint not in self.image_upload_endpoints:
+            return super().max_content_length
+        config = current_app.config
+        limit = config['MAX_IMAGE_UPLOAD_BYTES'] + config.get('UPLOAD_FORM_OVERHEAD_BYTES', 0)
+        return min(limit, config['MAX_CONTENT_LENGTH'] or limit)
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint not in self.image_upload_endpoints:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return CappedUploadStream(
+            current_app.config['UPLOAD_FOLDER'],
+            current_app.config['MAX_IMAGE_UPLOAD_BYTES'],
+            current_app.config['ALLOWED_EXTENSIONS']
+        )
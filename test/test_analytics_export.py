@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pyarrow.parquet as pq
+from bson import ObjectId
+
+from src.example.utils import analytics_export
+from src.example.utils.analytics_export import export_collection
+
+
+class FakeCollection:
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection, batch_size):
+        after = query.get('_id', {}).get('$gt')
+        rows = [doc for doc in self.documents if after is None or doc['_id'] > after]
+        return mock.Mock(sort=mock.Mock(return_value=sorted(rows, key=lambda doc: doc['_id'])))
+
+
+class TestAnalyticsExport(unittest.TestCase):
+
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.out_dir, True)
+        self.bids = [self._bid(amount) for amount in (10.0, 20.0, 30.0)]
+        self.collection = FakeCollection(self.bids[:2])
+        patcher = mock.patch.object(analytics_export, 'routed_collection', return_value=self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _bid(amount):
+        return {'_id': ObjectId(), 'auction_id': ObjectId(), 'bidder_id': ObjectId(), 'bid_amount': amount}
+
+    def _export(self, **kwargs):
+        return export_collection('bid', self.out_dir, chunk_rows=2, log=lambda message: None, **kwargs)
+
+    def _amounts(self):
+        folder = os.path.join(self.out_dir, 'bid')
+        return sorted(amount for name in os.listdir(folder)
+                      for amount in pq.read_table(os.path.join(folder, name)).column('bid_amount').to_pylist())
+
+    def test_incremental_export_only_reads_new_documents(self):
+        self.assertEqual(self._export(), 2)
+        self.collection.documents = self.bids
+        self.assertEqual(self._export(), 1)
+        self.assertEqual(self._amounts(), [10.0, 20.0, 30.0])
+        self.assertEqual(analytics_export._load_state(self.out_dir)['bid'], str(self.bids[2]['_id']))
+
+    def test_full_export_replaces_previous_chunks(self):
+        self._export()
+        self.bids[0]['bid_amount'] = 15.0  # Edits never reach incremental chunks
+        self.collection.documents = self.bids
+        state = analytics_export._load_state(self.out_dir)
+        analytics_export._save_state(self.out_dir, dict(state, auction='a' * 24))
+        self.assertEqual(self._export(full=True), 3)
+        self.assertEqual(self._amounts(), [15.0, 20.0, 30.0])
+        self.assertEqual(sorted(os.listdir(self.out_dir)), ['_export_state.json', 'bid'])
+        self.assertEqual(analytics_export._load_state(self.out_dir)['auction'], 'a' * 24)
+
+    def test_interrupted_full_export_keeps_the_previous_export(self):
+        self._export()
+        self.collection.documents = self.bids
+        with mock.patch.object(analytics_export, '_write_chunk', side_effect=[None, OSError('disk full')]):
+            with self.assertRaises(OSError):
+                self._export(full=True)
+        self.assertEqual(self._amounts(), [10.0, 20.0])
+        self.assertEqual(analytics_export._load_state(self.out_dir)['bid'], str(self.bids[1]['_id']))
+
+
+if __name__ == '__main__':
+    unittest.main()
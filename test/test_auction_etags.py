@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from src.example.repositories import auction_repository_impl
+from src.example.repositories.auction_repository_impl import AuctionRepositoryImpl
+from src.example.routers import auction_router as auction_router_module
+from src.example.routers.auction_router import auction_router
+from src.example.utils.catalog_cache import CatalogCache
+from src.example.utils.etag import auction_etag, listing_etag
+
+
+def _document(item_id='item1', version=3):
+    return {'item_id': item_id, 'version': version, 'bids': []}
+
+
+class TestAuctionETags(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(auction_router, url_prefix='/api')
+        self.client = self.app.test_client()
+        self.service = mock.patch.object(auction_router_module, 'auction_service').start()
+        mock.patch.object(auction_router_module, 'catalog_cache', CatalogCache()).start()
+        mock.patch.object(auction_router_module, 'serialize_auction', side_effect=lambda auction, bids: auction).start()
+        mock.patch.object(auction_router_module, 'serialize_auctions', side_effect=lambda auctions, bids: auctions).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_auction_etag_comes_from_the_served_document(self):
+        # A lagging version read must not label a newer body with an older ETag
+        self.service.get_auction_version.return_value = 2
+        self.service.get_auction_document.return_value = (_document(version=3), {})
+        response = self.client.get('/api/auction/item1')
+        self.assertEqual(response.get_etag()[0], auction_etag('item1', 3))
+        self.service.get_auction_version.assert_not_called()
+
+    def test_listing_etag_matches_the_cached_body(self):
+        self.service.list_item_documents.return_value = ([_document('a', 1), _document('b', 4)], {})
+        first = self.client.get('/api/auctions')
+        self.service.list_item_documents.return_value = ([_document('a', 2), _document('b', 4)], {})
+        second = self.client.get('/api/auctions')  # Served from the cache: same body, same ETag
+        self.assertEqual(first.get_etag()[0], listing_etag([('a', 1), ('b', 4)], 'http://localhost/'))
+        self.assertEqual((second.data, second.get_etag()), (first.data, first.get_etag()))
+        self.assertEqual(self.service.list_item_documents.call_count, 1)
+
+    def test_listing_pages_are_cached_per_host(self):
+        self.service.list_item_documents.side_effect = lambda page, per_page: (
+            [dict(_document('a', 1), host=auction_router_module.request.host_url)], {}
+        )
+        first = self.client.get('/api/auctions', base_url='http://auction.test')
+        second = self.client.get('/api/auctions', base_url='https://shop.test')
+        self.assertIn(b'https://shop.test/', second.data)
+        self.assertNotIn(b'auction.test', second.data)
+        self.assertNotEqual(first.get_etag(), second.get_etag())
+        self.assertEqual(self.service.list_item_documents.call_count, 2)
+
+    def test_revalidation_is_answered_without_loading_the_auction(self):
+        self.service.get_auction_version.return_value = 3
+        response = self.client.get('/api/auction/item1', headers={'If-None-Match': f'"{auction_etag("item1", 3)}"'})
+        self.assertEqual((response.status_code, response.data), (304, b''))
+        self.assertEqual(response.get_etag()[0], auction_etag('item1', 3))
+        self.service.get_auction_document.assert_not_called()
+
+    def test_stale_etag_gets_the_full_auction(self):
+        self.service.get_auction_version.return_value = 4
+        self.service.get_auction_document.return_value = (_document(version=4), {})
+        response = self.client.get('/api/auction/item1', headers={'If-None-Match': f'"{auction_etag("item1", 3)}"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_etag()[0], auction_etag('item1', 4))
+
+    def test_listing_revalidation_returns_304(self):
+        self.service.list_item_documents.return_value = ([_document('a', 1)], {})
+        etag = self.client.get('/api/auctions?page=1&per_page=10').get_etag()[0]
+        response = self.client.get('/api/auctions?page=1&per_page=10', headers={'If-None-Match': f'"{etag}"'})
+        self.assertEqual((response.status_code, response.data), (304, b''))
+
+
+class TestUpdateAuction(unittest.TestCase):
+
+    def test_fields_and_version_bump_are_one_update(self):
+        auction = mock.Mock(pk='pk1', item_title='Lamp', is_approved=True, version=2)
+        with mock.patch.object(auction_repository_impl, 'Auction') as model:
+            AuctionRepositoryImpl.update_auction(auction, {'item_title', 'is_approved'})
+        model.objects.assert_called_once_with(pk='pk1')
+        model.objects.return_value.update_one.assert_called_once_with(
+            inc__version=1, set__item_title='Lamp', set__is_approved=True
+        )
+        auction.validate.assert_called_once_with()
+        self.assertEqual(auction.version, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import jwt
+from flask import Flask
+
+from src.example.repositories import auction_repository_impl
+from src.example.repositories.auction_repository_impl import REPORT_COLUMNS, AuctionRepositoryImpl
+from src.example.routers import user_router as user_router_module
+from src.example.routers.user_router import user_router
+from src.example.utils import decorators
+
+SECRET = 'test-secret'
+ROWS = [
+    {'item_id': 'a', 'item_title': 'Lamp, brass', 'seller_id': 's1', 'starting_bid': 10.0, 'high_bid': 25.0,
+     'bid_count': 2, 'is_approved': True, 'start_time': datetime(2025, 6, 1), 'end_time': None,
+     'seller_auction_count': 2, 'seller_total_high_bids': 25.0},
+    {'item_id': 'b', 'item_title': 'Chair', 'seller_id': 's1', 'starting_bid': 5.0, 'high_bid': None,
+     'bid_count': 0, 'is_approved': False, 'start_time': datetime(2025, 6, 2), 'end_time': None,
+     'seller_auction_count': 2, 'seller_total_high_bids': 25.0},
+]
+
+
+class TestAggregateReportPipeline(unittest.TestCase):
+
+    def test_pipeline_folds_bids_and_seller_totals_in_mongodb(self):
+        collection = mock.Mock()
+        with mock.patch.object(auction_repository_impl, 'routed_collection', return_value=collection) as routed:
+            AuctionRepositoryImpl.aggregate_report(batch_size=250)
+        self.assertEqual(routed.call_args.args[1], auction_repository_impl.SECONDARY)
+        pipeline = collection.aggregate.call_args.args[0]
+        self.assertEqual(collection.aggregate.call_args.kwargs, {'allowDiskUse': True, 'batchSize': 250})
+        self.assertEqual([next(iter(stage)) for stage in pipeline], ['$lookup', '$unwind', '$setWindowFields', '$project'])
+        lookup = pipeline[0]['$lookup']
+        self.assertEqual((lookup['from'], lookup['as']), ('bid', 'bid_stats'))
+        self.assertEqual(lookup['pipeline'][0], {'$match': {'$expr': {'$eq': ['$auction_id', '$$auction']}}})
+        self.assertTrue(pipeline[1]['$unwind']['preserveNullAndEmptyArrays'])
+        window = pipeline[2]['$setWindowFields']
+        self.assertEqual(window['partitionBy'], '$seller_id')
+        self.assertEqual(set(window['output']), {'seller_auction_count', 'seller_total_high_bids'})
+        projected = {field for field, value in pipeline[3]['$project'].items() if value != 0}
+        self.assertEqual(projected, set(REPORT_COLUMNS))
+
+
+class TestStreamedReport(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['SECRET_KEY'] = SECRET
+        app.register_blueprint(user_router)
+        self.client = app.test_client()
+        for target, name, value in (
+                (decorators, 'resolve_user', mock.Mock(return_value='admin1')),
+                (user_router_module, '_principal', mock.Mock(return_value=SimpleNamespace(is_admin=True))),
+                (auction_repository_impl.AuctionRepositoryImpl, 'aggregate_report', mock.Mock(return_value=iter(ROWS)))):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        token = jwt.encode({'user_id': 'admin1', 'version': 0,
+                            'exp': datetime.now(timezone.utc) + timedelta(minutes=5)}, SECRET, algorithm='HS256')
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def _get(self, fmt):
+        response = self.client.get(f'/api/auction_report?format={fmt}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        return response
+
+    def test_csv_has_one_header_and_quotes_values(self):
+        response = self._get('csv')
+        self.assertEqual(response.headers['Content-Disposition'], 'attachment; filename=auction_report.csv')
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual([row['item_title'] for row in rows], ['Lamp, brass', 'Chair'])
+        self.assertEqual(rows[0]['start_time'], '2025-06-01T00:00:00')
+
+    def test_json_is_one_array(self):
+        body = json.loads(self._get('json').get_data(as_text=True))
+        self.assertEqual([row['item_id'] for row in body], ['a', 'b'])
+
+    def test_ndjson_is_one_object_per_line(self):
+        lines = self._get('ndjson').get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line)['bid_count'] for line in lines], [2, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,8 @@ import uuid # For generating unique item_ids
 from test.base_test import BaseTestCase
 from src.example.models.user import User
 from src.example.models.auction import Auction
+from src.example.models.bid import Bid
+from src.example.models.image_blob import ImageBlob
 from src.config import Config # To get UPLOAD_FOLDER for cleanup
 
 class TestAuctionRoutes(BaseTestCase):
@@ -19,7 +21,7 @@ class TestAuctionRoutes(BaseTestCase):
         }
 
     def _create_dummy_image(self, filename="test_image.png", content_type='image/png'):
-        return (BytesIO(b"someinitialimagedata"), filename, content_type)
+        return (BytesIO(b"\x89PNG\r\n\x1a\nsomeinitialimagedata"), filename, content_type)
 
     def tearDown(self):
         """Clean up uploaded test files after each auction test if any."""
@@ -33,6 +35,12 @@ class TestAuctionRoutes(BaseTestCase):
                         os.remove(os.path.join(upload_folder, filename))
                     except OSError as e:
                         print(f"Error deleting test file {filename}: {e}")
+            # Uploads are stored under their content hash and tracked in ImageBlob
+            for blob in ImageBlob.objects:
+                path = os.path.join(upload_folder, blob.filename)
+                if os.path.exists(path):
+                    os.remove(path)
+        ImageBlob.objects.delete()
 
     # --- Test Create Auction ---
     def test_create_auction_success(self):
@@ -128,6 +136,20 @@ class TestAuctionRoutes(BaseTestCase):
         self.assertEqual(response.json['item_id'], auction.item_id)
         # You might want to assert that auction.current_bid (or similar) is updated in the DB.
 
+    def test_view_bid_history_highest_first(self):
+        seller = self._register_user(username="history_seller")
+        auction = Auction(item_id="historyitem001", seller_id=seller, item_title="History", item_description="Test", starting_bid=10.0).save()
+        for amount in (12.0, 30.0, 20.0):
+            Bid(auction_id=auction, bidder_id=seller, bid_amount=amount).save()
+        response = self.client.get(f'/api/auction/{auction.item_id}/bids')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([bid['bid_amount'] for bid in response.json], [30.0, 20.0, 12.0])
+        self.assertEqual(response.json[0]['auction_id'], str(auction.id))
+
+    def test_view_bid_history_auction_not_found(self):
+        response = self.client.get('/api/auction/nonexistentauction/bids')
+        self.assertEqual(response.status_code, 404)
+
     def test_place_bid_too_low(self):
         seller = self._register_user(username="bid_seller_low")
         auction = Auction(item_id="biditem002", seller_id=seller, item_title="Biddable Low", item_description="Test", starting_bid=20.0).save()
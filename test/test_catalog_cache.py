@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+from src.example.utils.catalog_cache import CatalogCache
+
+
+class TestCatalogCache(unittest.TestCase):
+
+    def test_hit_and_miss_counters(self):
+        cache = CatalogCache()
+        self.assertIsNone(cache.get(('page', 1)))
+        cache.put(('page', 1), ['a'], ['itemA'])
+        self.assertEqual(cache.get(('page', 1)), ['a'])
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_invalidate_auction_only_drops_pages_containing_it(self):
+        cache = CatalogCache()
+        cache.put(('page', 1), ['p1'], ['itemA', 'itemB'])
+        cache.put(('page', 2), ['p2'], ['itemC'])
+        cache.invalidate_auction('itemB')
+        self.assertIsNone(cache.get(('page', 1)))
+        self.assertEqual(cache.get(('page', 2)), ['p2'])
+
+    def test_size_bounded_lru_eviction(self):
+        cache = CatalogCache(max_entries=2)
+        cache.put('a', 1, ['x'])
+        cache.put('b', 2, ['y'])
+        cache.get('a')  # 'b' is now least recently used
+        cache.put('c', 3, ['z'])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        cache.invalidate_auction('y')  # evicted entries leave no stale index behind
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_fill_that_raced_an_invalidation_is_dropped(self):
+        cache = CatalogCache()
+        token = cache.begin_fill()  # Page read starts, then a bid on itemA invalidates it
+        cache.invalidate_auction('itemA')
+        self.assertFalse(cache.put(('page', 1), ['stale'], ['itemA', 'itemB'], token))
+        self.assertIsNone(cache.get(('page', 1)))
+        self.assertTrue(cache.put(('page', 2), ['p2'], ['itemC'], token))  # Other auctions are unaffected
+        self.assertTrue(cache.put(('page', 1), ['fresh'], ['itemA', 'itemB'], cache.begin_fill()))
+        self.assertEqual(cache.stats()['stale_fills'], 1)
+
+    def test_invalidate_all_refuses_every_earlier_fill(self):
+        cache = CatalogCache()
+        token = cache.begin_fill()
+        cache.invalidate_all()
+        self.assertFalse(cache.put('a', 1, ['x'], token))
+
+    def test_forgotten_invalidations_still_refuse_older_fills(self):
+        cache = CatalogCache()
+        cache.max_tracked_invalidations = 2
+        token = cache.begin_fill()
+        for item_id in ('x', 'y', 'z'):  # 'x' is no longer tracked individually
+            cache.invalidate_auction(item_id)
+        self.assertFalse(cache.put('a', 1, ['x'], token))
+        self.assertTrue(cache.put('a', 1, ['x'], cache.begin_fill()))
+
+    def test_entries_expire_after_max_age(self):
+        cache = CatalogCache(max_age=30)
+        with mock.patch('src.example.utils.catalog_cache.time.monotonic', return_value=100.0):
+            cache.put('a', 1, ['x'])
+        with mock.patch('src.example.utils.catalog_cache.time.monotonic', return_value=131.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['size'], 0)
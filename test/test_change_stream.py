@@ -0,0 +1,159 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+
+from src.example.services import auction_service_impl, event_subscribers
+from src.example.services.auction_service_impl import AuctionServiceImpl
+from src.example.utils.change_stream import ChangeStreamConsumer
+from src.example.utils.event_bus import EventBus, AUCTION_UPDATED, BID_PLACED
+
+
+class FakeChangeSource:
+    """Stands in for a replica set: replays change events after the given resume token."""
+
+    def __init__(self, changes, fail_after=None, stop_event=None, lost_tokens=()):
+        self.changes = changes
+        self.fail_after = fail_after
+        self.stop_event = stop_event
+        self.lost_tokens = list(lost_tokens)
+        self.resumed_from = []
+
+    def watch(self, resume_after=None):
+        self.resumed_from.append(resume_after)
+        if resume_after in self.lost_tokens:
+            self.lost_tokens.remove(resume_after)
+            raise OperationFailure("resume point may no longer be in the oplog", code=286)
+        start = 0 if resume_after is None else [c['_id'] for c in self.changes].index(resume_after) + 1
+        return _FakeStream(self, self.changes[start:])
+
+
+class _FakeStream:
+    def __init__(self, source, changes):
+        self.source = source
+        self.changes = changes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        for change in self.changes:
+            if self.source.fail_after is not None and change['_id'] == self.source.fail_after:
+                self.source.fail_after = None
+                raise PyMongoError("primary stepped down")
+            yield change
+        self.source.stop_event.set()
+
+
+def _bid_insert(token, auction_pk, amount):
+    return {'_id': {'_data': token}, 'ns': {'coll': 'bid'}, 'operationType': 'insert',
+            'documentKey': {'_id': ObjectId()},
+            'fullDocument': {'_id': ObjectId(), 'auction_id': auction_pk, 'bidder_id': ObjectId(), 'bid_amount': amount}}
+
+
+def _auction_update(token, auction_pk, item_id, updated):
+    return {'_id': {'_data': token}, 'ns': {'coll': 'auction'}, 'operationType': 'update',
+            'documentKey': {'_id': auction_pk}, 'fullDocument': {'_id': auction_pk, 'item_id': item_id},
+            'updateDescription': {'updatedFields': updated, 'removedFields': []}}
+
+
+class TestChangeStreamConsumer(unittest.TestCase):
+
+    def setUp(self):
+        self.auction_pk = ObjectId()
+        self.bus = EventBus()
+        self.events = []
+        for topic in (AUCTION_UPDATED, BID_PLACED):
+            self.bus.subscribe(topic, lambda event, topic=topic: self.events.append((topic, event)))
+        self.find_auction = lambda pk: {'_id': pk, 'item_id': 'item1', 'seller_id': ObjectId(), 'is_approved': True}
+
+    def test_events_are_translated_to_bus_topics(self):
+        consumer = ChangeStreamConsumer(self.bus, None, find_auction=self.find_auction)
+        consumer.handle(_bid_insert('t1', self.auction_pk, 25.0))
+        consumer.handle(_auction_update('t2', self.auction_pk, 'item1', {'is_approved': True, 'version': 2}))
+        (bid_topic, bid), (update_topic, update) = self.events
+        self.assertEqual((bid_topic, bid['auction_id'], bid['item_id'], bid['bid_amount']),
+                         (BID_PLACED, str(self.auction_pk), 'item1', 25.0))
+        self.assertEqual((update_topic, update['fields'], update['approval']),
+                         (AUCTION_UPDATED, {'is_approved', 'version'}, (False, True)))
+        self.assertEqual(consumer.resume_token, {'_data': 't2'})
+
+    def test_interrupted_stream_resumes_after_last_handled_event(self):
+        stop_event = threading.Event()
+        changes = [_bid_insert(f't{i}', self.auction_pk, float(i)) for i in range(1, 4)]
+        source = FakeChangeSource(changes, fail_after={'_data': 't3'}, stop_event=stop_event)
+        consumer = ChangeStreamConsumer(self.bus, source, find_auction=self.find_auction, retry_seconds=0)
+        consumer.run(stop_event)
+        self.assertEqual(source.resumed_from, [None, {'_data': 't2'}])
+        self.assertEqual([event['bid_amount'] for _, event in self.events], [1.0, 2.0, 3.0])
+
+    def test_lost_history_restarts_from_now_and_resets_caches(self):
+        stop_event = threading.Event()
+        source = FakeChangeSource([_bid_insert('t1', self.auction_pk, 1.0)], stop_event=stop_event,
+                                  lost_tokens=[{'_data': 'gone'}])
+        reset = mock.Mock()
+        consumer = ChangeStreamConsumer(self.bus, source, find_auction=self.find_auction, retry_seconds=0,
+                                        on_history_lost=reset)
+        consumer.resume_token = {'_data': 'gone'}
+        consumer.run(stop_event)
+        self.assertEqual(source.resumed_from, [{'_data': 'gone'}, None])
+        reset.assert_called_once_with()
+        self.assertEqual(consumer.resume_token, {'_data': 't1'})
+
+    def test_failing_event_is_skipped_without_stopping_the_stream(self):
+        stop_event = threading.Event()
+        broken = _auction_update('t1', self.auction_pk, 'item1', {'version': 2})
+        del broken['fullDocument']['item_id']  # KeyError in handle
+        source = FakeChangeSource([broken, _bid_insert('t2', self.auction_pk, 5.0)], stop_event=stop_event)
+        consumer = ChangeStreamConsumer(self.bus, source, find_auction=self.find_auction, retry_seconds=0)
+        consumer.run(stop_event)
+        self.assertEqual([event['bid_amount'] for _, event in self.events], [5.0])
+        self.assertEqual(consumer.resume_token, {'_data': 't2'})
+
+    def test_bid_event_drives_websocket_room_and_caches(self):
+        bus = EventBus()
+        event_subscribers.register_subscribers(bus, rollups=False)
+        consumer = ChangeStreamConsumer(bus, None, find_auction=self.find_auction)
+        with mock.patch.object(event_subscribers, 'broadcast_new_bid') as broadcast, \
+                mock.patch.object(event_subscribers, 'catalog_cache') as cache:
+            consumer.handle(_bid_insert('t1', self.auction_pk, 30.0))
+            consumer.handle(_auction_update('t2', self.auction_pk, 'item1', {'current_bid': 30.0}))
+        broadcast.assert_called_once_with(
+            auction_id=str(self.auction_pk), bid_data={'auction_id': str(self.auction_pk), 'new_price': 30.0}
+        )
+        cache.invalidate_auction.assert_called_once_with('item1')
+
+
+class TestOnlyChangedFieldsAreWritten(unittest.TestCase):
+    """The change stream infers approval flips from updatedFields, so unchanged fields must not be $set."""
+
+    def setUp(self):
+        self.auction = SimpleNamespace(id=ObjectId(), is_approved=True, item_title='Lamp', image_filename=None)
+        repository = auction_service_impl.AuctionRepositoryImpl
+        for name, value in (('find_auction_by_id', self.auction), ('update_auction', None)):
+            patcher = mock.patch.object(repository, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(auction_service_impl, 'publish_write')
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_edit_leaves_an_unchanged_approval_out_of_the_update(self):
+        AuctionServiceImpl.edit_item('item1', {'is_approved': True, 'item_title': 'Brass lamp'})
+        auction_service_impl.AuctionRepositoryImpl.update_auction.assert_called_once_with(self.auction, {'item_title'})
+        self.assertIsNone(self.publish.call_args.kwargs['approval'])
+
+    def test_approving_an_approved_auction_writes_nothing(self):
+        AuctionServiceImpl.approve_item('item1')
+        auction_service_impl.AuctionRepositoryImpl.update_auction.assert_not_called()
+        self.publish.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
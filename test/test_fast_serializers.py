@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from bson import ObjectId
+from flask import Flask, jsonify
+
+from src.example.models.auction import Auction
+from src.example.models.bid import Bid
+from src.example.models.user import User
+from src.example.routers.image_router import image_router
+from src.example.schemas.auction_schema import AuctionSchema
+from src.example.schemas.fast_serializers import (
+    serialize_auction, serialize_auctions, serialize_user, dump_json, image_url_for
+)
+from src.example.schemas.user_schema import UserSchema
+from src.example.utils.image_variants import VARIANT_FOLDER
+
+
+class TestFastSerializers(unittest.TestCase):
+
+    def setUp(self):
+        self.upload_folder = tempfile.mkdtemp()
+        self.app = Flask(__name__)
+        self.app.config['UPLOAD_FOLDER'] = self.upload_folder
+        self.app.register_blueprint(image_router)
+        self.context = self.app.test_request_context('/', base_url='http://auction.test')
+        self.context.push()
+        self.seller = User(id=ObjectId(), user_id='seller', email='s@example.com', password='x', username='seller')
+        self.bidder = User(id=ObjectId(), user_id='bidder', email='b@example.com', password='x', username='bidder')
+
+    def tearDown(self):
+        self.context.pop()
+        shutil.rmtree(self.upload_folder)
+
+    def _auction(self, **fields):
+        auction = Auction(
+            id=ObjectId(), item_id=fields.pop('item_id', 'item1'), seller_id=self.seller, starting_bid=10,
+            item_description='A lamp', item_title='Lamp', start_time=datetime(2024, 5, 1, 12, 30, 15, 250000),
+            end_time=datetime(2024, 6, 1), **fields
+        )
+        bids = [Bid(id=ObjectId(), auction_id=auction, bidder_id=self.bidder, bid_amount=amount)
+                for amount in (11, 12.5)]
+        auction.bids = bids
+        return auction, {bid.id: bid.to_mongo().to_dict() for bid in bids}
+
+    def assert_parity(self, auction, bids_by_id):
+        expected = AuctionSchema().dump(auction)
+        actual = serialize_auction(auction.to_mongo().to_dict(), bids_by_id)
+        self.assertEqual(actual, expected)
+        self.assertEqual(dump_json(actual), jsonify(expected).get_data())
+
+    def test_auction_without_image(self):
+        self.assert_parity(*self._auction())
+
+    def test_auction_with_image_before_and_after_variants(self):
+        auction, bids_by_id = self._auction(image_filename='ab12.png', is_approved=True)
+        self.assert_parity(auction, bids_by_id)
+        os.makedirs(os.path.join(self.upload_folder, VARIANT_FOLDER))
+        with open(os.path.join(self.upload_folder, VARIANT_FOLDER, 'ab12.json'), 'w') as f:
+            f.write('{}')
+        self.assert_parity(auction, bids_by_id)
+
+    def test_auction_with_unset_optional_fields(self):
+        auction = Auction(id=ObjectId(), item_id='bare', seller_id=self.seller, starting_bid=1,
+                          item_description='d', item_title='t', start_time=None)
+        self.assert_parity(auction, {})
+
+    def test_missing_bid_serializes_as_empty_dict(self):
+        auction, bids_by_id = self._auction()
+        bids_by_id.pop(auction.bids[0].id)
+        self.assertEqual(serialize_auction(auction.to_mongo().to_dict(), bids_by_id)['bids'][0], {})
+
+    def test_image_prefix_follows_each_request_host(self):
+        self.assertEqual(image_url_for('a.png'), 'http://auction.test/images/a.png')
+        for host in ('evil.test', 'other.test'):
+            with self.app.test_request_context('/', base_url=f'http://{host}'):
+                self.assertEqual(image_url_for('a.png'), f'http://{host}/images/a.png')
+        self.assertEqual(image_url_for('b c.png'), 'http://auction.test/images/b%20c.png')
+
+    def test_listing(self):
+        first, first_bids = self._auction(item_id='a')
+        second, second_bids = self._auction(item_id='b')
+        expected = AuctionSchema(many=True).dump([first, second])
+        raw = [first.to_mongo().to_dict(), second.to_mongo().to_dict()]
+        self.assertEqual(serialize_auctions(raw, {**first_bids, **second_bids}), expected)
+
+    def test_user(self):
+        user = User(id=ObjectId(), user_id='u1', email='u@example.com', password='hash', username='u1',
+                    created_at=datetime(2024, 1, 2, 3, 4, 5), roles={'is_admin': 1, 'is_buyer': False})
+        expected = UserSchema().dump(user)
+        self.assertEqual(serialize_user(user.to_mongo().to_dict()), expected)
+        self.assertEqual(json.loads(dump_json(expected)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+
+from flask import Flask, render_template_string
+
+from src.example.utils.fragment_cache import TIME_LEFT_SLOT, FragmentCache, render_cards
+
+CARD = '<h3>{{ auction.title }}</h3><span>{{ auction.time_left }}</span>'
+
+
+def _card(item_id='item1', version=1, title='Lamp', time_left='1h 5m'):
+    return {'item_id': item_id, 'version': version, 'title': title, 'time_left': time_left}
+
+
+class TestFragmentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        context = self.app.app_context()
+        context.push()
+        self.addCleanup(context.pop)
+        self.cache = FragmentCache()
+        self.render_card = mock.Mock(side_effect=lambda card: render_template_string(CARD, auction=card))
+
+    def test_unchanged_version_reuses_the_fragment_with_a_live_countdown(self):
+        first = render_cards([_card(time_left='1h 5m')], self.render_card, self.cache)
+        second = render_cards([_card(time_left='1h 4m')], self.render_card, self.cache)
+        self.assertEqual(self.render_card.call_count, 1)
+        self.assertEqual(str(first[0]), '<h3>Lamp</h3><span>1h 5m</span>')
+        self.assertEqual(str(second[0]), '<h3>Lamp</h3><span>1h 4m</span>')
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_new_version_replaces_the_old_entry(self):
+        render_cards([_card(version=1)], self.render_card, self.cache)
+        render_cards([_card(version=2, title='Brass lamp')], self.render_card, self.cache)
+        self.assertIsNone(self.cache.get('item1', 1))
+        self.assertIn('Brass lamp', self.cache.get('item1', 2))
+        self.assertEqual(self.cache.stats()['size'], 1)
+
+    def test_least_recently_used_auction_is_evicted(self):
+        cache = FragmentCache(max_entries=2)
+        for item_id in ('a', 'b', 'c'):
+            cache.put(item_id, 1, item_id)
+        self.assertIsNone(cache.get('a', 1))
+        self.assertEqual(cache.get('c', 1), 'c')
+
+    def test_titles_and_countdown_are_escaped(self):
+        card = _card(title='<script>x</script>', time_left='<b>soon</b>')
+        render_cards([card], self.render_card, self.cache)
+        html = str(render_cards([card], self.render_card, self.cache)[0])
+        self.assertNotIn('<script>', html)
+        self.assertIn('&lt;script&gt;x&lt;/script&gt;', html)
+        self.assertIn('&lt;b&gt;soon&lt;/b&gt;', html)
+        self.assertEqual(self.cache.get('item1', 1).count(TIME_LEFT_SLOT), 1)  # Countdown is never cached
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask import Flask
+
+from src.example.routers.image_router import image_router
+
+DIGEST = 'ab' * 32
+
+
+class TestServeImage(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        os.makedirs(os.path.join(self.folder, 'variants'))
+        for name in (f'{DIGEST}.png', f'variants/{DIGEST}__thumbnail.webp', f'variants/{DIGEST}.json',
+                     '.upload-x1.part', f'.{DIGEST}.png.deleting', f"{'c' * 32}_photo.jpg", 'notes.txt'):
+            with open(os.path.join(self.folder, name), 'wb') as f:
+                f.write(b'data')
+        self.app = Flask(__name__)
+        self.app.config.update(UPLOAD_FOLDER=self.folder, IMAGE_CACHE_MAX_AGE=100,
+                               IMAGE_MUTABLE_CACHE_MAX_AGE=10, IMAGE_ACCEL_REDIRECT_PREFIX=None)
+        self.app.register_blueprint(image_router)
+        self.client = self.app.test_client()
+
+    def _status(self, name):
+        return self.client.get(f'/images/{name}').status_code
+
+    def test_originals_variants_and_legacy_uploads_are_served(self):
+        response = self.client.get(f'/images/{DIGEST}.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        response.close()
+        self.assertEqual(self._status(f'variants/{DIGEST}__thumbnail.webp'), 200)
+        self.assertEqual(self._status(f"{'c' * 32}_photo.jpg"), 200)
+
+    def test_internal_files_are_not_served(self):
+        for name in ('.upload-x1.part', f'.{DIGEST}.png.deleting', f'variants/{DIGEST}.json', 'notes.txt'):
+            self.assertEqual(self._status(name), 404, name)
+
+    def test_internal_files_are_not_redirected_to_the_proxy(self):
+        self.app.config['IMAGE_ACCEL_REDIRECT_PREFIX'] = '/protected-uploads'
+        self.assertEqual(self._status('.upload-x1.part'), 404)
+        response = self.client.get(f'/images/{DIGEST}.png')
+        self.assertEqual(response.headers['X-Accel-Redirect'], f'/protected-uploads/{DIGEST}.png')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from src.example.services import auction_service_impl
+from src.example.services.auction_service_impl import AuctionServiceImpl
+from src.example.utils import image_store
+from src.example.utils.image_variants import variant_filename, variants_ready
+from src.example.utils.upload_stream import CappedUploadStream
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x01' * 64
+
+
+class TestImageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.blobs = mock.patch.object(image_store, 'ImageBlobRepositoryImpl').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _store(self, data=PNG):
+        upload = CappedUploadStream.copy_from(io.BytesIO(data), self.folder, 1024, {'png'})
+        return image_store.store_upload(upload)
+
+    def _write_variants(self, filename):
+        os.makedirs(os.path.join(self.folder, 'variants'), exist_ok=True)
+        stem = filename.rpartition('.')[0]
+        for path in (f'variants/{stem}.json', variant_filename(filename, 'thumbnail')):
+            with open(os.path.join(self.folder, path), 'w') as f:
+                f.write('{}')
+
+    def _sweep(self, filename):
+        self.blobs.find_orphans.return_value = [{'filename': filename, 'size': len(PNG)}]
+        self.blobs.delete_if_orphaned.return_value = True
+        return image_store.sweep_orphaned_images(upload_folder=self.folder, grace_seconds=0)
+
+    def test_identical_uploads_share_one_file_and_take_one_reference_each(self):
+        first, second = self._store(), self._store()
+        self.assertEqual(first, second)
+        self.assertEqual(os.listdir(self.folder), [first])
+        self.assertEqual(self.blobs.acquire.call_args_list, [mock.call(first, len(PNG))] * 2)
+
+    def test_sweep_removes_orphan_and_its_variants(self):
+        filename = self._store()
+        self._write_variants(filename)
+        self.blobs.exists.return_value = False
+        self.assertEqual(self._sweep(filename), (1, len(PNG)))
+        self.assertFalse(os.path.exists(os.path.join(self.folder, filename)))
+        self.assertFalse(variants_ready(self.folder, filename))
+
+    def test_sweep_restores_file_referenced_during_the_delete(self):
+        filename = self._store()
+        self.blobs.exists.return_value = True
+        self.assertEqual(self._sweep(filename), (0, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.folder, filename)))
+
+    def test_sweep_keeps_variants_of_a_reupload_that_raced_the_tombstone(self):
+        filename = self._store()
+        self._write_variants(filename)
+        self.blobs.exists.side_effect = [False, True]  # Re-referenced right after the first check
+        self._sweep(filename)
+        self.assertTrue(variants_ready(self.folder, filename))
+
+
+class TestEditItemImageReference(unittest.TestCase):
+
+    def test_failed_save_releases_the_new_image(self):
+        auction = SimpleNamespace(is_approved=True, image_filename='old.png')
+        repository = auction_service_impl.AuctionRepositoryImpl
+        with mock.patch.object(repository, 'find_auction_by_id', return_value=auction), \
+                mock.patch.object(repository, 'update_auction', side_effect=RuntimeError('write failed')), \
+                mock.patch.object(AuctionServiceImpl, '_save_auction_image', return_value='new.png'), \
+                mock.patch.object(auction_service_impl, 'release_image') as release_image:
+            with self.assertRaises(RuntimeError):
+                AuctionServiceImpl.edit_item('item1', {}, image_file=object())
+        release_image.assert_called_once_with('new.png')
+
+
+if __name__ == '__main__':
+    unittest.main()
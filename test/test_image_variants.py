@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from bson import ObjectId
+from flask import Flask, current_app
+from PIL import Image
+
+from src.example.services import auction_service_impl
+from src.example.services.auction_service_impl import AuctionServiceImpl
+from src.example.utils.image_variants import (
+    VARIANTS, generate_variants, schedule_variants, variant_filename, variant_urls
+)
+
+ORIGINAL = 'ab' * 32 + '.jpg'
+
+
+class TestImageVariants(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        Image.new('RGB', (2000, 1000), 'red').save(os.path.join(self.folder, ORIGINAL), format='JPEG')
+
+    def _urls(self):
+        return variant_urls(ORIGINAL, self.folder, lambda filename: f'/images/{filename}')
+
+    def test_variants_are_resized_and_listed_once_generated(self):
+        written = generate_variants(self.folder, ORIGINAL)
+        self.assertEqual(len(written), 2 * len(VARIANTS))
+        with Image.open(os.path.join(self.folder, variant_filename(ORIGINAL, 'thumbnail'))) as thumbnail:
+            self.assertEqual(thumbnail.size, (160, 80))
+        with Image.open(os.path.join(self.folder, variant_filename(ORIGINAL, 'card', webp=True))) as card:
+            self.assertEqual((card.format, card.size), ('WEBP', (480, 240)))
+        urls = self._urls()
+        self.assertEqual(urls['original'], f'/images/{ORIGINAL}')
+        self.assertEqual(urls['detail'], f"/images/{variant_filename(ORIGINAL, 'detail')}")
+        self.assertEqual(urls['webp']['thumbnail'], f"/images/{variant_filename(ORIGINAL, 'thumbnail', webp=True)}")
+
+    def test_urls_fall_back_to_the_original_until_generated(self):
+        urls = self._urls()
+        self.assertEqual(set(urls['webp'].values()) | {urls[name] for name in VARIANTS}, {f'/images/{ORIGINAL}'})
+
+    def test_oversized_images_are_refused_before_decoding(self):
+        with self.assertRaises(Image.DecompressionBombError):
+            generate_variants(self.folder, ORIGINAL, max_pixels=1000 * 1000)
+        self.assertEqual(self._urls()['thumbnail'], f'/images/{ORIGINAL}')
+
+    def test_ready_hook_runs_once_the_manifest_exists(self):
+        app = Flask(__name__)
+        app.config.update(UPLOAD_FOLDER=self.folder, IMAGE_MAX_PIXELS=0, IMAGE_VARIANT_WORKERS=1)
+        seen = []
+        on_ready = lambda filename: seen.append((filename, current_app.name, self._urls()['thumbnail']))
+        with app.app_context():
+            schedule_variants(ORIGINAL, on_ready).result(timeout=30)
+        self.assertEqual(seen, [(ORIGINAL, app.name, f"/images/{variant_filename(ORIGINAL, 'thumbnail')}")])
+
+    def test_ready_variants_bump_every_auction_showing_the_image(self):
+        rows = [{'_id': ObjectId(), 'item_id': 'item1'}, {'_id': ObjectId(), 'item_id': 'item2'}]
+        with mock.patch.object(auction_service_impl.AuctionRepositoryImpl, 'bump_image_versions',
+                               return_value=rows) as bump, \
+                mock.patch.object(auction_service_impl, 'publish_write') as publish:
+            AuctionServiceImpl._on_variants_ready(ORIGINAL)
+        bump.assert_called_once_with(ORIGINAL)
+        self.assertEqual([call.kwargs['item_id'] for call in publish.call_args_list], ['item1', 'item2'])
+        self.assertIn('version', publish.call_args.kwargs['fields'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from bson import ObjectId
+
+from src import app as app_module
+from src.example.models.views import AuctionView
+from src.example.repositories import auction_repository_impl
+from src.example.repositories.auction_repository_impl import AuctionRepositoryImpl
+from src.example.utils.catalog_cache import CatalogCache
+from src.example.utils.fragment_cache import FragmentCache
+from src.example.utils.time_util import format_time_left
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+
+def _view(item_id, end_time, current_bid=None, **fields):
+    row = dict(item_id=item_id, item_title=f'Title {item_id}', item_description='desc', starting_bid=10.0,
+               current_bid=current_bid, bid_count=1 if current_bid else 0, is_approved=True,
+               end_time=end_time, version=1, **fields)
+    return AuctionView.from_mongo(row)
+
+
+class TestFormatTimeLeft(unittest.TestCase):
+
+    def test_ended_auctions(self):
+        self.assertEqual(format_time_left(NOW, NOW), 'Ended')
+        self.assertEqual(format_time_left(NOW - timedelta(hours=1), NOW), 'Ended')
+
+    def test_under_a_minute(self):
+        self.assertEqual(format_time_left(NOW + timedelta(seconds=42), NOW), '0m 42s')
+
+    def test_hours_and_days(self):
+        self.assertEqual(format_time_left(NOW + timedelta(hours=3, minutes=5), NOW), '3h 5m')
+        self.assertEqual(format_time_left(NOW + timedelta(days=2, hours=4, minutes=30), NOW), '2d 4h')
+        self.assertEqual(format_time_left(None, NOW), 'No end date')
+
+
+class TestIndexPage(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        for name, value in (('catalog_cache', CatalogCache()), ('fragment_cache', FragmentCache())):
+            patcher = mock.patch.object(app_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(app_module.AuctionServiceImpl, 'list_open_items')
+        self.list_open_items = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_renders_current_bid_and_countdown_of_open_auctions(self):
+        now = datetime.utcnow()
+        self.list_open_items.return_value = [_view('open1', now + timedelta(days=3, hours=1), current_bid=25.5),
+                                             _view('closed1', now - timedelta(minutes=1))]
+        html = self.client.get('/').get_data(as_text=True)
+        self.assertIn('Title open1', html)
+        self.assertIn('$25.50', html)
+        self.assertIn('3d 0h', html)
+        self.assertNotIn('Title closed1', html)  # Ended after the page was cached
+
+    def test_page_size_is_capped(self):
+        self.list_open_items.return_value = []
+        self.client.get('/?page=2&per_page=10000')
+        self.client.get('/?page=0&per_page=0')
+        self.assertEqual(self.list_open_items.call_args_list,
+                         [mock.call(2, app_module.app.config['INDEX_MAX_PAGE_SIZE']), mock.call(1, 1)])
+
+
+class TestRebuildBidTotals(unittest.TestCase):
+
+    def test_backfills_only_with_monotonic_updates(self):
+        auction_id = ObjectId()
+        bids = mock.Mock(aggregate=mock.Mock(return_value=[{'_id': auction_id, 'high_bid': 40.0, 'bid_count': 3}]))
+        auctions = mock.Mock()
+        auctions.bulk_write.return_value.modified_count = 1
+        with mock.patch.object(auction_repository_impl, 'routed_collection', side_effect=[bids, auctions]):
+            self.assertEqual(AuctionRepositoryImpl.rebuild_bid_totals(), 1)
+        (operation,), = auctions.bulk_write.call_args.args
+        self.assertEqual(operation._filter['_id'], auction_id)
+        self.assertEqual(operation._doc, {'$max': {'bid_count': 3, 'current_bid': 40.0}, '$inc': {'version': 1}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from flask import Flask
+
+from src.config import Config, _optional_bool
+from src.example.routers import health_router as health_router_module
+from src.example.routers.health_router import health_router
+from src.example.utils.mongo import PoolMonitor, client_options
+
+
+class TestClientOptions(unittest.TestCase):
+
+    def _config(self, **overrides):
+        config = {name: getattr(Config, name) for name in dir(Config) if name.startswith('MONGO_')}
+        config.update(overrides)
+        return config
+
+    def test_unset_values_are_left_to_pymongo(self):
+        options = client_options(self._config(MONGO_SOCKET_TIMEOUT_MS=None, MONGO_COMPRESSORS=''))
+        self.assertNotIn('socketTimeoutMS', options)
+        self.assertNotIn('compressors', options)
+
+    def test_compressors_and_write_concern(self):
+        options = client_options(self._config(MONGO_COMPRESSORS='zstd, zlib', MONGO_WRITE_CONCERN='2'))
+        self.assertEqual(options['compressors'], ['zstd', 'zlib'])
+        self.assertEqual(options['w'], 2)
+        self.assertEqual(client_options(self._config(MONGO_WRITE_CONCERN='majority'))['w'], 'majority')
+
+    def test_journal_can_be_turned_off_explicitly(self):
+        for value, expected in (('true', True), ('false', False), ('', None)):
+            with mock.patch.dict(os.environ, {'MONGO_JOURNAL': value}):
+                self.assertIs(_optional_bool('MONGO_JOURNAL'), expected)
+        self.assertIs(client_options(self._config(MONGO_JOURNAL=False))['journal'], False)
+        self.assertNotIn('journal', client_options(self._config(MONGO_JOURNAL=None)))
+
+
+class TestPoolMonitor(unittest.TestCase):
+
+    def test_utilization_follows_checkouts(self):
+        monitor = PoolMonitor()
+        event = SimpleNamespace(address=('db', 27017))
+        monitor.pool_created(event)
+        for _ in range(2):
+            monitor.connection_created(event)
+            monitor.connection_check_out_started(event)
+            monitor.connection_checked_out(event)
+        monitor.connection_checked_in(event)
+        pool = monitor.snapshot(max_pool_size=4)['db:27017']
+        self.assertEqual((pool['open'], pool['in_use'], pool['waiting']), (2, 1, 0))
+        self.assertEqual(pool['utilization'], 0.25)
+
+
+class TestHealthRoutes(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['SECRET_KEY'] = 'test-secret'
+        app.register_blueprint(health_router)
+        self.client = app.test_client()
+        report = {'ok': False, 'error': 'db1:27017 unreachable', 'pool': {'db1:27017': {'open': 3}}}
+        patcher = mock.patch.object(health_router_module, 'health', return_value=report)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_public_probe_reports_status_only(self):
+        response = self.client.get('/health')
+        self.assertEqual((response.status_code, response.json), (503, {'status': 'degraded'}))
+
+    def test_details_need_authentication(self):
+        self.assertEqual(self.client.get('/health/details').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import dataclasses
+import unittest
+from unittest import mock
+from datetime import datetime
+
+from bson import ObjectId
+
+from src.example.models.views import AuctionView, BidView, Principal
+from src.example.utils import order_book as order_book_module
+from src.example.utils.order_book import OrderBook
+
+
+def _bid(amount):
+    return BidView(bid_id=str(ObjectId()), auction_id='a1', bidder_id='u1', bid_amount=amount)
+
+
+class TestViews(unittest.TestCase):
+
+    def test_auction_view_from_projected_row(self):
+        view = AuctionView.from_mongo({'_id': ObjectId(), 'item_id': 'item1', 'starting_bid': 10.0,
+                                       'end_time': datetime(2030, 1, 1), 'version': 3})
+        self.assertEqual(view.high_bid, 10.0)
+        self.assertEqual(view.version, 3)
+        self.assertTrue(view.is_open(datetime(2029, 1, 1)))
+        self.assertFalse(view.is_open(datetime(2031, 1, 1)))
+
+    def test_views_are_immutable_and_slotted(self):
+        view = _bid(5.0)
+        self.assertFalse(hasattr(view, '__dict__'))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            view.bid_amount = 6.0
+
+    def test_bid_view_dict_matches_stored_bid(self):
+        auction_id, bidder_id = ObjectId(), ObjectId()
+        view = BidView.from_mongo({'_id': ObjectId(), 'auction_id': auction_id, 'bidder_id': bidder_id, 'bid_amount': 7})
+        self.assertEqual(view.to_dict(), {'auction_id': str(auction_id), 'bidder_id': str(bidder_id), 'bid_amount': 7.0})
+
+    def test_principal_roles(self):
+        principal = Principal.from_mongo({'user_id': 'u1', 'roles': {'is_super_admin': True, 'is_buyer': False}})
+        self.assertTrue(principal.is_admin)
+        self.assertFalse(principal.has_role('is_buyer'))
+
+
+class TestOrderBook(unittest.TestCase):
+
+    def test_unloaded_auction_is_not_built_from_partial_adds(self):
+        book = OrderBook()
+        book.add('a1', _bid(10.0))
+        self.assertIsNone(book.get('a1'))
+
+    def test_add_keeps_highest_first(self):
+        book = OrderBook()
+        book.load('a1', [_bid(10.0), _bid(30.0)], book.begin_load('a1'))
+        book.add('a1', _bid(20.0))
+        self.assertEqual([bid.bid_amount for bid in book.get('a1')], [30.0, 20.0, 10.0])
+
+    def test_least_recently_used_auction_is_dropped(self):
+        book = OrderBook(max_auctions=2)
+        book.load('a1', [], book.begin_load('a1'))
+        book.load('a2', [], book.begin_load('a2'))
+        book.get('a1')
+        book.load('a3', [], book.begin_load('a3'))
+        self.assertIsNone(book.get('a2'))
+        self.assertEqual(book.get('a1'), ())
+
+    def test_load_overlapping_an_add_is_not_stored(self):
+        book = OrderBook()
+        token = book.begin_load('a1')
+        book.add('a1', _bid(20.0))  # Placed after the rows were read, so missing from them
+        self.assertEqual([bid.bid_amount for bid in book.load('a1', [_bid(10.0)], token)], [10.0])
+        self.assertIsNone(book.get('a1'))
+        book.load('a1', [_bid(10.0), _bid(20.0)], book.begin_load('a1'))
+        self.assertEqual(len(book.get('a1')), 2)
+
+    def test_load_overlapping_a_clear_is_not_stored(self):
+        book = OrderBook()
+        token = book.begin_load('a1')
+        book.clear()
+        book.load('a1', [], token)
+        self.assertIsNone(book.get('a1'))
+
+    def test_aborted_load_leaves_no_state(self):
+        book = OrderBook()
+        book.begin_load('missing')
+        book.abort_load('missing')
+        self.assertEqual(book._loads, {})
+
+    def test_ladders_expire_after_max_age(self):
+        book = OrderBook(max_age=5)
+        with mock.patch.object(order_book_module.time, 'monotonic', return_value=100.0):
+            book.load('a1', [_bid(10.0)], book.begin_load('a1'))
+        with mock.patch.object(order_book_module.time, 'monotonic', return_value=104.0):
+            self.assertIsNotNone(book.get('a1'))
+        with mock.patch.object(order_book_module.time, 'monotonic', return_value=106.0):
+            self.assertIsNone(book.get('a1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import uuid
+
+from flask import Flask
+
+from src.example.utils.decorators import bid_rate_limited, ip_rate_limited
+from src.example.utils.rate_limiter import InMemoryRateLimiter, SharedMemoryRateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def _assert_bucket_behaviour(self, limiter):
+        key = ('bid', 'user1', 'item1')
+        # A full bucket allows `capacity` requests back to back
+        for _ in range(3):
+            allowed, _ = limiter.allow(key, 3, 1, now=100.0)
+            self.assertTrue(allowed)
+        allowed, retry_after = limiter.allow(key, 3, 1, now=100.0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 1.0)
+        # Other keys are unaffected
+        allowed, _ = limiter.allow(('bid', 'user2', 'item1'), 3, 1, now=100.0)
+        self.assertTrue(allowed)
+        # One token refills after one second
+        allowed, _ = limiter.allow(key, 3, 1, now=101.0)
+        self.assertTrue(allowed)
+
+    def test_in_memory_token_bucket(self):
+        self._assert_bucket_behaviour(InMemoryRateLimiter())
+
+    def test_in_memory_evicts_least_recently_used_key(self):
+        limiter = InMemoryRateLimiter(max_keys=2)
+        limiter.allow('a', 1, 0.001, now=100.0)
+        limiter.allow('b', 1, 0.001, now=100.0)
+        limiter.allow('a', 1, 0.001, now=100.0)  # Refreshes 'a', leaving 'b' least recently used
+        limiter.allow('c', 1, 0.001, now=100.0)
+        self.assertEqual(list(limiter._buckets), ['a', 'c'])
+        self.assertFalse(limiter.allow('a', 1, 0.001, now=100.0)[0])
+
+    def test_shared_memory_token_bucket(self):
+        name = f"test_rl_{uuid.uuid4().hex[:8]}"
+        limiter = SharedMemoryRateLimiter(name, slots=64)
+        try:
+            self._assert_bucket_behaviour(limiter)
+            # A second handle on the same segment sees the same buckets
+            other = SharedMemoryRateLimiter(name, slots=64)
+            allowed, _ = other.allow(('bid', 'user1', 'item1'), 3, 1, now=101.0)
+            self.assertFalse(allowed)
+            other.close()
+        finally:
+            limiter.unlink()
+            limiter.close()
+
+
+class TestRateLimitDecorators(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(IP_RATE_LIMIT_CAPACITY=2, IP_RATE_LIMIT_PER_SECOND=0.5,
+                               BID_RATE_LIMIT_CAPACITY=1, BID_RATE_LIMIT_PER_SECOND=0.1)
+
+        @self.app.route('/ping')
+        @ip_rate_limited
+        def ping():
+            return 'ok'
+
+        @self.app.route('/bid/<item_id>/<current_user_id>')
+        @bid_rate_limited
+        def bid(item_id, current_user_id):
+            return 'ok'
+
+        self.client = self.app.test_client()
+
+    def test_ip_limit_returns_429_with_retry_after(self):
+        self.assertEqual([self.client.get('/ping').status_code for _ in range(2)], [200, 200])
+        response = self.client.get('/ping')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.get_json(), {'error': 'Too many requests, please slow down'})
+        self.assertEqual(response.headers['Retry-After'], '2')
+        other = self.client.get('/ping', environ_base={'REMOTE_ADDR': '10.0.0.2'})
+        self.assertEqual(other.status_code, 200)
+
+    def test_bid_limit_is_per_bidder_and_item(self):
+        self.assertEqual(self.client.get('/bid/item1/u1').status_code, 200)
+        response = self.client.get('/bid/item1/u1')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '10')
+        self.assertEqual(self.client.get('/bid/item2/u1').status_code, 200)
+        self.assertEqual(self.client.get('/bid/item1/u2').status_code, 200)
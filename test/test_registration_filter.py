@@ -0,0 +1,109 @@
+import unittest
+from unittest import mock
+
+from mongoengine import NotUniqueError
+from pymongo.errors import DuplicateKeyError
+
+from src.example.exceptions.validation_error import ValidationError
+from src.example.services import user_service_impl
+from src.example.services.user_service_impl import UserServiceImpl
+from src.example.utils.registration_filter import BloomFilter, RegistrationFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"user{i}")
+        self.assertTrue(all(f"user{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestRegistrationFilter(unittest.TestCase):
+
+    def test_not_ready_filter_reports_nothing(self):
+        registration = RegistrationFilter(capacity=100)
+        registration.add('alice', 'alice@example.com')
+        self.assertEqual(registration.maybe_taken('alice', 'alice@example.com'), [])
+
+    def test_warm_keeps_identities_added_while_loading(self):
+        registration = RegistrationFilter(capacity=100)
+
+        def identities():
+            yield 'alice', 'alice@example.com'
+            registration.add('bob', 'bob@example.com')  # A registration lands mid-warm
+
+        self.assertEqual(registration.warm(identities()), 2)
+        self.assertEqual(registration.maybe_taken('alice', 'new@example.com'), ['username'])
+        self.assertEqual(registration.maybe_taken('bob', 'bob@example.com'), ['username', 'email'])
+
+
+class TestRegisterPreCheck(unittest.TestCase):
+
+    def setUp(self):
+        self.registration = RegistrationFilter(capacity=100)
+        self.registration.warm([('alice', 'alice@example.com')])
+        patcher = mock.patch.object(user_service_impl, 'registration_filter', self.registration)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.payload = {'user_id': 'u2', 'username': 'alice', 'email': 'other@example.com', 'password': 'secret'}
+
+    def test_taken_username_is_rejected_before_hashing(self):
+        with mock.patch.object(user_service_impl.UserRepositoryImpl, 'find_taken_fields', return_value=['username']), \
+                mock.patch.object(user_service_impl, 'generate_password_hash') as hash_password:
+            with self.assertRaisesRegex(ValidationError, 'already exists'):
+                UserServiceImpl.register_user(self.payload)
+        hash_password.assert_not_called()
+
+    def test_false_positive_falls_through_to_save(self):
+        with mock.patch.object(user_service_impl.UserRepositoryImpl, 'find_taken_fields', return_value=[]), \
+                mock.patch.object(user_service_impl.UserRepositoryImpl, 'save_user') as save_user:
+            UserServiceImpl.register_user(self.payload)
+        save_user.assert_called_once()
+        self.assertEqual(self.registration.maybe_taken('carol', 'other@example.com'), ['email'])
+
+
+class TestRegisterDuplicate(unittest.TestCase):
+
+    def setUp(self):
+        self.registration = RegistrationFilter(capacity=100)
+        self.registration.warm([])
+        patcher = mock.patch.object(user_service_impl, 'registration_filter', self.registration)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.payload = {'user_id': 'u1', 'username': 'alice', 'email': 'alice@example.com', 'password': 'secret'}
+
+    @staticmethod
+    def _not_unique(key_value):
+        error = NotUniqueError('Tried to save duplicate unique keys')
+        error.__cause__ = DuplicateKeyError('E11000', 11000, {'code': 11000, 'keyValue': key_value})
+        return error
+
+    def _register(self, error):
+        with mock.patch.object(user_service_impl.UserRepositoryImpl, 'save_user', side_effect=error), \
+                mock.patch.object(user_service_impl, 'generate_password_hash', return_value='hash'):
+            with self.assertRaises(ValidationError) as raised:
+                UserServiceImpl.register_user(self.payload)
+        return str(raised.exception)
+
+    def test_user_id_clash_leaves_username_and_email_free(self):
+        message = self._register(self._not_unique({'user_id': 'u1'}))
+        self.assertIn('user_id', message)
+        self.assertEqual(self.registration.maybe_taken('alice', 'alice@example.com'), [])
+
+    def test_email_clash_only_registers_the_email(self):
+        message = self._register(self._not_unique({'email': 'alice@example.com'}))
+        self.assertEqual(message, 'User with this email already exists')
+        self.assertEqual(self.registration.maybe_taken('alice', 'alice@example.com'), ['email'])
+
+    def test_clash_without_driver_details_is_looked_up(self):
+        with mock.patch.object(user_service_impl.UserRepositoryImpl, 'find_taken_fields', return_value=[]):
+            message = self._register(NotUniqueError('Tried to save duplicate unique keys'))
+        self.assertIn('user_id', message)
+        self.assertEqual(self.registration.maybe_taken('alice', 'alice@example.com'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from flask import Flask
+
+from src.example.exceptions.validation_error import ValidationError
+from src.example.services import report_job_service_impl
+from src.example.services.report_job_service_impl import ReportJobServiceImpl
+
+
+class TestReportJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.app = Flask(__name__)
+        self.app.config.update(REPORT_FOLDER=self.folder, REPORT_JOB_TTL_SECONDS=60, REPORT_JOB_WORKERS=1,
+                               REPORT_JOB_TIMEOUT_SECONDS=600)
+        context = self.app.app_context()
+        context.push()
+        self.addCleanup(context.pop)
+        self.jobs = mock.patch.object(report_job_service_impl, 'ReportJobRepositoryImpl').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_submit_queues_the_job_on_the_worker_pool(self):
+        executor = mock.Mock()
+        mock.patch.object(report_job_service_impl, '_get_executor', return_value=executor).start()
+        mock.patch.object(report_job_service_impl.Auction, '_get_collection').start() \
+            .return_value.estimated_document_count.return_value = 42
+        job = ReportJobServiceImpl.submit_report('admin1', 'csv')
+        self.assertEqual((job.status, job.format, job.total_rows, job.requested_by), ('queued', 'csv', 42, 'admin1'))
+        self.jobs.save_job.assert_called_once_with(job)
+        self.jobs.fail_stale_jobs.assert_called_once()
+        executor.submit.assert_called_once_with(ReportJobServiceImpl._run, self.app, job.job_id, 'csv')
+
+    def test_unsupported_format_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            ReportJobServiceImpl.submit_report('admin1', 'xlsx')
+        self.jobs.save_job.assert_not_called()
+
+    def test_run_writes_a_gzip_result_and_marks_the_job_done(self):
+        rows = [{'item_id': 'a', 'bid_count': 2}, {'item_id': 'b', 'bid_count': 0}]
+        mock.patch.object(report_job_service_impl.AuctionRepositoryImpl, 'aggregate_report', return_value=rows).start()
+        ReportJobServiceImpl._run(self.app, 'job1', 'ndjson')
+        with gzip.open(os.path.join(self.folder, 'job1.ndjson.gz'), 'rt') as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+        final = self.jobs.update_job.call_args
+        self.assertEqual((final.kwargs['status'], final.kwargs['rows_written']), ('done', 2))
+
+    def test_status_poll_fails_jobs_without_recent_progress(self):
+        self.jobs.find_job_by_id.return_value = SimpleNamespace(status='failed')
+        self.assertEqual(ReportJobServiceImpl.get_job('job1').status, 'failed')
+        cutoff, _ = self.jobs.fail_stale_jobs.call_args.args
+        self.assertAlmostEqual((datetime.utcnow() - cutoff).total_seconds(), 600, delta=5)
+
+    def test_download_needs_a_finished_job(self):
+        self.jobs.find_job_by_id.return_value = SimpleNamespace(status='running', filename=None)
+        with self.assertRaises(ValidationError):
+            ReportJobServiceImpl.get_result_path('job1')
+        self.jobs.find_job_by_id.return_value = SimpleNamespace(status='done', filename='job1.csv.gz')
+        _, path = ReportJobServiceImpl.get_result_path('job1')
+        self.assertEqual(path, os.path.join(self.folder, 'job1.csv.gz'))
+
+    def test_expired_results_are_removed_and_races_ignored(self):
+        for name in ('old.csv.gz', 'gone.csv.gz', 'new.csv.gz'):
+            with open(os.path.join(self.folder, name), 'w') as f:
+                f.write('x')
+        old = time.time() - 3600
+        for name in ('old.csv.gz', 'gone.csv.gz'):
+            os.utime(os.path.join(self.folder, name), (old, old))
+        real_remove = os.remove
+
+        def remove(path):
+            if path.endswith('gone.csv.gz'):
+                real_remove(path)  # Another submission deleted it first
+                raise FileNotFoundError(path)
+            real_remove(path)
+
+        with mock.patch.object(report_job_service_impl.os, 'remove', side_effect=remove):
+            self.assertEqual(ReportJobServiceImpl.cleanup_expired(), 1)
+        self.assertEqual(os.listdir(self.folder), ['new.csv.gz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from collections import defaultdict
+from datetime import datetime
+from unittest import mock
+
+from bson import ObjectId
+
+from src.example.repositories import report_rollup_repository_impl as rollups
+from src.example.repositories.report_rollup_repository_impl import ReportRollupRepositoryImpl, compute_rollups
+
+
+class FakeRollups:
+    """Applies the $inc/$max updates ``_bump`` would send, keyed like the rebuilt totals."""
+
+    def __init__(self):
+        self.totals = defaultdict(lambda: {'auction_count': 0, 'bid_count': 0, 'bid_volume': 0.0, 'high_bid': None})
+
+    def bump(self, dimension, key, now, **updates):
+        total = self.totals[(dimension, key)]
+        for update, value in updates.items():
+            op, field = update.split('__', 1)
+            if op == 'inc':
+                total[field] += value
+            elif op == 'dec':
+                total[field] -= value
+            else:
+                total[field] = value if total[field] is None else max(total[field], value)
+
+
+class TestReportRollups(unittest.TestCase):
+
+    def setUp(self):
+        self.auction = {'_id': ObjectId(), 'seller_id': 's1', 'is_approved': False, 'start_time': datetime(2025, 6, 1)}
+        self.bids = [{'_id': ObjectId(), 'auction_id': self.auction['_id'], 'bid_amount': amount}
+                     for amount in (10.0, 25.0)]
+        self.fake = FakeRollups()
+        patcher = mock.patch.object(ReportRollupRepositoryImpl, '_bump', side_effect=self.fake.bump)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _aggregate(self, pipeline):
+        rows = [bid for bid in self.bids if bid['auction_id'] == pipeline[0]['$match']['auction_id']]
+        return [{'_id': None, 'count': len(rows), 'volume': sum(bid['bid_amount'] for bid in rows)}] if rows else []
+
+    def test_incremental_rollups_match_a_rebuild_after_a_state_change(self):
+        ReportRollupRepositoryImpl.record_auction_created('s1', 'pending', self.auction['start_time'])
+        for bid in self.bids:
+            ReportRollupRepositoryImpl.record_bid('s1', 'pending', bid['bid_amount'], bid['_id'].generation_time)
+        collection = mock.Mock(aggregate=mock.Mock(side_effect=self._aggregate))
+        with mock.patch.object(rollups, 'routed_collection', return_value=collection):
+            ReportRollupRepositoryImpl.record_state_change(str(self.auction['_id']), 'pending', 'approved')
+        self.auction['is_approved'] = True
+        emptied = self.fake.totals.pop(('state', 'pending'))
+        self.assertEqual((emptied['auction_count'], emptied['bid_count'], emptied['bid_volume']), (0, 0, 0.0))
+        self.assertEqual(dict(self.fake.totals), dict(compute_rollups([self.auction], self.bids)))
+        self.assertEqual(self.fake.totals[('state', 'approved')]['bid_volume'], 35.0)
+
+    def test_rebuild_swaps_a_scratch_collection_into_place(self):
+        live = mock.MagicMock()
+        live.name = 'report_rollup'
+        scratch = live.database.__getitem__.return_value
+        with mock.patch.object(rollups.ReportRollup, '_get_collection', return_value=live), \
+                mock.patch.object(rollups, 'Auction') as auction_model, mock.patch.object(rollups, 'Bid') as bid_model:
+            auction_model.objects.only.return_value.as_pymongo.return_value = [self.auction]
+            bid_model.objects.only.return_value.as_pymongo.return_value = self.bids
+            self.assertEqual(ReportRollupRepositoryImpl.rebuild(), 4)  # Auction day, bid day, seller, state
+        live.database.__getitem__.assert_called_once_with(rollups.REBUILD_COLLECTION)
+        self.assertEqual(len(scratch.insert_many.call_args.args[0]), 4)
+        scratch.rename.assert_called_once_with('report_rollup', dropTarget=True)
+        live.delete_many.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
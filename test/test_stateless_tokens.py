@@ -0,0 +1,69 @@
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from flask import Flask
+
+from src.example.exceptions.auth_error import AuthError
+from src.example.services import user_service_impl
+from src.example.services.user_service_impl import UserServiceImpl
+from src.example.utils.token_util import (
+    REFRESH, generate_refresh_token, generate_token, principal_from_claims, verify_token
+)
+
+
+def _user(**overrides):
+    user = dict(user_id='u1', username='alice', token_version=2, is_blocked=False,
+                roles={'is_admin': True, 'is_buyer': True, 'is_seller': False})
+    user.update(overrides)
+    return SimpleNamespace(**user)
+
+
+class TestStatelessTokens(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(SECRET_KEY='test-secret', JWT_STATELESS=True, JWT_EXPIRATION_SECONDS=3600,
+                               JWT_ACCESS_EXPIRATION_SECONDS=300, JWT_REFRESH_EXPIRATION_SECONDS=3600)
+        context = self.app.app_context()
+        context.push()
+        self.addCleanup(context.pop)
+
+    def test_access_token_carries_roles_and_short_expiry(self):
+        payload = verify_token(generate_token(_user()))
+        self.assertLessEqual(payload['exp'] - time.time(), 300)
+        principal = principal_from_claims(payload)
+        self.assertEqual((principal.user_id, principal.username, principal.token_version), ('u1', 'alice', 2))
+        self.assertEqual(principal.roles, frozenset({'is_admin', 'is_buyer'}))
+        self.assertTrue(principal.is_admin)
+        self.assertFalse(principal.is_super_admin)
+
+    def test_token_types_are_not_interchangeable(self):
+        with self.assertRaises(AuthError):
+            verify_token(generate_refresh_token(_user()))
+        with self.assertRaises(AuthError):
+            verify_token(generate_token(_user()), REFRESH)
+
+    def test_classic_tokens_have_no_claims_principal(self):
+        self.app.config['JWT_STATELESS'] = False
+        self.assertIsNone(principal_from_claims(verify_token(generate_token(_user()))))
+
+    def test_refresh_reads_the_user_and_issues_current_roles(self):
+        refresh_token = generate_refresh_token(_user())
+        promoted = _user(roles={'is_super_admin': True})
+        with mock.patch.object(user_service_impl.UserRepositoryImpl, 'find_user_by_id', return_value=promoted):
+            tokens = UserServiceImpl.refresh_access_token(refresh_token)
+        self.assertEqual(tokens['expires_in'], 300)
+        self.assertTrue(principal_from_claims(verify_token(tokens['token'])).is_super_admin)
+
+    def test_refresh_rejects_logged_out_and_blocked_users(self):
+        refresh_token = generate_refresh_token(_user())
+        for user, message in ((_user(token_version=3), 'Token invalidated'), (_user(is_blocked=True), 'User is blocked')):
+            with mock.patch.object(user_service_impl.UserRepositoryImpl, 'find_user_by_id', return_value=user):
+                with self.assertRaisesRegex(AuthError, message):
+                    UserServiceImpl.refresh_access_token(refresh_token)
+
+
+if __name__ == '__main__':
+    unittest.main()
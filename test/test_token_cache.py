@@ -0,0 +1,82 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import jwt
+from flask import Flask
+
+from src.example.exceptions.auth_error import AuthError
+from src.example.utils import token_util
+from src.example.utils.token_cache import TokenCache
+from src.example.utils.token_util import verify_token
+
+SECRET = 'test-secret'
+
+
+def _token(user_id='u1', seconds=300):
+    payload = {'sub': user_id, 'user_id': user_id, 'version': 0,
+               'exp': datetime.now(timezone.utc) + timedelta(seconds=seconds)}
+    return jwt.encode(payload, SECRET, algorithm='HS256')
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def test_entries_expire_with_the_token(self):
+        cache = TokenCache()
+        cache.put(b'k', {'exp': 100})
+        self.assertEqual(cache.get(b'k', now=99), {'exp': 100})
+        self.assertIsNone(cache.get(b'k', now=100))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(max_entries=2)
+        for key in (b'a', b'b'):
+            cache.put(key, {'exp': time.time() + 60})
+        cache.get(b'a')
+        cache.put(b'c', {'exp': time.time() + 60})
+        self.assertIsNone(cache.get(b'b'))
+        self.assertIsNotNone(cache.get(b'a'))
+
+    def test_tokens_without_expiry_are_not_cached(self):
+        cache = TokenCache()
+        cache.put(b'k', {'user_id': 'u1'})
+        self.assertIsNone(cache.get(b'k'))
+
+
+class TestVerifyTokenCaching(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SECRET_KEY'] = SECRET
+        context = self.app.app_context()
+        context.push()
+        self.addCleanup(context.pop)
+        patcher = mock.patch.object(token_util, 'token_cache', TokenCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_token_is_decoded_once(self):
+        token = _token()
+        with mock.patch.object(token_util.jwt, 'decode', wraps=jwt.decode) as decode:
+            first = verify_token(token)
+            second = verify_token(f'Bearer {token}')
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_invalid_tokens_are_not_cached(self):
+        forged = jwt.encode({'user_id': 'u1', 'exp': time.time() + 60}, 'other-secret', algorithm='HS256')
+        for _ in range(2):
+            with self.assertRaises(AuthError):
+                verify_token(forged)
+        self.assertEqual(token_util.token_cache.stats()['entries'], 0)
+
+    def test_cached_payload_still_checks_token_type(self):
+        token = _token()
+        verify_token(token)
+        with self.assertRaises(AuthError):
+            verify_token(token, token_util.REFRESH)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import jwt
+from flask import Flask, jsonify
+
+from src.example.repositories import token_revocation_repository_impl
+from src.example.repositories.token_revocation_repository_impl import TokenRevocationRepositoryImpl
+from src.example.utils import decorators, token_revocation
+from src.example.utils.decorators import manual_jwt_required
+from src.example.utils.token_revocation import RevocationRegistry
+
+SECRET = 'test-secret'
+
+
+def _token(user_id, version=0):
+    payload = {'sub': user_id, 'user_id': user_id, 'version': version,
+               'exp': datetime.now(timezone.utc) + timedelta(minutes=5)}
+    return jwt.encode(payload, SECRET, algorithm='HS256')
+
+
+class TestRevocationRegistry(unittest.TestCase):
+
+    def test_versions_and_blocks(self):
+        registry = RevocationRegistry()
+        registry.apply('u1', min_version=2)
+        registry.apply('u2', blocked=True)
+        self.assertTrue(registry.is_revoked('u1', 1))
+        self.assertFalse(registry.is_revoked('u1', 2))
+        self.assertTrue(registry.is_revoked('u2', 5))
+        self.assertFalse(registry.is_revoked('u3', 0))
+
+    def test_sync_pulls_other_workers_revocations_and_prunes_expired(self):
+        registry = RevocationRegistry()
+        now = datetime.utcnow()
+        rows = [
+            {'_id': 'u1', 'min_version': 3, 'updated_at': now, 'expires_at': now + timedelta(hours=1)},
+            {'_id': 'u2', 'min_version': 1, 'updated_at': now, 'expires_at': now - timedelta(seconds=1)},
+        ]
+        with mock.patch.object(token_revocation.TokenRevocationRepositoryImpl, 'find_revocations_since',
+                               return_value=rows) as find:
+            self.assertFalse(registry.is_current())
+            registry.sync()
+            registry.sync()
+        self.assertEqual(find.call_args_list[0].args, (None,))
+        self.assertEqual(find.call_args_list[1].args, (now - token_revocation.SYNC_OVERLAP,))
+        self.assertTrue(registry.is_current())
+        self.assertTrue(registry.is_revoked('u1', 2))
+        self.assertFalse(registry.is_revoked('u2', 0))
+
+    def test_stale_registry_is_not_current(self):
+        registry = RevocationRegistry(max_staleness=0)
+        with mock.patch.object(token_revocation.TokenRevocationRepositoryImpl, 'find_revocations_since',
+                               return_value=[]):
+            registry.sync()
+        with mock.patch.object(token_revocation.time, 'monotonic', return_value=registry._synced_at + 1):
+            self.assertFalse(registry.is_current())
+
+
+class TestSaveRevocation(unittest.TestCase):
+
+    def _saved_update(self, *args, **kwargs):
+        with mock.patch.object(token_revocation_repository_impl, 'TokenRevocation') as model:
+            TokenRevocationRepositoryImpl.save_revocation(*args, **kwargs)
+        return model._get_collection.return_value.update_one.call_args.args[1]
+
+    def test_updated_at_is_stamped_by_the_server(self):
+        self.assertEqual(self._saved_update('u1', min_version=2),
+                         {'$currentDate': {'updated_at': True}, '$max': {'min_version': 2}})
+
+    def test_permanent_block_clears_the_expiry(self):
+        self.assertEqual(self._saved_update('u1', blocked=True),
+                         {'$currentDate': {'updated_at': True}, '$set': {'blocked': True},
+                          '$unset': {'expires_at': ''}})
+
+    def test_late_commit_behind_the_watermark_is_still_synced(self):
+        registry = RevocationRegistry()
+        now = datetime.utcnow()
+        late = now - token_revocation.SYNC_OVERLAP / 2  # Stamped before the last row seen, visible after it
+        batches = [[{'_id': 'u1', 'min_version': 1, 'updated_at': now}],
+                   [{'_id': 'u1', 'min_version': 1, 'updated_at': now},
+                    {'_id': 'u2', 'min_version': 4, 'updated_at': late}]]
+        with mock.patch.object(token_revocation.TokenRevocationRepositoryImpl, 'find_revocations_since',
+                               side_effect=batches) as find:
+            registry.sync()
+            registry.sync()
+        self.assertLessEqual(find.call_args.args[0], late)
+        self.assertTrue(registry.is_revoked('u2', 3))
+        self.assertEqual(registry._watermark, now)
+
+
+class TestManualJwtRequired(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SECRET_KEY'] = SECRET
+
+        @self.app.route('/me')
+        @manual_jwt_required
+        def me(current_user_id):
+            return jsonify({'user_id': current_user_id})
+
+        self.client = self.app.test_client()
+        self.registry = RevocationRegistry()
+        self.registry._synced_at = token_revocation.time.monotonic()
+        for target, name, value in ((decorators, 'revocation_registry', self.registry),
+                                    (decorators, 'resolve_user', mock.Mock(side_effect=AssertionError('db read')))):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _get(self, token):
+        return self.client.get('/me', headers={'Authorization': f'Bearer {token}'})
+
+    def test_current_registry_authorizes_without_database(self):
+        response = self._get(_token('u1'))
+        self.assertEqual((response.status_code, response.json), (200, {'user_id': 'u1'}))
+
+    def test_logged_out_and_blocked_tokens_are_rejected(self):
+        self.registry.apply('u1', min_version=1)
+        self.registry.apply('u2', blocked=True)
+        self.assertEqual(self._get(_token('u1', version=0)).status_code, 401)
+        self.assertEqual(self._get(_token('u1', version=1)).status_code, 200)
+        self.assertEqual(self._get(_token('u2')).json, {'error': 'Token revoked'})
+
+    def test_stale_registry_falls_back_to_database(self):
+        self.registry._synced_at = None
+        decorators.resolve_user.side_effect = None
+        decorators.resolve_user.return_value = 'u1'
+        self.assertEqual(self._get(_token('u1')).status_code, 200)
+        decorators.resolve_user.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
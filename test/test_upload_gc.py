@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from src.example.utils import image_store, upload_gc
+from src.example.utils.upload_gc import collect_orphaned_uploads
+
+
+class TestCollectOrphanedUploads(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        old = time.time() - 3600
+        for name, size in (('kept.png', 10), ('orphan1.png', 100), ('orphan2.jpg', 200),
+                           ('.upload-abc.part', 50), ('.kept.png.deleting', 7)):
+            path = os.path.join(self.folder, name)
+            with open(path, 'wb') as f:
+                f.write(b'x' * size)
+            os.utime(path, (old, old))
+        with open(os.path.join(self.folder, 'fresh.png'), 'wb') as f:
+            f.write(b'x' * 1000)  # Inside the grace period
+        self.referenced = mock.patch.object(upload_gc.AuctionRepositoryImpl, 'find_referenced_images',
+                                            side_effect=lambda names: {'kept.png'} & set(names))
+        self.tracked = mock.patch.object(upload_gc.ImageBlobRepositoryImpl, 'find_tracked', return_value=set())
+        self.referenced.start()
+        self.tracked.start()
+        self.addCleanup(self.referenced.stop)
+        self.addCleanup(self.tracked.stop)
+
+    def _collect(self, **kwargs):
+        return collect_orphaned_uploads(upload_folder=self.folder, grace_seconds=60, **kwargs)
+
+    def test_dry_run_reports_without_deleting(self):
+        report = self._collect(dry_run=True)
+        self.assertEqual((report['scanned'], report['orphaned'], report['reclaimed_bytes']), (5, 3, 350))
+        self.assertEqual(len(os.listdir(self.folder)), 6)
+
+    def test_deletes_orphans_and_temp_files_only(self):
+        report = self._collect()
+        self.assertEqual(report['reclaimed_bytes'], 350)
+        self.assertEqual(sorted(os.listdir(self.folder)), ['.kept.png.deleting', 'fresh.png', 'kept.png'])
+
+    def test_gc_lock_file_is_never_collected(self):
+        lock_file = upload_gc._try_gc_lock(self.folder)
+        self.addCleanup(lock_file.close)
+        old = time.time() - 7200
+        os.utime(os.path.join(self.folder, upload_gc.GC_LOCK_FILENAME), (old, old))
+        self._collect()
+        self.assertIn(upload_gc.GC_LOCK_FILENAME, os.listdir(self.folder))
+        # Another worker opening the lock now still finds it held
+        self.assertIsNone(upload_gc._try_gc_lock(self.folder))
+
+    def test_batches_bound_each_index_lookup(self):
+        report = self._collect(batch_size=2, max_batches=1, dry_run=True)
+        self.assertEqual(report['scanned'], 2)
+        for call in upload_gc.AuctionRepositoryImpl.find_referenced_images.call_args_list:
+            self.assertLessEqual(len(call.args[0]), 2)
+
+
+class TestSweepDryRun(unittest.TestCase):
+
+    def test_dry_run_sweep_leaves_blobs_and_files(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, True)
+        with open(os.path.join(folder, 'abc.png'), 'wb') as f:
+            f.write(b'x' * 42)
+        with mock.patch.object(image_store.ImageBlobRepositoryImpl, 'find_orphans',
+                               return_value=[{'filename': 'abc.png', 'size': 42}]), \
+                mock.patch.object(image_store.ImageBlobRepositoryImpl, 'delete_if_orphaned') as delete:
+            result = image_store.sweep_orphaned_images(upload_folder=folder, grace_seconds=0, dry_run=True)
+        self.assertEqual(result, (1, 42))
+        delete.assert_not_called()
+        self.assertTrue(os.path.exists(os.path.join(folder, 'abc.png')))
+
+    def test_gc_lock_is_held_by_one_process_only(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, True)
+        first = upload_gc._try_gc_lock(folder)
+        self.addCleanup(first.close)
+        # flock locks belong to the open file, so a second open behaves like another worker
+        self.assertIsNone(upload_gc._try_gc_lock(folder))
+
+
+if __name__ == '__main__':
+    unittest.main()
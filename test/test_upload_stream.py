@@ -0,0 +1,92 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask import Flask, jsonify, request
+
+from src.example.utils.upload_stream import CappedUploadStream, UploadRequest
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100
+GIF = b'GIF89a' + b'\x00' * 100
+
+
+class TestCappedUploadStream(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+
+    def _stream(self, data, max_bytes=1024, allowed=('png', 'jpg')):
+        return CappedUploadStream.copy_from(io.BytesIO(data), self.folder, max_bytes, set(allowed))
+
+    def test_accepted_image_is_committed_under_its_digest(self):
+        upload = self._stream(PNG)
+        self.assertIsNone(upload.error)
+        self.assertTrue(upload.content_filename.endswith('.png'))
+        upload.commit(upload.content_filename)
+        self.assertEqual(os.listdir(self.folder), [upload.content_filename])
+
+    def test_upload_over_the_cap_is_rejected_and_removed(self):
+        upload = self._stream(PNG, max_bytes=50)
+        self.assertEqual(upload.error, "Image exceeds the maximum upload size")
+        self.assertEqual(os.listdir(self.folder), [])
+
+    def test_bad_signature_is_rejected_before_touching_disk(self):
+        upload = self._stream(b'<?php echo 1; ?>' * 4)
+        self.assertEqual(upload.error, "File content is not an allowed image type")
+        self.assertEqual(os.listdir(self.folder), [])
+
+    def test_image_type_outside_allowed_extensions_is_rejected(self):
+        upload = self._stream(GIF, allowed=('png',))
+        self.assertEqual(upload.error, "File content is not an allowed image type")
+
+    def test_uncommitted_upload_leaves_no_temp_file(self):
+        upload = self._stream(PNG)
+        self.assertEqual(len(os.listdir(self.folder)), 1)  # The hidden .upload-*.part file
+        upload.close()
+        self.assertEqual(os.listdir(self.folder), [])
+
+
+class TestUploadRequestScope(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.app = Flask(__name__)
+        self.app.request_class = UploadRequest
+        self.app.config.update(UPLOAD_FOLDER=self.folder, MAX_IMAGE_UPLOAD_BYTES=1024,
+                               UPLOAD_FORM_OVERHEAD_BYTES=512, ALLOWED_EXTENSIONS={'png'})
+
+        def describe():
+            stream = request.files['file'].stream
+            return jsonify({'capped': isinstance(stream, CappedUploadStream), 'error': getattr(stream, 'error', None)})
+
+        self.app.add_url_rule('/auction', 'auction.create_auction', describe, methods=['POST'])
+        self.app.add_url_rule('/documents', 'documents', describe, methods=['POST'])
+        self.client = self.app.test_client()
+
+    def _post(self, path, data):
+        return self.client.post(path, data={'file': (io.BytesIO(data), 'upload.pdf')},
+                                content_type='multipart/form-data').json
+
+    def test_image_endpoints_stream_through_the_cap(self):
+        self.assertEqual(self._post('/auction', b'%PDF-1.7' * 10),
+                         {'capped': True, 'error': "File content is not an allowed image type"})
+
+    def test_other_endpoints_keep_werkzeug_parsing(self):
+        self.assertEqual(self._post('/documents', b'%PDF-1.7' * 10), {'capped': False, 'error': None})
+
+    def test_oversized_image_body_is_refused_unread(self):
+        response = self.client.post('/auction', data={'file': (io.BytesIO(PNG * 100), 'upload.png')},
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(os.listdir(self.folder), [])
+
+    def test_body_cap_only_applies_to_image_endpoints(self):
+        self.assertEqual(self._post('/documents', PNG * 100), {'capped': False, 'error': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
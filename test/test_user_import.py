@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+
+from werkzeug.security import check_password_hash
+
+from src.example.exceptions.validation_error import ValidationError
+from src.example.services import user_service_impl
+from src.example.services.user_service_impl import UserServiceImpl
+from src.example.utils import password_hashing
+from src.example.utils.password_hashing import hash_passwords
+
+
+def _row(name, password='password123'):
+    return {'user_id': name, 'username': name, 'email': f'{name}@example.com', 'password': password}
+
+
+class TestPasswordHashing(unittest.TestCase):
+
+    def test_process_pool_hashes_in_order(self):
+        hashes = hash_passwords(['first', 'second'], workers=2)
+        self.assertTrue(check_password_hash(hashes[0], 'first'))
+        self.assertTrue(check_password_hash(hashes[1], 'second'))
+
+    def test_pool_workers_are_not_forked_from_the_server(self):
+        hash_passwords(['first', 'second'], workers=2)
+        self.assertIn(password_hashing._pool._mp_context.get_start_method(), ('forkserver', 'spawn'))
+
+
+class TestImportUsers(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(user_service_impl, 'hash_passwords',
+                                    side_effect=lambda passwords, workers: [f'hashed:{p}' for p in passwords])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reports_invalid_and_duplicate_rows_by_position(self):
+        rows = [_row('alice'), {'username': 'nobody'}, _row('bob'), _row('alice')]
+        duplicate = {'index': 2, 'code': 11000, 'errmsg': 'E11000 duplicate key', 'keyValue': {'username': 'alice'}}
+        with mock.patch.object(user_service_impl.UserRepositoryImpl, 'insert_users',
+                               return_value=(2, [duplicate])) as insert_users:
+            report = UserServiceImpl.import_users(rows)
+        documents = insert_users.call_args.args[0]
+        self.assertEqual([document['username'] for document in documents], ['alice', 'bob', 'alice'])
+        self.assertEqual(documents[0]['password'], 'hashed:password123')
+        self.assertEqual(report['summary'], {'created': 2, 'invalid': 1, 'duplicate': 1, 'failed': 0})
+        self.assertEqual([result['status'] for result in report['results']],
+                         ['created', 'invalid', 'created', 'duplicate'])
+        self.assertIn('email', report['results'][1]['errors'])
+        self.assertEqual(report['results'][3]['fields'], ['username'])
+
+    def test_rejects_non_list_payload(self):
+        with self.assertRaises(ValidationError):
+            UserServiceImpl.import_users({'users': []})
+
+
+if __name__ == '__main__':
+    unittest.main()